@@ -0,0 +1,78 @@
+"""
+Utilidades compartidas por los benchmarks.
+
+Cada benchmark se ejecuta como script (``python benchmarks/bench_x.py``)
+contra una base SQLite propia, para no tocar ``db.sqlite3``.
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def setup_django(db_path=None, migrate=True):
+    """
+    Configura Django con los settings del proyecto apuntando a ``db_path``
+    (por defecto un archivo temporal) y aplica las migraciones.
+    """
+    sys.path.insert(0, str(ROOT))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'formsetexample.settings')
+
+    import django
+    from django.conf import settings
+
+    if db_path is None:
+        db_path = os.path.join(tempfile.mkdtemp(prefix='bench-'), 'db.sqlite3')
+    settings.DATABASES['default']['NAME'] = db_path
+    settings.ALLOWED_HOSTS = ['testserver']
+    django.setup()
+
+    if migrate:
+        from django.core.management import call_command
+        call_command('migrate', verbosity=0, interactive=False)
+    return db_path
+
+
+def seed_library(n_authors, books_per_author=0, batch_size=5000):
+    """Crea ``n_authors`` autores con ``books_per_author`` libros cada uno."""
+    from core.models import Author, Book
+
+    Author.objects.bulk_create(
+        (Author(name=f'Autor {i:08d}') for i in range(n_authors)),
+        batch_size=batch_size,
+    )
+    if not books_per_author:
+        return
+    pks = Author.objects.values_list('pk', flat=True).iterator()
+    batch = []
+    for pk in pks:
+        for j in range(books_per_author):
+            batch.append(Book(author_id=pk, title=f'Libro {pk}-{j}',
+                              published_year=1900 + j % 120))
+        if len(batch) >= batch_size:
+            Book.objects.bulk_create(batch)
+            batch = []
+    Book.objects.bulk_create(batch)
+    # bulk_create no mantiene book_count, first_year ni last_year
+    Author.objects.rebuild_book_stats()
+
+
+def timeit(func, repeat=5):
+    """Ejecuta ``func`` ``repeat`` veces; devuelve (mínimo, mediana) en ms."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return min(samples), statistics.median(samples)
+
+
+def report(rows, headers):
+    """Imprime una tabla de texto simple."""
+    widths = [max(len(str(x)) for x in col) for col in zip(headers, *rows)]
+    for row in [headers, *rows]:
+        print('  '.join(str(x).ljust(w) for x, w in zip(row, widths)))
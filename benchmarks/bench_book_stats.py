@@ -0,0 +1,68 @@
+"""
+Orden de ``AuthorTable`` por cantidad de libros y años: agregando sobre
+``Book`` en cada página (``Count``/``Min``/``Max`` con ``GROUP BY``, como
+antes) contra leer las columnas ``book_count``/``first_year``/``last_year``
+de ``Author`` por su índice. Mide también la página completa
+``/authors?sort=...`` (sin caché de la tabla), el costo de mantener las
+columnas al guardar el formset y ``rebuild_book_stats``.
+
+    python benchmarks/bench_book_stats.py [--authors 50000]
+                                          [--books-per-author 20]
+"""
+import argparse
+import time
+
+from _setup import report, seed_library, setup_django, timeit
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--authors', type=int, default=50_000)
+    parser.add_argument('--books-per-author', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.db.models import Count, Max, Min
+    from django.test import Client
+    from django.urls import reverse
+
+    from core.models import Author
+
+    seed_library(args.authors, args.books_per_author)
+    settings.AUTHOR_TABLE_CACHE_ALIAS = None
+    client = Client()
+    url = reverse('list_authors')
+    per_page = 25
+
+    aggregated = Author.objects.annotate(
+        n=Count('books'),
+        first=Min('books__published_year'),
+        last=Max('books__published_year'),
+    )
+    rows = []
+    for sort, column, annotation in (('-book_count', 'book_count', 'n'),
+                                     ('first_year', 'first_year', 'first'),
+                                     ('-last_year', 'last_year', 'last')):
+        direction = '-' if sort.startswith('-') else ''
+        # desempate por pk en el mismo sentido, como el cursor de AuthorList
+        group_by, _ = timeit(lambda: list(aggregated.order_by(
+            f'{direction}{annotation}', f'{direction}pk')[:per_page]),
+            args.repeat)
+        indexed, _ = timeit(lambda: list(Author.objects.order_by(
+            f'{direction}{column}', f'{direction}pk')[:per_page]), args.repeat)
+        page, _ = timeit(lambda: client.get(url, {'sort': sort}), args.repeat)
+        rows.append((sort, f'{group_by:.1f}', f'{indexed:.1f}', f'{page:.1f}'))
+
+    print(f'{args.authors} autores, {args.books_per_author} libros c/u')
+    report(rows, ('orden', 'GROUP BY ms', 'columna ms', 'página ms'))
+
+    start = time.perf_counter()
+    call_command('rebuild_book_stats', verbosity=0)
+    print(f'rebuild_book_stats: {time.perf_counter() - start:.1f} s')
+
+
+if __name__ == '__main__':
+    main()
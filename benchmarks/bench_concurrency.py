@@ -0,0 +1,155 @@
+"""
+Throughput con clientes concurrentes (200 por defecto): WSGI con un hilo
+por cliente contra ASGI en un event loop, para la lista y la edición de
+autores, con las vistas sync y las variantes async (``async/...``).
+
+Los handlers de Django se llaman en el mismo proceso, sin servidor ni
+red, para comparar solo el costo del framework y de las vistas; con
+uvicorn/gunicorn delante se suma el del servidor. Solo se miden lecturas:
+SQLite serializa las escrituras y con 200 clientes mediría los bloqueos.
+
+    python benchmarks/bench_concurrency.py [--authors 20000] [--clients 200]
+        [--requests 2000]
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from _setup import report, seed_library, setup_django
+
+
+def wsgi_environ(path, query):
+    return {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query,
+        'SCRIPT_NAME': '', 'SERVER_NAME': 'testserver', 'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1', 'HTTP_HOST': 'testserver',
+        'wsgi.version': (1, 0), 'wsgi.url_scheme': 'http',
+        'wsgi.input': BytesIO(), 'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True, 'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+
+
+def run_wsgi(app, path, query, clients, total):
+    def call(_):
+        status = []
+        start = time.perf_counter()
+        body = app(wsgi_environ(path, query),
+                   lambda s, headers, exc_info=None: status.append(s))
+        b''.join(body)
+        body.close()
+        assert status[0].startswith('200'), status[0]
+        return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        latencies = list(pool.map(call, range(total)))
+    return time.perf_counter() - start, latencies
+
+
+async def asgi_call(app, path, query):
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'path': path,
+        'raw_path': path.encode(), 'query_string': query.encode(),
+        'root_path': '', 'headers': [(b'host', b'testserver')],
+        'client': ('127.0.0.1', 0), 'server': ('testserver', 80),
+    }
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        # el cliente no se desconecta; Django cancela esta espera al terminar
+        await asyncio.Future()
+
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    assert messages[0]['status'] == 200, messages[0]['status']
+    return (time.perf_counter() - start) * 1000
+
+
+def run_asgi(app, path, query, clients, total):
+    async def main():
+        semaphore = asyncio.Semaphore(clients)
+
+        async def client():
+            async with semaphore:
+                return await asgi_call(app, path, query)
+
+        return await asyncio.gather(*(client() for _ in range(total)))
+
+    start = time.perf_counter()
+    latencies = asyncio.run(main())
+    return time.perf_counter() - start, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--authors', type=int, default=20_000)
+    parser.add_argument('--books-per-author', type=int, default=5)
+    parser.add_argument('--edit-books', type=int, default=200)
+    parser.add_argument('--clients', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--cache', action='store_true',
+                        help="con la caché de fragmentos de AuthorTable")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.core.asgi import get_asgi_application
+    from django.core.wsgi import get_wsgi_application
+
+    from core.models import Author, Book
+
+    if not args.cache:
+        settings.AUTHOR_TABLE_CACHE_ALIAS = None
+    settings.REQUEST_METRICS_FLUSH_INTERVAL = None
+
+    seed_library(args.authors, args.books_per_author)
+    author = Author.objects.create(name='Autor editado')
+    Book.objects.bulk_create(
+        Book(author=author, title=f'Libro {i}', published_year=1900 + i % 120)
+        for i in range(args.edit_books)
+    )
+
+    wsgi, asgi = get_wsgi_application(), get_asgi_application()
+    cases = [
+        ('lista', '/authors', '/async/authors', 'sort=name'),
+        ('edición', f'/edit/{author.pk}/', f'/async/edit/{author.pk}/', ''),
+    ]
+    rows = []
+    for label, sync_path, async_path, query in cases:
+        for server, path, runner, app in (
+            ('WSGI', sync_path, run_wsgi, wsgi),
+            ('ASGI', sync_path, run_asgi, asgi),
+            ('ASGI', async_path, run_asgi, asgi),
+        ):
+            elapsed, latencies = runner(app, path, query, args.clients,
+                                        args.requests)
+            latencies.sort()
+            rows.append((
+                label, server, path, f'{args.requests / elapsed:.0f}',
+                f'{statistics.median(latencies):.0f}',
+                f'{latencies[int(0.95 * (len(latencies) - 1))]:.0f}',
+            ))
+
+    print(f'{args.authors} autores, {args.clients} clientes, '
+          f'{args.requests} peticiones por caso')
+    report(rows, ('vista', 'servidor', 'ruta', 'peticiones/s', 'p50 ms',
+                  'p95 ms'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Peticiones condicionales: latencia, consultas y bytes de la lista de
+autores y de la página de edición con una respuesta completa (200) y con
+una revalidación sin cambios (304, ``If-None-Match``).
+
+    python benchmarks/bench_conditional.py [--authors 100000] [--books 1000]
+                                           [--repeat 20]
+"""
+import argparse
+
+from _setup import report, seed_library, setup_django, timeit
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--authors', type=int, default=100_000)
+    parser.add_argument('--books', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.db import connection
+    from django.test import Client
+    from django.urls import reverse
+
+    from core.metrics import QueryRecorder
+    from core.models import Author, Book
+
+    seed_library(args.authors)
+    author = Author.objects.create(name='Autor con libros')
+    Book.objects.bulk_create(
+        (Book(author=author, title=f'Libro {i}', published_year=1900 + i % 120)
+         for i in range(args.books)),
+        batch_size=5000,
+    )
+    # sin la caché de la tabla, para ver el costo completo del render
+    settings.AUTHOR_TABLE_CACHE_ALIAS = None
+    client = Client()
+
+    rows = []
+    for label, url in (('lista', reverse('list_authors') + '?sort=name'),
+                       (f'editar ({args.books} libros)',
+                        reverse('edit_authors', args=[author.pk]))):
+        etag = client.get(url)['ETag']
+        for status, headers in (('200', {}), ('304', {'HTTP_IF_NONE_MATCH': etag})):
+            recorder = QueryRecorder()
+            with connection.execute_wrapper(recorder):
+                response = client.get(url, **headers)
+            assert str(response.status_code) == status, response.status_code
+            best, median = timeit(lambda: client.get(url, **headers),
+                                  args.repeat)
+            rows.append((label, status, recorder.count,
+                         len(response.content), f'{best:.1f}', f'{median:.1f}'))
+
+    print(f'{args.authors} autores')
+    report(rows, ('página', 'estado', 'consultas', 'bytes', 'mín ms',
+                  'mediana ms'))
+
+
+if __name__ == '__main__':
+    main()
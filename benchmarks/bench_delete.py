@@ -0,0 +1,62 @@
+"""
+Tiempo y memoria de borrar un autor con muchos libros: el collector de
+Django (``author.delete()``) contra ``core.deletion.delete_author``.
+
+    python benchmarks/bench_delete.py [--books 100000]
+"""
+import argparse
+import time
+import tracemalloc
+
+from _setup import report, setup_django
+
+
+def seed(n_books):
+    from core.models import Author, Book
+
+    author = Author.objects.create(name='Autor prolífico')
+    Book.objects.bulk_create(
+        (Book(author=author, title=f'Libro {i}', published_year=1900 + i % 120)
+         for i in range(n_books)),
+        batch_size=5000,
+    )
+    return author
+
+
+def measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--books', type=int, default=100_000)
+    parser.add_argument('--chunk-size', type=int, default=50_000)
+    args = parser.parse_args()
+
+    setup_django()
+    from core.deletion import delete_author
+
+    cases = (
+        ('collector', lambda a: a.delete()),
+        ('fast', lambda a: delete_author(a)),
+        (f'fast, tramos de {args.chunk_size}',
+         lambda a: delete_author(a, args.chunk_size)),
+    )
+    rows = []
+    for label, func in cases:
+        author = seed(args.books)
+        elapsed, peak = measure(lambda: func(author))
+        rows.append((label, f'{elapsed:.2f}', f'{peak:.1f}'))
+
+    print(f'autor con {args.books} libros')
+    report(rows, ('modo', 'segundos', 'memoria pico MiB'))
+
+
+if __name__ == '__main__':
+    main()
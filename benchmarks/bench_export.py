@@ -0,0 +1,72 @@
+"""
+Memoria máxima (RSS) de la exportación de la biblioteca.
+
+Compara ``export_library`` (streaming por tramos) con cargar todo en
+memoria antes de serializar. Cada variante corre en un proceso aparte para
+medir su propio pico de RSS.
+
+    python benchmarks/bench_export.py [--authors 100000] [--books-per-author 10]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+from _setup import report, seed_library, setup_django
+
+RUNNER = """
+import os, sys, resource
+sys.path.insert(0, {here!r})
+from _setup import setup_django
+setup_django({db!r})
+mode = {mode!r}
+if mode == 'streaming':
+    from django.core.management import call_command
+    call_command('export_library', '--format', 'jsonl', '--output', os.devnull)
+else:
+    import json
+    from core.models import Author
+    authors = list(Author.objects.prefetch_related('books'))
+    with open(os.devnull, 'w') as out:
+        for a in authors:
+            out.write(json.dumps({{'id': a.pk, 'name': a.name, 'books': [
+                {{'id': b.pk, 'title': b.title, 'published_year': b.published_year}}
+                for b in a.books.all()]}}) + '\\n')
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def run(mode, db_path):
+    code = RUNNER.format(here=os.path.dirname(os.path.abspath(__file__)),
+                         db=db_path, mode=mode)
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, '-c', code], check=True,
+                         capture_output=True, text=True).stdout
+    elapsed = time.perf_counter() - start
+    # ru_maxrss está en KiB en Linux
+    return int(out.split()[-1]) / 1024, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--authors', type=int, default=100_000)
+    parser.add_argument('--books-per-author', type=int, default=10)
+    parser.add_argument('--modes', default='streaming,naive')
+    args = parser.parse_args()
+
+    db_path = setup_django()
+    seed_library(args.authors, args.books_per_author)
+
+    rows = []
+    for mode in args.modes.split(','):
+        rss, elapsed = run(mode, db_path)
+        rows.append((mode, f'{rss:.0f}', f'{elapsed:.1f}'))
+
+    print(f'{args.authors} autores, '
+          f'{args.authors * args.books_per_author} libros')
+    report(rows, ('modo', 'RSS máx MiB', 'segundos'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Compara la latencia de la página 1 y la página 10.000 de ``AuthorList``
+con paginación por offset (django-tables2) y por cursor (keyset).
+
+    python benchmarks/bench_pagination.py [--authors 300000] [--page 10000]
+"""
+import argparse
+
+from _setup import report, seed_library, setup_django, timeit
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--authors', type=int, default=300_000)
+    parser.add_argument('--page', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.test import Client
+    from django.urls import reverse
+
+    from core.models import Author
+    from core.pagination import KeysetPaginator
+    from core.views import AuthorList
+
+    seed_library(args.authors)
+    client = Client()
+    url = reverse('list_authors')
+    per_page = AuthorList.keyset_per_page
+
+    # cursor equivalente al final de la página anterior a ``--page``
+    ordering = AuthorList.keyset_orderings['name']
+    offset = (args.page - 1) * per_page
+    last = Author.objects.order_by(*ordering)[offset - 1]
+    deep_cursor = KeysetPaginator(None, per_page, ordering).cursor_for(last)
+
+    rows = []
+    for mode in ('offset', 'keyset'):
+        settings.AUTHOR_LIST_PAGINATION = mode
+        # ambos modos ordenan por nombre, que es el orden de la tabla
+        cases = [('1', {'sort': 'name'})]
+        if mode == 'offset':
+            cases.append((str(args.page), {'sort': 'name', 'page': args.page}))
+        else:
+            cases.append((str(args.page), {'sort': 'name', 'after': deep_cursor}))
+        for label, params in cases:
+            best, median = timeit(lambda: client.get(url, params), args.repeat)
+            rows.append((mode, label, f'{best:.1f}', f'{median:.1f}'))
+
+    print(f'{args.authors} autores, {per_page} por página')
+    report(rows, ('modo', 'página', 'min ms', 'mediana ms'))
+
+
+if __name__ == '__main__':
+    main()
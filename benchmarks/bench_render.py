@@ -0,0 +1,79 @@
+"""
+Tiempo de render de ``edit_author.html`` con 10, 100 y 1000 filas de
+libros: filas con los widgets de Django (``book_rows_widgets.html``)
+contra las filas escritas a mano (``book_rows.html``), con y sin el
+cargador de plantillas en caché. Solo se mide el render; el formset y sus
+formularios se construyen antes.
+
+    python benchmarks/bench_render.py [--rows 10 100 1000] [--repeat 5]
+"""
+import argparse
+
+from _setup import report, setup_django, timeit
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.template import Context
+    from django.template.backends.django import DjangoTemplates
+
+    from core.forms import AuthorForm, BookFormSet
+    from core.models import Author, Book
+
+    def make_engine(loaders):
+        config = settings.TEMPLATES[0]
+        return DjangoTemplates({
+            'NAME': 'bench', 'DIRS': config['DIRS'], 'APP_DIRS': False,
+            'OPTIONS': {**config['OPTIONS'], 'loaders': loaders},
+        }).engine
+
+    app_loaders = ['django.template.loaders.filesystem.Loader',
+                   'django.template.loaders.app_directories.Loader']
+    engines = {
+        'sin caché': make_engine(app_loaders),
+        'en caché': make_engine([('django.template.loaders.cached.Loader',
+                             app_loaders)]),
+    }
+
+    rows = []
+    for n in args.rows:
+        author = Author.objects.create(name=f'Autor con {n} libros')
+        Book.objects.bulk_create(
+            Book(author=author, title=f'Libro {i}', published_year=1900 + i)
+            for i in range(n)
+        )
+        formset = BookFormSet(instance=author, prefix='authorbook_set')
+        formset.forms  # noqa: B018 -- construir los formularios fuera del tiempo
+        context = {'form': AuthorForm(instance=author), 'formset': formset,
+                   'object': author, 'forms': formset.forms,
+                   'csrf_token': 'bench'}
+
+        for engine_label, engine in engines.items():
+            page = engine.get_template('core/edit_author.html')
+            for rows_label, name in (('widgets', 'core/book_rows_widgets.html'),
+                                     ('a mano', 'core/book_rows.html')):
+                def render_rows():
+                    # get_template por render, como hace {% include %}
+                    engine.get_template(name).render(Context(context))
+
+                best, median = timeit(render_rows, args.repeat)
+                rows.append((n, engine_label, rows_label,
+                             f'{best:.1f}', f'{median:.1f}'))
+            best, median = timeit(
+                lambda: page.render(Context(context, autoescape=True)),
+                args.repeat,
+            )
+            rows.append((n, engine_label, 'página completa',
+                         f'{best:.1f}', f'{median:.1f}'))
+
+    report(rows, ('filas', 'cargador', 'plantilla', 'mín ms', 'mediana ms'))
+
+
+if __name__ == '__main__':
+    main()
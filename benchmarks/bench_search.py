@@ -0,0 +1,132 @@
+"""
+Latencia de la búsqueda de autores (``core.search``) sobre una biblioteca
+grande: por defecto 50.000 autores y 1.000.000 de libros con títulos de
+tres palabras tomadas de un vocabulario sintético, para que cada término
+tenga una selectividad realista. Mide la búsqueda sola y la página
+``/authors?q=`` completa (sin caché de la tabla), contra un objetivo de
+50 ms, y compara con ``icontains`` sobre la misma base.
+
+    python benchmarks/bench_search.py [--authors 50000] [--books 1000000]
+                                      [--repeat 20] [--target 50]
+"""
+import argparse
+import random
+import statistics
+import time
+
+from _setup import report, setup_django
+
+SYLLABLES = ['ba', 'ce', 'di', 'fo', 'gu', 'la', 'me', 'ni', 'po', 'ru',
+             'sa', 'te', 'vi', 'zo', 'mar', 'len', 'tor', 'quin', 'bel', 'dra']
+
+
+def vocabulary(rng, size):
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(SYLLABLES)
+                          for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def seed(n_authors, n_books, rng, batch_size=10_000):
+    from core.models import Author, Book
+
+    first = vocabulary(rng, 2_000)
+    last = vocabulary(rng, 5_000)
+    words = vocabulary(rng, 20_000)
+    Author.objects.bulk_create(
+        (Author(name=f'{rng.choice(first).title()} {rng.choice(last).title()}')
+         for _ in range(n_authors)),
+        batch_size=batch_size,
+    )
+    pks = list(Author.objects.values_list('pk', flat=True))
+    for start in range(0, n_books, batch_size):
+        Book.objects.bulk_create(
+            Book(author_id=rng.choice(pks),
+                 title=' '.join(rng.choice(words) for _ in range(3)).capitalize(),
+                 published_year=rng.randint(1900, 2020))
+            for _ in range(min(batch_size, n_books - start))
+        )
+    Author.objects.rebuild_book_stats()
+    return words
+
+
+def sample(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return (statistics.median(samples),
+            samples[max(0, int(len(samples) * 0.95) - 1)])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--authors', type=int, default=50_000)
+    parser.add_argument('--books', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--target', type=float, default=50.0,
+                        help='objetivo de p95 en ms')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.db.models import Q
+    from django.test import Client
+    from django.urls import reverse
+
+    from core import search
+    from core.models import Author
+
+    rng = random.Random(0)
+    start = time.perf_counter()
+    words = seed(args.authors, args.books, rng)
+    print(f'{args.authors} autores, {args.books} libros cargados e indexados '
+          f'en {time.perf_counter() - start:.1f} s')
+
+    author = Author.objects.order_by('?').first()
+    word = rng.choice(words)
+    queries = [
+        ('palabra', word),
+        ('prefijo 3 letras', word[:3]),
+        ('dos palabras', f'{word} {rng.choice(words)[:4]}'),
+        ('nombre de autor', author.name),
+        ('apellido, prefijo', author.name.split()[-1][:4]),
+    ]
+
+    settings.AUTHOR_TABLE_CACHE_ALIAS = None
+    client = Client()
+    url = reverse('list_authors')
+
+    rows = []
+    for label, query in queries:
+        results = len(search.search(query))
+        search_p50, search_p95 = sample(lambda: search.search(query),
+                                        args.repeat)
+        page_p50, page_p95 = sample(lambda: client.get(url, {'q': query}),
+                                    args.repeat)
+
+        def contains():
+            condition = Q()
+            for term in search.terms(query):
+                condition &= (Q(name__icontains=term)
+                              | Q(books__title__icontains=term))
+            list(Author.objects.filter(condition).values_list('pk', flat=True)
+                 .distinct()[:search.DEFAULT_LIMIT])
+
+        contains_p50, _ = sample(contains, max(1, args.repeat // 10))
+        rows.append((label, query, results,
+                     f'{search_p50:.1f}', f'{search_p95:.1f}',
+                     'ok' if search_p95 <= args.target else 'NO',
+                     f'{page_p50:.1f}', f'{page_p95:.1f}',
+                     f'{contains_p50:.1f}'))
+
+    report(rows, ('consulta', 'texto', 'autores', 'p50 ms', 'p95 ms',
+                  f'<= {args.target:g} ms', 'página p50', 'página p95',
+                  'icontains p50'))
+
+
+if __name__ == '__main__':
+    main()
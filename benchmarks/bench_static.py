@@ -0,0 +1,117 @@
+"""
+Bytes y peticiones por carga de página para los estáticos propios, en frío
+(caché del navegador vacía) y en caliente (segunda visita), comparando:
+
+* ``sin hash``: ``StaticFilesStorage`` servido por
+  ``django.contrib.staticfiles.views.serve``: sin comprimir y sin
+  ``Cache-Control``, así que en caliente el navegador revalida cada archivo
+  (``If-Modified-Since`` → 304).
+* ``manifest``: ``CompressedManifestStaticFilesStorage`` +
+  ``StaticFilesMiddleware``: nombres con hash, variante gzip/brotli y
+  ``immutable``, así que en caliente no hay peticiones.
+
+El HTML cuenta en ambos casos; los archivos de CDNs externos (Bootstrap,
+Font Awesome) se listan aparte y no se miden.
+
+    python benchmarks/bench_static.py [--accept-encoding "br, gzip"]
+"""
+import argparse
+import re
+import tempfile
+
+from _setup import report, setup_django
+
+LOCAL = re.compile(r'(?:src|href)="(/static/[^"]+)"')
+EXTERNAL = re.compile(r'(?:src|href)="((?:https?:)?//[^"]+)"')
+
+
+class Browser:
+    """Caché HTTP mínima: guarda Cache-Control y Last-Modified por URL."""
+
+    def __init__(self, fetch):
+        self.fetch = fetch
+        self.cache = {}
+
+    def load(self, asset):
+        """Devuelve (peticiones, bytes) que cuesta obtener ``asset``."""
+        cached = self.cache.get(asset)
+        if cached is not None and 'immutable' in cached.get('Cache-Control', ''):
+            return 0, 0
+        headers = {}
+        if cached is not None and cached.has_header('Last-Modified'):
+            headers['HTTP_IF_MODIFIED_SINCE'] = cached['Last-Modified']
+        response = self.fetch(asset, headers)
+        assert response.status_code in (200, 304), (asset, response.status_code)
+        if response.status_code == 200:
+            self.cache[asset] = response
+        if response.streaming:
+            return 1, sum(len(chunk) for chunk in response.streaming_content)
+        return 1, len(response.content)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--accept-encoding', default='br, gzip, deflate')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.contrib.staticfiles.views import serve
+    from django.core.management import call_command
+    from django.http import HttpResponseNotFound
+    from django.test import Client, RequestFactory, override_settings
+    from django.urls import reverse
+
+    from core.middleware import StaticFilesMiddleware
+    from core.models import Author, Book
+
+    author = Author.objects.create(name='Autor con libros')
+    Book.objects.bulk_create(Book(author=author, title=f'Libro {i}',
+                                  published_year=2000) for i in range(10))
+    pages = (('lista', reverse('list_authors')),
+             ('editar', reverse('edit_authors', args=[author.pk])))
+    factory = RequestFactory(HTTP_ACCEPT_ENCODING=args.accept_encoding)
+
+    def plain(url, headers):
+        request = factory.get(url, **headers)
+        return serve(request, url[len(settings.STATIC_URL):], insecure=True)
+
+    manifest_storages = {
+        **settings.STORAGES,
+        'staticfiles': {
+            'BACKEND': 'core.storage.CompressedManifestStaticFilesStorage'},
+    }
+    root = tempfile.mkdtemp(prefix='bench-static-')
+    with override_settings(STATIC_ROOT=root, STORAGES=manifest_storages):
+        call_command('collectstatic', interactive=False, verbosity=0)
+        middleware = StaticFilesMiddleware(lambda request: HttpResponseNotFound())
+
+    def hashed(url, headers):
+        return middleware(factory.get(url, **headers))
+
+    rows = []
+    for label, storages, fetch in (('sin hash', settings.STORAGES, plain),
+                                   ('manifest', manifest_storages, hashed)):
+        # con DEBUG el manifiesto no reescribe los nombres
+        with override_settings(STATIC_ROOT=root, STORAGES=storages,
+                               DEBUG=False):
+            for page, url in pages:
+                html = Client().get(url).content.decode()
+                assets = LOCAL.findall(html)
+                external = len(set(EXTERNAL.findall(html)))
+                browser = Browser(fetch)
+                for visit in ('frío', 'caliente'):
+                    requests, size = 1, len(html)
+                    for asset in assets:
+                        count, transferred = browser.load(asset)
+                        requests += count
+                        size += transferred
+                    rows.append((page, label, visit, requests, size, external))
+
+    print(f'Accept-Encoding: {args.accept_encoding}')
+    report(rows, ('página', 'estáticos', 'visita', 'peticiones', 'bytes',
+                  'externas (CDN)'))
+
+
+if __name__ == '__main__':
+    main()
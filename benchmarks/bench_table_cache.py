@@ -0,0 +1,64 @@
+"""
+Peticiones por segundo de ``AuthorList`` con y sin la caché de fragmentos
+de ``AuthorTable``. Se recorren las primeras ``--pages`` páginas en ciclo,
+como haría un tablero que refresca la lista.
+
+    python benchmarks/bench_table_cache.py [--authors 20000] [--requests 500]
+"""
+import argparse
+import time
+
+from _setup import report, seed_library, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--authors', type=int, default=20_000)
+    parser.add_argument('--books-per-author', type=int, default=5)
+    parser.add_argument('--pages', type=int, default=10)
+    parser.add_argument('--requests', type=int, default=500)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.test import Client
+    from django.urls import reverse
+
+    from core import table_cache
+    from core.models import Author
+    from core.pagination import KeysetPaginator
+    from core.views import AuthorList
+
+    seed_library(args.authors, args.books_per_author)
+    client = Client()
+    url = reverse('list_authors')
+
+    # cursores de las primeras páginas
+    paginator = KeysetPaginator(Author.objects.all(), AuthorList.keyset_per_page,
+                                AuthorList.keyset_orderings['name'])
+    pages, params = [], {'sort': 'name'}
+    for _ in range(args.pages):
+        pages.append(params)
+        page = paginator.page(after=params.get('after'))
+        if not page.has_next():
+            break
+        params = {'sort': 'name', 'after': page.next_cursor}
+
+    rows = []
+    for label, alias in (('sin caché', None), ('con caché', 'default')):
+        settings.AUTHOR_TABLE_CACHE_ALIAS = alias
+        table_cache.stats.clear()
+        start = time.perf_counter()
+        for i in range(args.requests):
+            client.get(url, pages[i % len(pages)])
+        elapsed = time.perf_counter() - start
+        rows.append((label, f'{args.requests / elapsed:.0f}',
+                     table_cache.stats['hits'], table_cache.stats['misses']))
+
+    print(f'{args.authors} autores, {len(pages)} páginas, '
+          f'{args.requests} peticiones')
+    report(rows, ('modo', 'peticiones/s', 'hits', 'misses'))
+
+
+if __name__ == '__main__':
+    main()
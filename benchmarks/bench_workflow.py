@@ -0,0 +1,234 @@
+"""
+Carga del flujo completo de autores con el cliente de pruebas de Django:
+lista, crear con N libros, editar con N libros (GET, POST completo y
+POST incremental que cambia una fila) y borrar.
+
+Por flujo y por tamaño se informa la latencia p50/p95, las consultas por
+petición y el pico de memoria (tracemalloc, en una pasada aparte para no
+distorsionar la latencia). Los resultados se escriben en JSON; con
+``--baseline`` se comparan contra una corrida anterior y el script termina
+con código 1 si la mediana de algún flujo empeora más que ``--tolerance``
+o si hace más consultas.
+
+    python benchmarks/bench_workflow.py [--authors 10000] [--books 10 100 1000]
+        [--requests 20] [--output bench_workflow.json] [--baseline old.json]
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from _setup import ROOT, report, seed_library, setup_django
+
+PREFIX = 'authorbook_set'
+
+
+def percentile(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, round(q * (len(samples) - 1)))]
+
+
+def book_rows(n_books, books=(), author_pk='', suffix=''):
+    """Datos del formset: ``books`` existentes más filas nuevas hasta ``n``."""
+    books = list(books)
+    data = {
+        f'{PREFIX}-TOTAL_FORMS': str(max(n_books, len(books))),
+        f'{PREFIX}-INITIAL_FORMS': str(len(books)),
+        f'{PREFIX}-MIN_NUM_FORMS': '0',
+        f'{PREFIX}-MAX_NUM_FORMS': '1000',
+    }
+    for i in range(max(n_books, len(books))):
+        book = books[i] if i < len(books) else None
+        data[f'{PREFIX}-{i}-id'] = str(book.pk) if book else ''
+        data[f'{PREFIX}-{i}-author'] = str(author_pk)
+        data[f'{PREFIX}-{i}-title'] = f'Libro {i}{suffix}'
+        data[f'{PREFIX}-{i}-published_year'] = str(1900 + i % 120)
+    return data
+
+
+def seed_author(n_books, name):
+    from core.models import Author, Book
+
+    author = Author.objects.create(name=name)
+    Book.objects.bulk_create(
+        (Book(author=author, title=f'Libro {i}', published_year=1900 + i % 120)
+         for i in range(n_books)),
+        batch_size=5000,
+    )
+    return author
+
+
+def flows(client, n_books, count):
+    """
+    Devuelve ``{flujo: [petición, ...]}`` con ``count`` peticiones
+    preparadas por flujo; cada petición es una función sin argumentos.
+    """
+    from django.urls import reverse
+
+    edited = seed_author(n_books, 'Autor editado')
+    edit_url = reverse('edit_authors', args=[edited.pk])
+    books = list(edited.books.order_by('published_year', 'id'))
+    doomed = [seed_author(n_books, f'Autor borrado {i}') for i in range(count)]
+
+    def create(i):
+        return lambda: client.post(reverse('create_authors'), {
+            'name': f'Autor nuevo {i}', **book_rows(n_books),
+        })
+
+    def edit_post(i):
+        # alterna el título para que todas las filas cambien
+        return lambda: client.post(edit_url, {
+            'name': 'Autor editado',
+            **book_rows(n_books, books, edited.pk, suffix=f' ({i % 2})'),
+        })
+
+    def edit_post_delta(i):
+        # envío incremental: management form y solo la fila que cambia
+        rows = book_rows(1, books[:1], edited.pk, suffix=f' ({i % 2})')
+        rows[f'{PREFIX}-INITIAL_FORMS'] = rows[f'{PREFIX}-TOTAL_FORMS'] = \
+            str(len(books))
+        return lambda: client.post(edit_url, {
+            'name': 'Autor editado', f'{PREFIX}-DELTA': '1', **rows,
+        })
+
+    def delete(author):
+        return lambda: client.post(reverse('delete_authors', args=[author.pk]))
+
+    return {
+        'list': [lambda: client.get(reverse('list_authors'),
+                                    {'sort': 'name'})] * count,
+        'create': [create(i) for i in range(count)],
+        'edit_get': [lambda: client.get(edit_url)] * count,
+        'edit_post': [edit_post(i) for i in range(count)],
+        'edit_post_delta': [edit_post_delta(i) for i in range(count)],
+        'delete': [delete(author) for author in doomed],
+    }
+
+
+def run(requests, memory_samples):
+    from django.db import connection
+
+    from core.metrics import QueryRecorder
+
+    latencies, queries = [], []
+    for request in requests[:len(requests) - memory_samples]:
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            start = time.perf_counter()
+            response = request()
+            latencies.append((time.perf_counter() - start) * 1000)
+        assert response.status_code in (200, 302), response.status_code
+        queries.append(recorder.count)
+
+    peak = 0
+    tracemalloc.start()
+    for request in requests[len(requests) - memory_samples:]:
+        tracemalloc.reset_peak()
+        request()
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+
+    return {
+        'requests': len(latencies),
+        'p50_ms': round(statistics.median(latencies), 2),
+        'p95_ms': round(percentile(latencies, 0.95), 2),
+        'queries': max(queries),
+        'peak_kib': round(peak / 1024),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Filas de comparación y si hubo alguna regresión."""
+    rows, regressed = [], False
+    for key, current in results.items():
+        old = baseline.get(key)
+        if old is None:
+            continue
+        # p50: con pocas peticiones p95 es demasiado ruidoso para comparar
+        ratio = current['p50_ms'] / old['p50_ms'] if old['p50_ms'] else 1
+        worse = ratio > 1 + tolerance or current['queries'] > old['queries']
+        regressed |= worse
+        rows.append((key, f"{old['p50_ms']:.1f}", f"{current['p50_ms']:.1f}",
+                     f'{ratio:.2f}x', f"{old['queries']}→{current['queries']}",
+                     'REGRESIÓN' if worse else 'ok'))
+    return rows, regressed
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--authors', type=int, default=10_000)
+    parser.add_argument('--books-per-author', type=int, default=5)
+    parser.add_argument('--books', type=int, nargs='+', default=[10, 100, 1000],
+                        help="libros por autor en crear/editar/borrar")
+    parser.add_argument('--requests', type=int, default=20)
+    parser.add_argument('--memory-samples', type=int, default=2)
+    parser.add_argument('--output', default='bench_workflow.json')
+    parser.add_argument('--baseline', default=None)
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="aumento relativo de p50 aceptado")
+    args = parser.parse_args()
+
+    setup_django()
+    import django
+    from django.conf import settings
+    from django.test import Client
+
+    # se mide el camino de la tabla y del formset, no la caché ni las
+    # métricas del middleware
+    settings.AUTHOR_TABLE_CACHE_ALIAS = None
+    settings.REQUEST_METRICS_FLUSH_INTERVAL = None
+
+    seed_library(args.authors, args.books_per_author)
+    client = Client()
+    # primera petición: carga de plantillas, URLconf y conexión
+    client.get('/authors')
+
+    results = {}
+    for n_books in args.books:
+        count = args.requests + args.memory_samples
+        prepared = flows(client, n_books, count)
+        for name, requests in prepared.items():
+            results[f'{name}[{n_books}]'] = run(requests, args.memory_samples)
+
+    report([(key, r['p50_ms'], r['p95_ms'], r['queries'], r['peak_kib'])
+            for key, r in results.items()],
+           ('flujo[libros]', 'p50 ms', 'p95 ms', 'consultas', 'pico KiB'))
+
+    output = {
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'args': vars(args),
+        'results': results,
+    }
+    with open(args.output, 'w') as fh:
+        json.dump(output, fh, indent=2)
+    print(f'resultados en {args.output}')
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+        rows, regressed = compare(results, baseline['results'], args.tolerance)
+        print(f"\ncontra {baseline.get('revision') or args.baseline}")
+        report(rows, ('flujo[libros]', 'p50 antes', 'p50 ahora', 'razón',
+                      'consultas', ''))
+        if regressed:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
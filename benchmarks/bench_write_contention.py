@@ -0,0 +1,114 @@
+"""
+Contención de escrituras en SQLite con varios procesos: cada proceso crea
+autores con N libros por la vista de creación (formset + ``bulk_save``),
+todos contra el mismo archivo. Se compara el perfil de desarrollo (journal
+por defecto, ``BEGIN`` diferido) con el de producción
+(``DJANGO_PROFILE=production``: WAL, ``BEGIN IMMEDIATE``, ``busy_timeout``).
+
+    python benchmarks/bench_write_contention.py [--processes 8] [--saves 50]
+        [--books 20]
+"""
+import argparse
+import multiprocessing
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+from _setup import report, setup_django
+
+PREFIX = 'authorbook_set'
+
+
+def create_data(name, n_books):
+    data = {
+        'name': name,
+        f'{PREFIX}-TOTAL_FORMS': str(n_books),
+        f'{PREFIX}-INITIAL_FORMS': '0',
+        f'{PREFIX}-MIN_NUM_FORMS': '0',
+        f'{PREFIX}-MAX_NUM_FORMS': '1000',
+    }
+    for i in range(n_books):
+        data[f'{PREFIX}-{i}-title'] = f'Libro {i}'
+        data[f'{PREFIX}-{i}-published_year'] = str(1900 + i % 120)
+    return data
+
+
+def worker(profile, db_path, number, saves, n_books, start_at, results):
+    os.environ['DJANGO_PROFILE'] = profile
+    os.environ.setdefault('DJANGO_SECRET_KEY', 'bench')
+    setup_django(db_path, migrate=False)
+    from django.conf import settings
+    from django.db import OperationalError
+    from django.test import Client
+
+    settings.REQUEST_METRICS_FLUSH_INTERVAL = None
+    client = Client()
+    ok, locked, latencies = 0, 0, []
+    # arrancar todos a la vez
+    time.sleep(max(0, start_at - time.time()))
+    for i in range(saves):
+        start = time.perf_counter()
+        try:
+            response = client.post('/create',
+                                   create_data(f'Autor {number}-{i}', n_books))
+            assert response.status_code == 302, response.status_code
+            ok += 1
+        except OperationalError as exc:
+            if 'locked' not in str(exc):
+                raise
+            locked += 1
+        latencies.append((time.perf_counter() - start) * 1000)
+    results.put((ok, locked, latencies))
+
+
+def run(profile, db_path, args):
+    ctx = multiprocessing.get_context('spawn')
+    results = ctx.Queue()
+    start_at = time.time() + 3
+    processes = [
+        ctx.Process(target=worker, args=(profile, db_path, number, args.saves,
+                                         args.books, start_at, results))
+        for number in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    elapsed = time.time() - start_at
+
+    ok = sum(r[0] for r in collected)
+    locked = sum(r[1] for r in collected)
+    latencies = sorted(ms for r in collected for ms in r[2])
+    return (profile, ok, locked, f'{ok / elapsed:.1f}',
+            f'{statistics.median(latencies):.0f}',
+            f'{latencies[int(0.95 * (len(latencies) - 1))]:.0f}')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--processes', type=int, default=8)
+    parser.add_argument('--saves', type=int, default=50,
+                        help="autores creados por proceso")
+    parser.add_argument('--books', type=int, default=20)
+    args = parser.parse_args()
+
+    # la base se migra una vez y se copia para cada perfil, antes de que
+    # el perfil de producción la pase a WAL
+    template = setup_django()
+    rows = []
+    for profile in ('development', 'production'):
+        db_path = os.path.join(tempfile.mkdtemp(prefix='bench-'), 'db.sqlite3')
+        shutil.copy(template, db_path)
+        rows.append(run(profile, db_path, args))
+
+    print(f'{args.processes} procesos x {args.saves} autores con '
+          f'{args.books} libros')
+    report(rows, ('perfil', 'guardados', '"database is locked"',
+                  'guardados/s', 'p50 ms', 'p95 ms'))
+
+
+if __name__ == '__main__':
+    main()
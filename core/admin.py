@@ -2,5 +2,22 @@ from django.contrib import admin
 from .models import Author, Book
 
 # Register your models here.
-admin.site.register(Author)
-admin.site.register(Book)
\ No newline at end of file
+@admin.register(Author)
+class AuthorAdmin(admin.ModelAdmin):
+    list_display = ('name',)
+    # búsqueda por prefijo, usa core_author_name_idx
+    search_fields = ('^name',)
+    ordering = ('name', 'id')
+    # evita el COUNT(*) sin filtros en cada página del changelist
+    show_full_result_count = False
+
+
+@admin.register(Book)
+class BookAdmin(admin.ModelAdmin):
+    list_display = ('title', 'author', 'published_year')
+    # Book.__str__ y la columna author leen author.name
+    list_select_related = ('author',)
+    # un <select> cargaría todos los autores en cada formulario
+    autocomplete_fields = ('author',)
+    search_fields = ('^title', '^author__name')
+    show_full_result_count = False
@@ -1,6 +1,23 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
+
+
+def install_search(sender, using, **kwargs):
+    from core import search
+
+    search.install(using)
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from core import metrics, signals  # noqa: F401
+
+        # índices de búsqueda que no se declaran en los modelos (core.search)
+        post_migrate.connect(install_search, sender=self)
+        # consultas y renders por petición (core.metrics.recording)
+        connection_created.connect(metrics.install_recorder)
+        metrics.instrument_templates()
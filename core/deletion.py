@@ -0,0 +1,70 @@
+"""
+Borrado de autores con muchos libros.
+
+``Author.delete()`` pasa por el collector de Django, que para el
+``on_delete=CASCADE`` carga en memoria todos los libros del autor antes de
+borrarlos (``Book`` tiene receptores de ``post_delete``, así que no puede
+usar el borrado rápido). Aquí los libros se borran con ``DELETE ... WHERE
+author_id = ...`` —en tramos si se indica ``chunk_size``— y solo después
+el autor, que ya no tiene nada que arrastrar.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connections, router, transaction
+
+from core.models import Author, Book
+from core.table_cache import schedule_bump
+
+# un solo hilo: los borrados diferidos se ejecutan de a uno
+background = ThreadPoolExecutor(max_workers=1,
+                                thread_name_prefix='core-author-delete')
+
+
+def delete_author(author, chunk_size=None):
+    """
+    Borra ``author`` y sus libros; devuelve la cantidad de libros borrados.
+
+    Sin ``chunk_size`` todo ocurre en una transacción. Con ``chunk_size``
+    los libros se borran en tramos de ese tamaño, cada uno en su propia
+    transacción, para no mantener bloqueos largos; si el proceso se
+    interrumpe, el autor sigue existiendo y el borrado puede repetirse.
+    """
+    using = router.db_for_write(Author, instance=author)
+    books = Book.objects.using(using).filter(author_id=author.pk)
+    deleted = 0
+
+    if chunk_size:
+        ordered = books.order_by('pk').values_list('pk', flat=True)
+        while True:
+            with transaction.atomic(using=using):
+                # pk del último libro del tramo; si no hay tramo completo,
+                # lo que queda se borra junto con el autor
+                boundary = list(ordered[chunk_size - 1:chunk_size])
+                if not boundary:
+                    break
+                chunk = books.filter(pk__lte=boundary[0]).fast_delete()
+                deleted += chunk
+                # mientras tanto el autor sigue en la lista con lo que le queda
+                Author.objects.using(using).filter(pk=author.pk).books_changed(
+                    unknown_removed=chunk)
+                schedule_bump(using)
+
+    with transaction.atomic(using=using):
+        deleted += books.fast_delete()
+        author.delete(using=using)
+        schedule_bump(using)
+    return deleted
+
+
+def delete_author_in_background(author_pk, chunk_size=None):
+    """Encola el borrado del autor en el hilo de borrados diferidos."""
+    def run():
+        try:
+            author = Author.objects.filter(pk=author_pk).first()
+            if author is not None:
+                delete_author(author, chunk_size)
+        finally:
+            # las conexiones son por hilo; cerrar las de este
+            connections.close_all()
+
+    return background.submit(run)
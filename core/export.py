@@ -0,0 +1,80 @@
+"""
+Exportación en streaming de autores con sus libros (CSV y JSONL).
+
+Los autores se recorren con ``.iterator(chunk_size=...)`` y los libros de
+cada tramo se traen con un único ``prefetch_related``, de modo que la
+memoria usada depende del tamaño del tramo y no del total de filas.
+"""
+import csv
+import json
+from pathlib import Path
+
+from django.db.models import Prefetch
+
+from core.models import Author, Book
+
+CSV_HEADER = ('author_id', 'author_name', 'book_id', 'title', 'published_year')
+FORMATS = ('csv', 'jsonl')
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+}
+
+
+def guess_format(path):
+    """Formato según la extensión del archivo (``.json``/``.ndjson`` → jsonl)."""
+    suffix = Path(path).suffix.lstrip('.').lower()
+    return 'jsonl' if suffix in ('json', 'ndjson') else suffix
+
+
+class Echo:
+    """Pseudo-buffer para ``csv.writer`` que devuelve lo escrito."""
+
+    def write(self, value):
+        return value
+
+
+def iter_authors(queryset=None, chunk_size=2000):
+    if queryset is None:
+        queryset = Author.objects.all()
+    books = Book.objects.order_by('published_year', 'id')
+    return (
+        queryset.order_by('pk')
+        .prefetch_related(Prefetch('books', queryset=books))
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def csv_lines(authors):
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_HEADER)
+    for author in authors:
+        books = author.books.all()
+        if not books:
+            yield writer.writerow((author.pk, author.name, '', '', ''))
+        for book in books:
+            yield writer.writerow((author.pk, author.name, book.pk,
+                                   book.title, book.published_year))
+
+
+def jsonl_lines(authors):
+    for author in authors:
+        yield json.dumps({
+            'id': author.pk,
+            'name': author.name,
+            'books': [
+                {'id': book.pk, 'title': book.title,
+                 'published_year': book.published_year}
+                for book in author.books.all()
+            ],
+        }, ensure_ascii=False) + '\n'
+
+
+def export_lines(fmt, queryset=None, chunk_size=2000):
+    """Generador de líneas de texto de la exportación en formato ``fmt``."""
+    authors = iter_authors(queryset, chunk_size)
+    if fmt == 'csv':
+        return csv_lines(authors)
+    if fmt == 'jsonl':
+        return jsonl_lines(authors)
+    raise ValueError(f"Formato de exportación desconocido: {fmt}")
@@ -1,8 +1,21 @@
+import codecs
+import re
+
 from django import forms
+from django.conf import settings
+from django.db import router, transaction
 from django.urls import reverse
 from django.utils.translation import gettext as _
-from django.forms.models import inlineformset_factory
+from django.forms.models import (
+    BaseInlineFormSet,
+    ModelChoiceField,
+    inlineformset_factory,
+)
+from django.utils.functional import cached_property
+from core.concurrency import EditConflict, versioned_delete, versioned_update
+from core.export import guess_format
 from core.models import Author, Book
+from core.table_cache import schedule_bump
 from crispy_forms.helper import FormHelper
 from crispy_forms.layout import HTML, Column, Div, Layout, Row, Submit
 
@@ -12,25 +25,458 @@ class ConfirmDeleteForm(forms.ModelForm):
         fields = []
         
         
-class AuthorForm(forms.ModelForm):
+class VersionedModelForm(forms.ModelForm):
+    """
+    Envía en un campo oculto la ``version`` de la fila que se mostró (ver
+    ``core.concurrency``). Si no se envía se usa la leída al procesar la
+    petición, es decir, ese envío no se controla.
+    """
+    version = forms.IntegerField(widget=forms.HiddenInput, required=False,
+                                 min_value=0)
+
+    def clean_version(self):
+        version = self.cleaned_data['version']
+        if version is not None:
+            self.instance.version = version
+        return self.instance.version
+
+    @property
+    def changed_fields(self):
+        """``changed_data`` sin ``version``, que no es un cambio del usuario."""
+        return [name for name in self.changed_data if name != 'version']
+
+
+class AuthorForm(VersionedModelForm):
     name = forms.CharField(max_length=100, label="Nombre")
 
+    # se arma una sola vez; ``{% crispy form %}`` lo reutiliza en cada
+    # render en vez de construir un helper por defecto
+    helper = FormHelper()
+    helper.form_tag = False
+    helper.disable_csrf = True
+    helper.layout = Layout('name', 'version')
+
+    def versioned_save(self):
+        """
+        Guarda el autor. Al editar, solo si cambió algún campo y con un
+        ``UPDATE`` condicionado a la versión; levanta ``EditConflict`` si
+        otra persona lo guardó antes.
+        """
+        author = self.save(commit=False)
+        if author._state.adding:
+            author.save()
+            return author
+        fields = self.changed_fields
+        if fields and not versioned_update(
+                type(author)._default_manager.all(), [author], fields):
+            raise EditConflict(type(author), [(None, author)])
+        return author
+
     class Meta:
         model = Author
         fields = (
             'name',
         )
         
-class BookForm(forms.ModelForm):
+class LibraryImportForm(forms.Form):
+    file = forms.FileField(label="Archivo")
+    format = forms.ChoiceField(
+        label="Formato",
+        choices=(('', "Según la extensión"), ('csv', 'CSV'), ('jsonl', 'JSONL')),
+        required=False,
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        upload = cleaned_data.get('file')
+        if upload and not cleaned_data.get('format'):
+            fmt = guess_format(upload.name)
+            if fmt not in ('csv', 'jsonl'):
+                raise forms.ValidationError(
+                    "No se puede deducir el formato del archivo")
+            cleaned_data['format'] = fmt
+        if upload and not is_utf8(upload):
+            self.add_error('file', "El archivo no está codificado en UTF-8")
+        return cleaned_data
+
+
+def is_utf8(upload):
+    """
+    Decodifica el archivo subido por bloques antes de importar nada: un
+    error de codificación a mitad de la importación dejaría confirmados
+    los tramos anteriores.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    try:
+        for chunk in upload.chunks():
+            decoder.decode(chunk)
+        decoder.decode(b'', final=True)
+    except UnicodeDecodeError:
+        return False
+    finally:
+        upload.seek(0)
+    return True
+
+        
+class BookForm(VersionedModelForm):
     class Meta:
         model = Book
         exclude = ()
-        
-        
+
+
+class ExistingObjectChoiceField(ModelChoiceField):
+    """
+    Campo oculto del pk que resuelve el valor contra los objetos que el
+    formset ya cargó, en vez de hacer un ``queryset.get()`` por fila.
+    Un pk válido que ya no está (otra persona borró el libro) da un error
+    con código ``deleted``, que ``BaseBookFormSet.raise_for_deleted_rows``
+    convierte en conflicto.
+    """
+
+    def __init__(self, formset, *args, **kwargs):
+        self.formset = formset
+        super().__init__(*args, **kwargs)
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            pk = self.formset._pk_field.to_python(value)
+        except forms.ValidationError:
+            pk = None
+        if pk is None:
+            raise forms.ValidationError(
+                self.error_messages['invalid_choice'],
+                code='invalid_choice',
+                params={'value': value},
+            )
+        obj = self.formset._existing_object(pk)
+        if obj is None:
+            raise forms.ValidationError(
+                "Another user deleted this book.", code='deleted')
+        return obj
+
+
+class RowWindow(list):
+    """
+    Tramo de libros existentes que se indexa con el índice global de la
+    fila en el formset, para que ``_construct_form(i)`` encuentre su libro.
+    """
+
+    def __init__(self, rows, start):
+        super().__init__(rows)
+        self.start = start
+
+    def __getitem__(self, index):
+        if isinstance(index, int):
+            index -= self.start
+            if index < 0:
+                raise IndexError(index)
+        return super().__getitem__(index)
+
+
+def posted_rows(data, prefix):
+    """Índices de las filas del formset presentes en ``data``."""
+    pattern = re.compile(rf'^{re.escape(prefix)}-(\d+)-')
+    return sorted({int(m.group(1)) for m in map(pattern.match, data) if m})
+
+
+# marca de un envío incremental: ``<prefix>-DELTA=1``
+DELTA_FIELD = 'DELTA'
+
+
+def submitted_rows(data, prefix):
+    """
+    En un envío incremental el cliente manda el management form y solo las
+    filas nuevas, modificadas o borradas; devuelve sus índices, para
+    construir el formset con ``rows``. ``None`` si se envió todo el formset.
+    """
+    if data.get(f'{prefix}-{DELTA_FIELD}') != '1':
+        return None
+    return posted_rows(data, prefix)
+
+
+class BaseBookFormSet(BaseInlineFormSet):
+    """
+    Formset de libros con un modo de guardado por lotes.
+
+    ``bulk_save()`` agrupa las filas en nuevas, modificadas y eliminadas y
+    escribe cada grupo con una sola consulta dentro de una transacción, de
+    modo que el número de consultas no crece con el número de libros.
+
+    Con ``rows`` solo se construyen esas filas (índices globales):
+
+    * sin datos, ``rows`` es un tramo contiguo de libros existentes; se
+      cargan solo esos libros, se agregan los formularios extra y el
+      management form sigue contando todos los libros del autor;
+    * con datos, ``rows`` son las filas enviadas y solo se cargan los
+      libros que esas filas referencian. Es el caso del envío incremental
+      (ver ``submitted_rows``): las filas no enviadas no cambian.
+    """
+    # coincide con el índice core_book_author_year_idx
+    ordering = ('published_year', 'id')
+
+    def __init__(self, *args, queryset=None, rows=None, **kwargs):
+        if queryset is None:
+            queryset = self.model._default_manager.order_by(*self.ordering)
+        self.rows = sorted(set(rows)) if rows is not None else None
+        super().__init__(*args, queryset=queryset, **kwargs)
+        if self.is_bound and self.rows is not None \
+                and len(self.rows) <= self.absolute_max:
+            # solo se construyen las filas enviadas: los topes se aplican a
+            # ellas y no a TOTAL_FORMS, que cuenta todos los libros del autor
+            total = self.management_form.cleaned_data['TOTAL_FORMS']
+            self.max_num = max(self.max_num, total)
+            self.absolute_max = max(self.absolute_max, total)
+
+    def initial_form_count(self):
+        if self.rows is None or self.is_bound:
+            return super().initial_form_count()
+        if not hasattr(self, '_initial_count'):
+            self._initial_count = self.queryset.count()
+        return self._initial_count
+
+    def get_queryset(self):
+        if self.rows is None or hasattr(self, '_queryset'):
+            return super().get_queryset()
+        queryset = super().get_queryset()
+        if self.is_bound:
+            queryset = queryset.filter(pk__in=self._posted_pks())
+        else:
+            start, stop = self._window()
+            queryset = RowWindow(queryset[start:stop], start)
+        self._queryset = queryset
+        return queryset
+
+    async def aload(self):
+        """
+        Carga con la API async del ORM el conteo y el tramo de libros que
+        necesita un formset sin datos con ``rows``, para construirlo y
+        renderizarlo desde una vista async sin consultas sync.
+        """
+        if self.rows is None or self.is_bound or hasattr(self, '_queryset'):
+            return
+        self._initial_count = await self.queryset.acount()
+        start, stop = self._window()
+        queryset = super().get_queryset()[start:stop]
+        self._queryset = RowWindow([obj async for obj in queryset], start)
+
+    def _window(self):
+        """``(start, stop)`` de los libros existentes que piden ``rows``."""
+        initial = [i for i in self.rows if i < self.initial_form_count()]
+        if not initial:
+            return 0, 0
+        return initial[0], initial[-1] + 1
+
+    def _posted_pks(self):
+        pk_field = self.model._meta.pk
+        pks = []
+        for i in self.rows:
+            value = self.data.get(f'{self.add_prefix(i)}-{pk_field.name}')
+            try:
+                pk = pk_field.to_python(value)
+            except forms.ValidationError:
+                continue
+            if pk is not None:
+                pks.append(pk)
+        return pks
+
+    @cached_property
+    def form_rows(self):
+        """Índice global de cada formulario de ``forms``."""
+        if self.rows is None:
+            return list(range(self.total_form_count()))
+        if self.is_bound:
+            return list(self.rows)
+        initial = self.initial_form_count()
+        return ([i for i in self.rows if i < initial]
+                + list(range(initial, self.total_form_count())))
+
+    @cached_property
+    def forms(self):
+        if self.rows is None:
+            return super().forms
+        return [self._construct_form(i, **self.get_form_kwargs(i))
+                for i in self.form_rows]
+
+    @property
+    def initial_forms(self):
+        if self.rows is None:
+            return super().initial_forms
+        initial = self.initial_form_count()
+        return [form for i, form in zip(self.form_rows, self.forms)
+                if i < initial]
+
+    @property
+    def extra_forms(self):
+        if self.rows is None:
+            return super().extra_forms
+        initial = self.initial_form_count()
+        return [form for i, form in zip(self.form_rows, self.forms)
+                if i >= initial]
+
+    def expanded(self):
+        """
+        Formset completo equivalente a este envío con ``rows``: las filas
+        enviadas más los demás libros existentes con sus valores actuales,
+        en los índices que quedaron libres. Sirve para volver a mostrar la
+        página tras un error; recorre todos los libros del autor.
+        """
+        data = self.data.copy()
+        data.pop(self.add_prefix(DELTA_FIELD), None)
+        sent = set(self.rows)
+        free = (i for i in range(self.initial_form_count()) if i not in sent)
+        fields = self.model._meta.concrete_fields
+        for i, book in zip(free, self.queryset.exclude(pk__in=self._posted_pks())):
+            for field in fields:
+                value = field.value_from_object(book)
+                data[f'{self.add_prefix(i)}-{field.name}'] = \
+                    '' if value is None else str(value)
+        return type(self)(data, self.files, instance=self.instance,
+                          prefix=self.prefix)
+
+    def add_fields(self, form, index):
+        super().add_fields(form, index)
+        pk_field = form.fields[self._pk_field.name]
+        form.fields[self._pk_field.name] = ExistingObjectChoiceField(
+            self,
+            pk_field.queryset,
+            initial=pk_field.initial,
+            required=False,
+            widget=pk_field.widget,
+        )
+
+    def raise_for_deleted_rows(self):
+        """
+        Levanta ``EditConflict`` si alguna fila existente enviada apunta a
+        un libro que ya no está en la base: otra persona lo borró desde que
+        se mostró el formulario. Se llama tras un ``is_valid()`` fallido.
+        """
+        name = self._pk_field.name
+        rows = []
+        for i, form in zip(self.form_rows, self.forms):
+            if i >= self.initial_form_count():
+                continue
+            if not any(error.code == 'deleted'
+                       for error in form.errors.as_data().get(name, ())):
+                continue
+            obj = form.instance
+            obj.pk = self._pk_field.to_python(form[name].data)
+            rows.append((i, obj))
+        if rows:
+            raise EditConflict(
+                self.model, rows,
+                describe=lambda book: f'{book.title} ({book.published_year})',
+            )
+
+    def bulk_save(self):
+        """
+        Guarda el formset con un ``bulk_create``, un ``UPDATE`` y un
+        ``DELETE`` por lote. Modificaciones y borrados se condicionan a la
+        versión que se mostró (ver ``core.concurrency``); si alguna fila
+        cambió entretanto se levanta ``EditConflict`` y no se guarda nada.
+        Si algo cambió, también se actualiza ``updated_at`` del autor.
+        Devuelve los libros creados y modificados, igual que ``save()``.
+        """
+        self.new_objects = []
+        self.changed_objects = []
+        self.deleted_objects = []
+        update_fields = set()
+        row_of = {}
+
+        for i, form in zip(self.form_rows, self.forms):
+            if i >= self.initial_form_count():
+                continue
+            obj = form.instance
+            if obj.pk is None:
+                continue
+            row_of[obj.pk] = i
+            if self.can_delete and self._should_delete_form(form):
+                self.deleted_objects.append(obj)
+            elif form.changed_fields:
+                self.changed_objects.append((form.save(commit=False),
+                                             form.changed_fields))
+                update_fields.update(form.changed_fields)
+
+        for form in self.extra_forms:
+            if not form.changed_fields:
+                continue
+            if self.can_delete and self._should_delete_form(form):
+                continue
+            obj = form.save(commit=False)
+            setattr(obj, self.fk.name, self.instance)
+            self.new_objects.append(obj)
+
+        concrete = {f.name for f in self.model._meta.concrete_fields
+                    if not f.primary_key}
+        update_fields = sorted(update_fields & concrete)
+        changed = [obj for obj, _fields in self.changed_objects]
+
+        using = router.db_for_write(self.model, instance=self.instance)
+        manager = self.model._default_manager.db_manager(using)
+        with transaction.atomic(using=using):
+            stale = []
+            if self.deleted_objects and versioned_delete(
+                    manager.all(), self.deleted_objects
+            ) != len(self.deleted_objects):
+                stale += self.deleted_objects
+            if changed and update_fields and versioned_update(
+                    manager.all(), changed, update_fields) != len(changed):
+                stale += changed
+            if stale:
+                raise EditConflict(
+                    self.model, [(row_of[obj.pk], obj) for obj in stale],
+                    describe=lambda book: f'{book.title} ({book.published_year})',
+                )
+            if self.new_objects:
+                manager.bulk_create(self.new_objects)
+            if self.new_objects or changed or self.deleted_objects:
+                type(self.instance)._default_manager.db_manager(using).filter(
+                    pk=self.instance.pk).books_changed(**self.book_stats_delta())
+            # bulk_create/bulk_update no emiten post_save
+            schedule_bump(using)
+
+        for obj in changed + self.new_objects:
+            obj._stored = obj.stored_values()
+
+        return changed + self.new_objects
+
+
+    def book_stats_delta(self):
+        """
+        Años agregados y quitados por el guardado, con los valores que
+        había en la base para las filas modificadas y borradas (ver
+        ``Book.from_db``), para ``AuthorQuerySet.books_changed``.
+        """
+        added = [obj.published_year for obj in self.new_objects]
+        removed = []
+        unknown_removed = 0
+        for obj, _fields in self.changed_objects:
+            stored = getattr(obj, '_stored', None)
+            if stored is None:
+                unknown_removed += 1
+            elif stored[1] != obj.published_year:
+                removed.append(stored[1])
+            else:
+                continue
+            added.append(obj.published_year)
+        for obj in self.deleted_objects:
+            stored = getattr(obj, '_stored', None)
+            if stored is None:
+                unknown_removed += 1
+            else:
+                removed.append(stored[1])
+        return {'added': added, 'removed': removed,
+                'unknown_removed': unknown_removed}
+
+
 BookFormSet = inlineformset_factory(
     Author,
     Book,
     form=BookForm,
+    formset=BaseBookFormSet,
     extra=1,
-    can_delete=True
+    can_delete=True,
+    max_num=settings.AUTHOR_MAX_BOOKS,
+    absolute_max=settings.AUTHOR_MAX_BOOKS,
 )
\ No newline at end of file
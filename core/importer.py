@@ -0,0 +1,217 @@
+"""
+Importación masiva de autores y libros desde CSV o JSONL.
+
+Acepta los mismos formatos que genera ``core.export``. Cada registro es un
+autor con sus libros; se valida con los campos de ``AuthorForm`` y
+``BookForm`` (sin construir un formulario por fila) y se inserta con
+``bulk_create`` en tramos transaccionales. Tras cada tramo se guarda un
+checkpoint para poder retomar una carga interrumpida.
+"""
+import csv
+import json
+import time
+from dataclasses import asdict, dataclass, field
+from itertools import groupby
+from pathlib import Path
+
+from django import forms
+from django.db import router, transaction
+
+from core.forms import AuthorForm, BookForm
+from core.models import Author, Book
+from core.table_cache import schedule_bump
+
+AUTHOR_FIELDS = {'name': AuthorForm.base_fields['name']}
+BOOK_FIELDS = {name: BookForm.base_fields[name]
+               for name in ('title', 'published_year')}
+
+
+CSV_COLUMNS = ('author_id', 'author_name', 'title', 'published_year')
+
+
+class ImportFormatError(ValueError):
+    """El archivo no se puede leer como el formato indicado."""
+
+
+@dataclass
+class InvalidRecord:
+    """Registro ilegible; ``LibraryImporter.run`` lo cuenta como omitido."""
+    line: int
+    error: str
+
+
+def read_records(lines, fmt):
+    """
+    Convierte las líneas de entrada en registros
+    ``{'name': ..., 'books': [{'title': ..., 'published_year': ...}]}``.
+    En CSV los libros de un autor son filas consecutivas con el mismo
+    ``author_id``. Una línea JSONL que no es un objeto JSON se entrega como
+    ``InvalidRecord``; un CSV sin las columnas de ``CSV_COLUMNS`` levanta
+    ``ImportFormatError`` antes del primer registro.
+    """
+    if fmt == 'jsonl':
+        for number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                yield InvalidRecord(number, f"JSON inválido: {exc}")
+                continue
+            if isinstance(record, dict):
+                yield record
+            else:
+                yield InvalidRecord(number, "el registro no es un objeto JSON")
+    elif fmt == 'csv':
+        rows = csv.DictReader(lines)
+        missing = [name for name in CSV_COLUMNS
+                   if name not in (rows.fieldnames or ())]
+        if missing:
+            raise ImportFormatError(
+                f"Faltan columnas en el CSV: {', '.join(missing)}")
+        for _key, group in groupby(rows, key=lambda r: (r['author_id'],
+                                                         r['author_name'])):
+            group = list(group)
+            yield {
+                'name': group[0]['author_name'],
+                'books': [
+                    {'title': r['title'], 'published_year': r['published_year']}
+                    for r in group if r['title'] or r['published_year']
+                ],
+            }
+    else:
+        raise ValueError(f"Formato de importación desconocido: {fmt}")
+
+
+def clean_fields(fields, data):
+    cleaned, errors = {}, {}
+    for name, form_field in fields.items():
+        try:
+            cleaned[name] = form_field.clean(data.get(name))
+        except forms.ValidationError as exc:
+            errors[name] = exc.messages
+    return cleaned, errors
+
+
+def clean_record(record):
+    """Devuelve ``(author, books, errores)`` de un registro."""
+    author_data, errors = clean_fields(AUTHOR_FIELDS, record)
+    books = []
+    books_data = record.get('books') or []
+    if not isinstance(books_data, list):
+        errors['books'] = ["Debe ser una lista de libros"]
+        books_data = []
+    for i, book_data in enumerate(books_data):
+        if not isinstance(book_data, dict):
+            errors[f'books.{i}'] = ["Debe ser un objeto"]
+            continue
+        cleaned, book_errors = clean_fields(BOOK_FIELDS, book_data)
+        if book_errors:
+            errors[f'books.{i}'] = book_errors
+        else:
+            books.append(Book(**cleaned))
+    return Author(**author_data), books, errors
+
+
+@dataclass
+class Checkpoint:
+    records: int = 0
+    authors: int = 0
+    books: int = 0
+    skipped: int = 0
+
+    @classmethod
+    def load(cls, path):
+        if path and Path(path).exists():
+            return cls(**json.loads(Path(path).read_text()))
+        return cls()
+
+    def save(self, path):
+        if path:
+            tmp = Path(f'{path}.tmp')
+            tmp.write_text(json.dumps(asdict(self)))
+            tmp.replace(path)
+
+
+@dataclass
+class LibraryImporter:
+    """
+    Inserta los registros en tramos de ``batch_size`` libros. Con
+    ``checkpoint_path``, al terminar cada tramo se escribe cuántos
+    registros ya quedaron confirmados; con ``resume`` se saltan esos
+    registros al empezar.
+    """
+    batch_size: int = 5000
+    checkpoint_path: str = None
+    resume: bool = False
+    progress: object = None
+    errors: list = field(default_factory=list)
+
+    def run(self, records):
+        state = Checkpoint.load(self.checkpoint_path) if self.resume \
+            else Checkpoint()
+        start, done_before = time.perf_counter(), state.books
+        pending = []
+        pending_books = 0
+        number = state.records
+
+        for number, record in enumerate(records, start=1):
+            if number <= state.records:
+                continue
+            if isinstance(record, InvalidRecord):
+                author, books = None, []
+                errors = {'line': [f"{record.line}: {record.error}"]}
+            else:
+                author, books, errors = clean_record(record)
+            if errors:
+                state.skipped += 1
+                self.errors.append((number, errors))
+            else:
+                pending.append((author, books))
+                pending_books += len(books)
+            if len(pending) >= self.batch_size or pending_books >= self.batch_size:
+                self.flush(pending, state, number)
+                pending, pending_books = [], 0
+                self.report(state, start, done_before)
+
+        self.flush(pending, state, max(number, state.records))
+        self.report(state, start, done_before)
+        return state
+
+    def flush(self, pending, state, number):
+        using = router.db_for_write(Book)
+        for author, author_books in pending:
+            # autores nuevos: las estadísticas salen de sus propios libros
+            years = [book.published_year for book in author_books]
+            author.book_count = len(years)
+            author.first_year = min(years, default=None)
+            author.last_year = max(years, default=None)
+        with transaction.atomic(using=using):
+            authors = Author.objects.using(using).bulk_create(
+                [author for author, _books in pending],
+                batch_size=self.batch_size,
+            )
+            books = []
+            for author, author_books in pending:
+                for book in author_books:
+                    book.author = author
+                    books.append(book)
+            Book.objects.using(using).bulk_create(books,
+                                                  batch_size=self.batch_size)
+            schedule_bump(using)
+        state.records = number
+        state.authors += len(authors)
+        state.books += len(books)
+        state.save(self.checkpoint_path)
+
+    def report(self, state, start, done_before):
+        if self.progress is None:
+            return
+        elapsed = time.perf_counter() - start
+        rate = (state.books - done_before) / elapsed if elapsed else 0
+        self.progress(
+            f"{state.records} registros, {state.authors} autores, "
+            f"{state.books} libros, {state.skipped} omitidos "
+            f"({rate:,.0f} libros/s)"
+        )
+
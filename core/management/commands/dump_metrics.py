@@ -0,0 +1,54 @@
+import json
+import shutil
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import metrics
+
+
+class Command(BaseCommand):
+    help = (
+        "Muestra las métricas por vista registradas por "
+        "RequestMetricsMiddleware en todos los procesos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', default=None,
+                            help="por defecto REQUEST_METRICS_DIR")
+        parser.add_argument('--json', action='store_true',
+                            help="salida JSON con los histogramas")
+        parser.add_argument('--reset', action='store_true',
+                            help="borra los volcados después de mostrarlos")
+
+    def handle(self, *args, **options):
+        directory = options['dir'] or settings.REQUEST_METRICS_DIR
+        views = metrics.load(directory)
+
+        if options['json']:
+            self.stdout.write(json.dumps(
+                {view: stats.as_dict() for view, stats in views.items()},
+                indent=2,
+            ))
+        else:
+            self.write_table(views)
+
+        if options['reset']:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def write_table(self, views):
+        headers = ('vista', 'peticiones', 'consultas/pet', 'dup/pet',
+                   'sql ms', 'tpl ms', 'total ms', 'p50 ms', 'p95 ms')
+        rows = []
+        for view, stats in sorted(views.items()):
+            n = stats.requests or 1
+            rows.append((
+                view, stats.requests, f'{stats.queries / n:.1f}',
+                f'{stats.duplicates / n:.1f}', f'{stats.sql_ms / n:.1f}',
+                f'{stats.render_ms / n:.1f}', f'{stats.total_ms / n:.1f}',
+                f'≤{stats.percentile(0.5):g}', f'≤{stats.percentile(0.95):g}',
+            ))
+        widths = [max(len(str(x)) for x in col) for col in zip(headers, *rows)]
+        for row in (headers, *rows):
+            self.stdout.write('  '.join(str(x).ljust(w)
+                                        for x, w in zip(row, widths)))
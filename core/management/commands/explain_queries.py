@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+
+from core.forms import BookFormSet
+from core.models import Author
+from core.pagination import KeysetPaginator
+from core.views import AuthorList
+
+
+class Command(BaseCommand):
+    help = (
+        "Imprime el plan (EXPLAIN) de las consultas de la lista de autores "
+        "y de la edición de un autor, para detectar regresiones de índices."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--author', type=int,
+            help="pk del autor para las consultas de edición "
+                 "(por defecto el primero)",
+        )
+
+    def handle(self, *args, **options):
+        for title, queryset in self.get_queries(options['author']):
+            self.stdout.write(self.style.MIGRATE_HEADING(title))
+            self.stdout.write(f'  {queryset.query}')
+            for line in queryset.explain().splitlines():
+                self.stdout.write(f'  {line}')
+            self.stdout.write('')
+
+    def get_queries(self, author_pk):
+        per_page = AuthorList.keyset_per_page
+        ordering = AuthorList.keyset_orderings['name']
+        authors = Author.objects.all()
+
+        yield "Lista: primera página (cursor)", \
+            authors.order_by(*ordering)[:per_page + 1]
+
+        last = authors.order_by(*ordering).last()
+        if last is not None:
+            seek = KeysetPaginator._seek(ordering, (last.name, last.pk))
+            yield "Lista: página siguiente (cursor)", \
+                authors.order_by(*ordering).filter(seek)[:per_page + 1]
+
+        yield "Lista: página profunda (offset)", \
+            authors.order_by('name')[100 * per_page:101 * per_page]
+
+        if author_pk is None:
+            author = authors.order_by('pk').first() or Author(pk=0)
+        else:
+            author = Author(pk=author_pk)
+
+        yield "Edición: autor", authors.filter(pk=author.pk)
+        yield "Edición: libros del formset", \
+            BookFormSet(instance=author).get_queryset()
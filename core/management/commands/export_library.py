@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from core.export import FORMATS, export_lines
+
+
+class Command(BaseCommand):
+    help = "Exporta autores con sus libros en CSV o JSONL, en streaming."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=FORMATS, default='jsonl')
+        parser.add_argument(
+            '--output', '-o',
+            help="archivo de salida (por defecto la salida estándar)",
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        lines = export_lines(options['format'],
+                             chunk_size=options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8',
+                      newline='') as out:
+                out.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
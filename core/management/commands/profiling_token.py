@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from core import profiling
+
+
+class Command(BaseCommand):
+    help = (
+        "Imprime un valor firmado para la cabecera X-Profile: las peticiones "
+        "que lo envían se perfilan con ProfilingMiddleware."
+    )
+
+    def handle(self, *args, **options):
+        self.stdout.write(profiling.make_token())
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import router, transaction
+
+from core.models import Author
+from core.table_cache import schedule_bump
+
+FIELDS = ('book_count', 'first_year', 'last_year')
+ACTUAL = ('actual_count', 'actual_first', 'actual_last')
+
+
+class Command(BaseCommand):
+    help = ("Compara book_count, first_year y last_year de cada autor con sus "
+            "libros, por tramos de autores, y corrige los que no coinciden.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--check', action='store_true',
+            help="solo verificar; sale con error si hay autores desfasados",
+        )
+
+    def handle(self, *args, **options):
+        using = router.db_for_write(Author)
+        authors = Author.objects.using(using)
+        checked = stale = 0
+        last_pk = 0
+
+        while True:
+            pks = list(authors.filter(pk__gt=last_pk).order_by('pk')
+                       .values_list('pk', flat=True)[:options['batch_size']])
+            if not pks:
+                break
+            batch = authors.filter(pk__gte=pks[0], pk__lte=pks[-1])
+            with transaction.atomic(using=using):
+                rows = batch.with_book_stats().values_list('pk', *FIELDS, *ACTUAL)
+                wrong = [row[0] for row in rows if row[1:4] != row[4:]]
+                if wrong and not options['check']:
+                    authors.filter(pk__in=wrong).rebuild_book_stats()
+                    schedule_bump(using)
+            checked += len(pks)
+            stale += len(wrong)
+            last_pk = pks[-1]
+            if options['verbosity'] >= 2:
+                self.stdout.write(f"{checked} autores revisados, "
+                                  f"{stale} desfasados")
+
+        if options['check'] and stale:
+            raise CommandError(f"{stale} de {checked} autores con estadísticas "
+                               "de libros desfasadas")
+        if options['verbosity'] >= 1:
+            action = ("revisados" if options['check']
+                      else "revisados y corregidos")
+            self.stdout.write(f"{checked} autores {action}: {stale} desfasados")
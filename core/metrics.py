@@ -0,0 +1,237 @@
+"""
+Métricas por vista: consultas SQL, tiempo de SQL, tiempo de render de la
+plantilla y latencia total.
+
+``core.middleware.RequestMetricsMiddleware`` mide cada petición y la
+registra en ``registry``, un acumulador en memoria del proceso. Cada
+``REQUEST_METRICS_FLUSH_INTERVAL`` segundos el proceso vuelca su registro a
+``REQUEST_METRICS_DIR/metrics-<pid>.json``; ``manage.py dump_metrics``
+combina los archivos de todos los procesos.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+
+from django.conf import settings
+from django.template.base import Template
+
+logger = logging.getLogger(__name__)
+
+# límites superiores (ms) de los buckets del histograma de latencia
+BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float('inf'))
+
+
+class QueryRecorder:
+    """``execute_wrapper`` que cuenta, cronometra y agrupa las consultas."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.statements[sql] += 1
+
+    @property
+    def duplicates(self):
+        """Consultas repetidas con el mismo SQL: señal de un N+1."""
+        return self.count - len(self.statements)
+
+
+# grabador de la petición en curso; sync_to_async copia el contexto al hilo
+# que corre las vistas sync y el ORM async, así que también lo ve ahí
+_recorder = ContextVar('query_recorder', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    """``execute_wrapper`` fijo de cada conexión; delega en ``recording``."""
+    recorder = _recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install_recorder(sender, connection, **kwargs):
+    """
+    Receptor de ``connection_created``: agrega ``record_query`` a la
+    conexión, del hilo que sea. Va primero en la lista porque
+    ``connection.execute_wrapper()`` saca el último al salir.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+@contextmanager
+def recording(recorder, timer=None):
+    """
+    Cuenta en ``recorder`` las consultas de este contexto, sync o async, y
+    en ``timer`` el tiempo de render de plantillas.
+    """
+    token = _recorder.set(recorder)
+    timer_token = _render_timer.set(timer)
+    try:
+        yield recorder
+    finally:
+        _render_timer.reset(timer_token)
+        _recorder.reset(token)
+
+
+class RenderTimer:
+    """Tiempo de render de plantillas; las anidadas (include) no suman."""
+
+    def __init__(self):
+        self.duration = 0.0
+        self.depth = 0
+
+
+_render_timer = ContextVar('render_timer', default=None)
+
+
+def instrument_templates():
+    """
+    Envuelve ``Template.render`` para medir todo render de plantillas de la
+    petición: ``TemplateResponse``, ``render_to_string`` dentro de la vista
+    (el fragmento de ``AuthorTable``) y las respuestas de ``render()``. Se
+    envuelve ``render`` y no ``_render``, que el entorno de tests reemplaza.
+    """
+    render = Template.render
+    if getattr(render, 'timed', False):
+        return
+
+    @wraps(render)
+    def timed_render(self, context):
+        timer = _render_timer.get()
+        if timer is None or timer.depth:
+            return render(self, context)
+        timer.depth += 1
+        start = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            timer.depth -= 1
+            timer.duration += time.perf_counter() - start
+
+    timed_render.timed = True
+    Template.render = timed_render
+
+
+class ViewStats:
+    def __init__(self):
+        self.requests = 0
+        self.queries = 0
+        self.duplicates = 0
+        self.sql_ms = 0.0
+        self.render_ms = 0.0
+        self.total_ms = 0.0
+        self.histogram = [0] * len(BUCKETS)
+
+    def add(self, queries, duplicates, sql_ms, render_ms, total_ms):
+        self.requests += 1
+        self.queries += queries
+        self.duplicates += duplicates
+        self.sql_ms += sql_ms
+        self.render_ms += render_ms
+        self.total_ms += total_ms
+        self.histogram[bisect_left(BUCKETS, total_ms)] += 1
+
+    def merge(self, data):
+        for name in ('requests', 'queries', 'duplicates', 'sql_ms',
+                     'render_ms', 'total_ms'):
+            setattr(self, name, getattr(self, name) + data[name])
+        self.histogram = [a + b for a, b in zip(self.histogram,
+                                                data['histogram'])]
+
+    def percentile(self, q):
+        """Límite superior del bucket que contiene el percentil ``q``."""
+        target = q * self.requests
+        seen = 0
+        for bound, count in zip(BUCKETS, self.histogram):
+            seen += count
+            if count and seen >= target:
+                return bound
+        return 0
+
+    def as_dict(self):
+        return {
+            'requests': self.requests, 'queries': self.queries,
+            'duplicates': self.duplicates, 'sql_ms': self.sql_ms,
+            'render_ms': self.render_ms, 'total_ms': self.total_ms,
+            'histogram': self.histogram,
+        }
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.views = {}
+        self.last_flush = time.monotonic()
+
+    def record(self, view, **values):
+        with self.lock:
+            self.views.setdefault(view, ViewStats()).add(**values)
+        interval = getattr(settings, 'REQUEST_METRICS_FLUSH_INTERVAL', None)
+        if interval is None or time.monotonic() - self.last_flush < interval:
+            return
+        # un solo hilo vuelca; los demás siguen sin esperar
+        if not self.flush_lock.acquire(blocking=False):
+            return
+        try:
+            if time.monotonic() - self.last_flush >= interval:
+                self.write()
+        except OSError:
+            # las métricas no deben tumbar la petición
+            logger.exception("No se pudieron volcar las métricas en %s",
+                             settings.REQUEST_METRICS_DIR)
+        finally:
+            self.last_flush = time.monotonic()
+            self.flush_lock.release()
+
+    def snapshot(self):
+        with self.lock:
+            return {view: stats.as_dict() for view, stats in self.views.items()}
+
+    def flush(self, directory=None):
+        """Escribe el registro de este proceso en ``metrics-<pid>.json``."""
+        with self.flush_lock:
+            return self.write(directory)
+
+    def write(self, directory=None):
+        directory = Path(directory or settings.REQUEST_METRICS_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f'metrics-{os.getpid()}.json'
+        tmp = path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(self.snapshot()))
+        tmp.replace(path)
+        self.last_flush = time.monotonic()
+        return path
+
+    def reset(self):
+        with self.lock:
+            self.views.clear()
+
+
+registry = Registry()
+
+
+def load(directory):
+    """Combina los volcados de todos los procesos en ``{vista: ViewStats}``."""
+    views = {}
+    for path in sorted(Path(directory).glob('metrics-*.json')):
+        for view, data in json.loads(path.read_text()).items():
+            views.setdefault(view, ViewStats()).merge(data)
+    return views
@@ -0,0 +1,324 @@
+import cProfile
+import logging
+import mimetypes
+import os
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from core import profiling, routers
+from core.metrics import QueryRecorder, RenderTimer, recording, registry
+from core.storage import ENCODINGS
+
+logger = logging.getLogger('core.metrics')
+
+
+class RequestMetricsMiddleware:
+    """
+    Mide cada petición: cantidad y tiempo de consultas SQL, tiempo de
+    render de plantillas y latencia total. Registra los valores por vista
+    en ``core.metrics.registry`` y, con ``REQUEST_METRICS_SERVER_TIMING``,
+    los envía en una cabecera ``Server-Timing``. Las consultas repetidas
+    (mismo SQL) se cuentan como posibles N+1 y se registran en el log
+    ``core.metrics`` cuando superan ``REQUEST_METRICS_DUPLICATE_THRESHOLD``.
+
+    Soporta ASGI sin adaptar la cadena a sync, para no forzar un hilo en
+    las vistas async: consultas y renders se cuentan con un ``ContextVar``
+    (ver ``core.metrics.recording``), que llega también al hilo donde
+    ``sync_to_async`` corre las vistas sync y el ORM.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder, timer = QueryRecorder(), RenderTimer()
+        start = time.perf_counter()
+        with recording(recorder, timer):
+            response = self.get_response(request)
+        return self.finish(request, response, recorder, timer, start)
+
+    async def __acall__(self, request):
+        recorder, timer = QueryRecorder(), RenderTimer()
+        start = time.perf_counter()
+        with recording(recorder, timer):
+            response = await self.get_response(request)
+        return self.finish(request, response, recorder, timer, start)
+
+    def finish(self, request, response, recorder, timer, start):
+        total = time.perf_counter() - start
+        view = self.view_name(request)
+        if view is None:
+            return response
+
+        sql_ms = recorder.duration * 1000
+        render_ms = timer.duration * 1000
+        total_ms = total * 1000
+        registry.record(view, queries=recorder.count,
+                        duplicates=recorder.duplicates, sql_ms=sql_ms,
+                        render_ms=render_ms, total_ms=total_ms)
+
+        if getattr(settings, 'REQUEST_METRICS_SERVER_TIMING', False):
+            response['Server-Timing'] = ', '.join((
+                f'sql;dur={sql_ms:.1f};desc="{recorder.count} queries"',
+                f'dup;desc="{recorder.duplicates} duplicated"',
+                f'tpl;dur={render_ms:.1f}',
+                f'total;dur={total_ms:.1f}',
+            ))
+        threshold = getattr(settings, 'REQUEST_METRICS_DUPLICATE_THRESHOLD', 5)
+        if recorder.duplicates >= threshold:
+            sql, times = recorder.statements.most_common(1)[0]
+            logger.warning("%s: %d consultas duplicadas (%dx %s)",
+                           view, recorder.duplicates, times, sql)
+        return response
+
+    @staticmethod
+    def view_name(request):
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return None
+        view_class = getattr(match.func, 'view_class', None)
+        if view_class is not None:
+            return f'{view_class.__module__}.{view_class.__qualname__}'
+        return match._func_path
+
+
+class ProfilingMiddleware:
+    """
+    Perfila con ``cProfile`` una muestra de las peticiones o las que traen
+    la cabecera firmada ``X-Profile`` (ver ``core.profiling``). A las
+    pedidas por cabecera les responde con la ruta del perfil en
+    ``X-Profile``.
+
+    Solo bajo WSGI: en ASGI las vistas sync corren en otro hilo, fuera del
+    perfilador, y en el hilo del event loop se mezclarían otras peticiones.
+    Se perfila una petición a la vez por proceso (``profiling.lock``): desde
+    Python 3.12 cProfile es de todo el proceso y un segundo ``enable()``
+    falla; las que llegan mientras tanto se atienden sin perfilar. Con un
+    servidor de varios hilos, en 3.12+ el perfil incluye lo que hacen los
+    otros hilos durante la petición.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        self.sample_rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.get_response(request)
+        requested = profiling.HEADER in request.headers
+        if not requested and (not self.sample_rate
+                              or random.random() >= self.sample_rate):
+            return self.get_response(request)
+        if requested and not profiling.valid_token(
+                request.headers[profiling.HEADER]):
+            return self.get_response(request)
+
+        if not profiling.lock.acquire(blocking=False):
+            return self.get_response(request)
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # otro perfilador (p. ej. un depurador) ya está activo
+            profiling.lock.release()
+            return self.get_response(request)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            profile.disable()
+            profiling.lock.release()
+        path = profiling.write(profile, request,
+                               RequestMetricsMiddleware.view_name(request),
+                               time.perf_counter() - start)
+        if requested:
+            response[profiling.HEADER] = path.name
+        return response
+
+
+class PrimaryPinMiddleware:
+    """
+    Lee de la base principal durante las peticiones que escriben y, por
+    ``DATABASE_PIN_SECONDS``, en las siguientes del mismo navegador (ver
+    ``core.routers``). Sin ``DATABASE_REPLICAS`` no hace nada.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not routers.replicas():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with routers.pin(self.pinned(request)) as state:
+            response = self.get_response(request)
+        return self.finish(response, state)
+
+    async def __acall__(self, request):
+        with routers.pin(self.pinned(request)) as state:
+            response = await self.get_response(request)
+        return self.finish(response, state)
+
+    @staticmethod
+    def pinned(request):
+        return (request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+                or routers.PIN_COOKIE in request.COOKIES)
+
+    @staticmethod
+    def finish(response, state):
+        if state.wrote:
+            response.set_cookie(
+                routers.PIN_COOKIE, '1', httponly=True, samesite='Lax',
+                max_age=getattr(settings, 'DATABASE_PIN_SECONDS', 5))
+        return response
+
+
+def accepted_encodings(header):
+    """Codificaciones de ``Accept-Encoding`` que no están excluidas con q=0."""
+    accepted = set()
+    for item in header.split(','):
+        encoding, _, params = item.strip().partition(';')
+        if not encoding:
+            continue
+        quality = params.strip().removeprefix('q=')
+        try:
+            if params and float(quality) == 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(encoding.strip().lower())
+    return accepted
+
+
+class StaticFilesMiddleware:
+    """
+    Sirve ``STATIC_ROOT`` (lo que deja ``collectstatic``) desde el mismo
+    proceso de Django, sin CDN ni servidor web aparte. Al iniciar recorre
+    el directorio una sola vez; por petición solo busca la ruta en un
+    diccionario y elige la variante precomprimida (brotli, gzip o sin
+    comprimir) según ``Accept-Encoding``.
+
+    Los nombres con hash del manifiesto no cambian nunca de contenido y se
+    sirven con ``Cache-Control: immutable`` por un año; el resto (p. ej.
+    el nombre sin hash) con ``STATIC_MAX_AGE`` segundos. Las rutas que no
+    están en ``STATIC_ROOT`` siguen hacia las vistas.
+    """
+    sync_capable = True
+    async_capable = True
+
+    immutable_cache_control = 'public, max-age=31536000, immutable'
+
+    def __init__(self, get_response):
+        root = settings.STATIC_ROOT
+        if not root or not os.path.isdir(root):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        self.prefix = settings.STATIC_URL
+        if not self.prefix.startswith('/'):
+            self.prefix = '/' + self.prefix
+        self.cache_control = (
+            f"public, max-age={getattr(settings, 'STATIC_MAX_AGE', 60)}")
+        self.files = self.scan(root, self.immutable_names())
+
+    @staticmethod
+    def immutable_names():
+        return set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+
+    @staticmethod
+    def scan(root, immutable):
+        """``{nombre: (content_type, inmutable, {codificación: ruta})}``."""
+        suffixes = tuple(suffix for _encoding, suffix, _compress in ENCODINGS)
+        files = {}
+        for directory, _dirs, names in os.walk(root):
+            for filename in names:
+                if filename.endswith(suffixes):
+                    continue
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, root).replace(os.sep, '/')
+                variants = {encoding: path + suffix
+                            for encoding, suffix, _compress in ENCODINGS
+                            if os.path.exists(path + suffix)}
+                variants[None] = path
+                files[name] = (content_type_for(filename), name in immutable,
+                               variants)
+        return files
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.serve(request)
+        if response is None:
+            response = self.get_response(request)
+        return response
+
+    async def __acall__(self, request):
+        response = self.serve(request)
+        if response is None:
+            response = await self.get_response(request)
+        return response
+
+    def serve(self, request):
+        if (request.method not in ('GET', 'HEAD')
+                or not request.path.startswith(self.prefix)):
+            return None
+        entry = self.files.get(request.path[len(self.prefix):])
+        if entry is None:
+            return None
+        content_type, immutable, variants = entry
+
+        accepted = accepted_encodings(request.headers.get('Accept-Encoding', ''))
+        # ENCODINGS va de la más chica a la más grande; None es sin comprimir
+        encoding = next((encoding for encoding in variants
+                         if encoding is None or encoding in accepted), None)
+        path = variants[encoding]
+        if request.method == 'HEAD':
+            content, size = b'', os.path.getsize(path)
+        else:
+            with open(path, 'rb') as file:
+                content = file.read()
+            size = len(content)
+
+        response = HttpResponse(content, content_type=content_type)
+        response['Content-Length'] = size
+        if encoding is not None:
+            response['Content-Encoding'] = encoding
+        if len(variants) > 1:
+            patch_vary_headers(response, ['Accept-Encoding'])
+        response['Cache-Control'] = (self.immutable_cache_control if immutable
+                                     else self.cache_control)
+        return response
+
+
+def content_type_for(filename):
+    content_type, _ = mimetypes.guess_type(filename)
+    if content_type is None:
+        return 'application/octet-stream'
+    if content_type.startswith('text/') or content_type in (
+            'application/javascript', 'application/json', 'image/svg+xml'):
+        content_type += '; charset=utf-8'
+    return content_type
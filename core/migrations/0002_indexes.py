@@ -0,0 +1,36 @@
+# Generated by Django 5.1.8 on 2026-10-18 10:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='author',
+            name='name',
+            field=models.CharField(max_length=100, verbose_name='Autor'),
+        ),
+        migrations.AlterField(
+            model_name='book',
+            name='published_year',
+            field=models.IntegerField(verbose_name='Año de Publicación'),
+        ),
+        migrations.AlterField(
+            model_name='book',
+            name='title',
+            field=models.CharField(max_length=200, verbose_name='Titulo'),
+        ),
+        migrations.AddIndex(
+            model_name='author',
+            index=models.Index(fields=['name', 'id'], name='core_author_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['author', 'published_year', 'id'], name='core_book_author_year_idx'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.1.8 on 2026-10-18 11:52
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_book_stats(apps, schema_editor):
+    Author = apps.get_model('core', 'Author')
+    Book = apps.get_model('core', 'Book')
+    books = Book.objects.using(schema_editor.connection.alias).filter(
+        author=OuterRef('pk')).order_by()
+    Author.objects.using(schema_editor.connection.alias).update(
+        book_count=Coalesce(Subquery(
+            books.values('author').annotate(n=Count('*')).values('n')), 0),
+        first_year=Subquery(books.order_by('published_year')
+                            .values('published_year')[:1]),
+        last_year=Subquery(books.order_by('-published_year')
+                           .values('published_year')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='author',
+            name='book_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Libros'),
+        ),
+        migrations.AddField(
+            model_name='author',
+            name='first_year',
+            field=models.IntegerField(editable=False, null=True, verbose_name='Primer año'),
+        ),
+        migrations.AddField(
+            model_name='author',
+            name='last_year',
+            field=models.IntegerField(editable=False, null=True, verbose_name='Último año'),
+        ),
+        migrations.RunPython(fill_book_stats, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='author',
+            index=models.Index(fields=['book_count', 'id'], name='core_author_book_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='author',
+            index=models.Index(fields=['first_year', 'id'], name='core_author_first_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='author',
+            index=models.Index(fields=['last_year', 'id'], name='core_author_last_year_idx'),
+        ),
+    ]
@@ -1,24 +1,198 @@
 from django.db import models
 
 # Create your models here.
-from django.db import models
+from django.db import models, router
+from django.db.models import Case, F, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest, Least
+from django.utils import timezone
+
+
+def books_of_author():
+    return Book.objects.filter(author=OuterRef('pk')).order_by()
+
+
+def book_stats_changes(added=(), removed=(), unknown_removed=0):
+    """
+    Valores de ``update()`` que llevan ``book_count``, ``first_year`` y
+    ``last_year`` de un autor al estado posterior a agregar libros con los
+    años ``added`` y quitar libros con los años ``removed`` (más
+    ``unknown_removed`` libros de año desconocido).
+
+    El conteo se ajusta con ``F()``. Los extremos solo se recalculan (un
+    ``MIN``/``MAX`` sobre el índice de libros del autor) si se quitó un
+    libro que podía ser el extremo; agregar solo los puede ampliar.
+    Las subconsultas ven las filas ya escritas: se aplica al final.
+    """
+    changes = {}
+    delta = len(added) - len(removed) - unknown_removed
+    if delta > 0:
+        changes['book_count'] = F('book_count') + delta
+    elif delta < 0:
+        # un contador ya desfasado (libros cargados con bulk_create, p. ej.)
+        # no baja de cero; rebuild_book_stats lo corrige
+        changes['book_count'] = Greatest(F('book_count') + delta, Value(0))
+    # campo, cómo se amplía, extremo de una lista de años, condición de
+    # "el quitado era el extremo" y orden del libro que lo define
+    for field, widen, pick, lookup, order in (
+            ('first_year', Least, min, 'gte', 'published_year'),
+            ('last_year', Greatest, max, 'lte', '-published_year')):
+        if not (added or removed or unknown_removed):
+            break
+        value = F(field)
+        if added:
+            year = Value(pick(added))
+            value = widen(Coalesce(F(field), year), year)
+        if removed or unknown_removed:
+            exact = Subquery(books_of_author().order_by(order)
+                             .values('published_year')[:1])
+            if unknown_removed:
+                value = exact
+            else:
+                value = Case(When(Q(**{f'{field}__{lookup}': pick(removed)}),
+                                  then=exact),
+                             default=value)
+        changes[field] = value
+    return changes
+
+
+def actual_book_stats():
+    """Conteo y años extremos de los libros de cada autor, por subconsulta."""
+    return {
+        'count': Coalesce(Subquery(
+            books_of_author().values('author')
+            .annotate(n=models.Count('*')).values('n')), 0),
+        'first': Subquery(books_of_author().order_by('published_year')
+                          .values('published_year')[:1]),
+        'last': Subquery(books_of_author().order_by('-published_year')
+                         .values('published_year')[:1]),
+    }
+
+
+class AuthorQuerySet(models.QuerySet):
+    def touch(self):
+        """
+        Pone ``updated_at`` en ahora, sin tocar nada más. Se usa cuando
+        cambian los libros de un autor: la página del autor cambió aunque
+        su fila no.
+        """
+        return self.update(updated_at=timezone.now())
+
+    def books_changed(self, added=(), removed=(), unknown_removed=0):
+        """
+        ``touch()`` más las estadísticas de libros (ver
+        ``book_stats_changes``), en el mismo ``UPDATE``.
+        """
+        return self.update(updated_at=timezone.now(), **book_stats_changes(
+            added, removed, unknown_removed))
+
+    def with_book_stats(self):
+        """Anota ``actual_count``, ``actual_first`` y ``actual_last`` recalculados."""
+        return self.annotate(**{f'actual_{name}': value for name, value
+                                in actual_book_stats().items()})
+
+    def rebuild_book_stats(self):
+        """
+        Recalcula las estadísticas de libros de estos autores. Cambia lo
+        que muestran la lista y la edición, así que también ``updated_at``
+        (ETag/Last-Modified); la caché de la tabla la invalida quien llama
+        (``schedule_bump``), como con los demás ``update()``.
+        """
+        stats = actual_book_stats()
+        return self.update(updated_at=timezone.now(),
+                           book_count=stats['count'],
+                           first_year=stats['first'], last_year=stats['last'])
+
 
 class Author(models.Model):
     name = models.CharField(max_length=100, verbose_name="Autor", 
                             blank=False, null=False)
+    # control de concurrencia optimista (ver core.concurrency)
+    version = models.PositiveIntegerField(default=0, editable=False)
+    # también cambia con los libros del autor; ETag/Last-Modified de las
+    # páginas (ver core.views)
+    updated_at = models.DateTimeField(auto_now=True)
+    # resumen de los libros del autor, mantenido al escribir libros (ver
+    # AuthorQuerySet.books_changed y el comando rebuild_book_stats)
+    book_count = models.PositiveIntegerField(default=0, editable=False,
+                                             verbose_name="Libros")
+    first_year = models.IntegerField(null=True, editable=False,
+                                     verbose_name="Primer año")
+    last_year = models.IntegerField(null=True, editable=False,
+                                    verbose_name="Último año")
+
+    objects = AuthorQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # orden por defecto de AuthorTable y paginación por cursor
+            models.Index(fields=['name', 'id'], name='core_author_name_idx'),
+            # MAX(updated_at) de la lista sin recorrer la tabla
+            models.Index(fields=['updated_at'], name='core_author_updated_idx'),
+            # orden de AuthorTable por las estadísticas de libros
+            models.Index(fields=['book_count', 'id'],
+                         name='core_author_book_count_idx'),
+            models.Index(fields=['first_year', 'id'],
+                         name='core_author_first_year_idx'),
+            models.Index(fields=['last_year', 'id'],
+                         name='core_author_last_year_idx'),
+        ]
     
     def __str__(self):
         return self.name
     
     
+class BookQuerySet(models.QuerySet):
+    def fast_delete(self):
+        """
+        Un único ``DELETE ... WHERE`` sin cargar los libros ni emitir
+        ``post_delete``. Ningún modelo depende de ``Book``, así que el
+        collector no tiene nada más que borrar; quien lo use debe invalidar
+        lo que dependa de las señales (ver ``core.table_cache``).
+        """
+        # self.db es el alias de lectura (la réplica) si no se eligió uno
+        using = self._db or router.db_for_write(self.model, **self._hints)
+        return self._raw_delete(using)
+
+
 class Book(models.Model):
     author = models.ForeignKey(Author, 
                                on_delete=models.CASCADE, 
                                related_name='books')
     title = models.CharField(max_length=200, verbose_name="Titulo")
     published_year = models.IntegerField(verbose_name="Año de Publicación")
+    version = models.PositiveIntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = BookQuerySet.as_manager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        book = super().from_db(db, field_names, values)
+        # autor y año guardados: al modificar o borrar el libro se ajustan
+        # las estadísticas con estos valores, no con los editados
+        book._stored = book.stored_values()
+        return book
+
+    def stored_values(self):
+        """``(author_id, published_year)``; ``None`` si alguno está diferido."""
+        deferred = self.get_deferred_fields()
+        if 'author_id' in deferred or 'published_year' in deferred:
+            return None
+        return self.author_id, self.published_year
+
+    class Meta:
+        indexes = [
+            # libros de un autor ordenados por año (formset y reportes)
+            models.Index(fields=['author', 'published_year', 'id'],
+                         name='core_book_author_year_idx'),
+            # búsqueda por prefijo en el admin
+            models.Index(fields=['title'], name='core_book_title_idx'),
+        ]
     
     def __str__(self):
+        # sin el autor cargado (select_related) no se consulta por cada libro
+        if not Book.author.is_cached(self):
+            return f'{self.title} by author #{self.author_id}'
         return f'{self.title} by {self.author.name}'
     
     
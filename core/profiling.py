@@ -0,0 +1,108 @@
+"""
+Perfilado por muestreo de peticiones con ``cProfile``.
+
+``core.middleware.ProfilingMiddleware`` perfila una fracción
+``PROFILING_SAMPLE_RATE`` de las peticiones (0 la desactiva) y cualquier
+petición con una cabecera ``X-Profile`` firmada (``manage.py
+profiling_token``), válida por ``PROFILING_TOKEN_MAX_AGE`` segundos. Cada
+perfil se escribe en ``PROFILING_DIR`` como:
+
+* ``<nombre>.prof``: formato de ``pstats``, se abre con
+  ``python -m pstats``, snakeviz, tuna, gprof2dot, etc.
+* ``<nombre>.json``: la vista, la latencia y el tiempo propio de las
+  funciones agrupado en ``CATEGORIES`` (las funciones de C, como
+  ``sqlite3.Cursor.execute``, cuentan para la categoría de quien las
+  llama), para ver de un vistazo si el tiempo se fue en la vista, los
+  formularios, las plantillas o el ORM.
+
+Una petición no muestreada cuesta un ``random()`` y buscar la cabecera.
+"""
+import json
+import os
+import pstats
+import re
+import threading
+import time
+from itertools import count
+from pathlib import Path
+
+from django.conf import settings
+from django.core import signing
+
+HEADER = 'X-Profile'
+SALT = 'core.profiling'
+
+# categoría y fragmentos de ruta de sus módulos; gana la primera que coincide
+CATEGORIES = (
+    ('core.views', ('/core/views.py',)),
+    ('core.forms', ('/core/forms.py', '/django/forms/')),
+    ('templates', ('/django/template/', '/crispy_forms/', '/crispy_bootstrap4/',
+                   '/django_tables2/', '/core/templates/')),
+    ('orm', ('/django/db/',)),
+)
+OTHER = 'otros'
+
+_sequence = count()
+
+# una petición perfilada a la vez por proceso (ver ProfilingMiddleware)
+lock = threading.Lock()
+
+
+def make_token():
+    """Valor de la cabecera ``X-Profile`` que pide perfilar una petición."""
+    return signing.TimestampSigner(salt=SALT).sign('profile')
+
+
+def valid_token(value):
+    max_age = getattr(settings, 'PROFILING_TOKEN_MAX_AGE', 3600)
+    try:
+        signing.TimestampSigner(salt=SALT).unsign(value, max_age=max_age)
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def category(filename):
+    filename = filename.replace(os.sep, '/')
+    for name, fragments in CATEGORIES:
+        if any(fragment in filename for fragment in fragments):
+            return name
+    return OTHER
+
+
+def summarize(stats):
+    """Segundos de tiempo propio por categoría a partir de un ``pstats.Stats``."""
+    totals = dict.fromkeys([name for name, _fragments in CATEGORIES] + [OTHER],
+                           0.0)
+    for (filename, _line, _name), (_cc, _nc, tottime, _ct, callers) \
+            in stats.stats.items():
+        if filename == '~' and callers:
+            # función de C: a la categoría del que más tiempo la llamó
+            caller = max(callers, key=lambda key: callers[key][3])
+            filename = caller[0]
+        totals[category(filename)] += tottime
+    return totals
+
+
+def write(profile, request, view, elapsed):
+    """Guarda el perfil y su resumen; devuelve la ruta del ``.prof``."""
+    directory = Path(getattr(settings, 'PROFILING_DIR', 'profiles'))
+    directory.mkdir(parents=True, exist_ok=True)
+    slug = re.sub(r'[^\w.-]+', '-', view or request.path).strip('-')[:80]
+    name = (f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-"
+            f"{next(_sequence)}-{slug}")
+    path = directory / f'{name}.prof'
+
+    profile.create_stats()
+    stats = pstats.Stats(profile)
+    stats.dump_stats(path)
+    summary = {
+        'method': request.method,
+        'path': request.path,
+        'view': view,
+        'total_ms': round(elapsed * 1000, 3),
+        'self_ms': {key: round(value * 1000, 3)
+                    for key, value in summarize(stats).items()},
+    }
+    path.with_suffix('.json').write_text(json.dumps(summary, indent=2))
+    return path
@@ -0,0 +1,77 @@
+"""
+Lecturas en réplicas, escrituras en la base principal.
+
+``PrimaryReplicaRouter`` manda las lecturas a un alias de
+``DATABASE_REPLICAS`` (elegido al azar) y las escrituras a ``default``. Con
+la lista vacía no interviene y todo va a ``default``.
+
+Una réplica puede ir atrasada, así que quien acaba de escribir tiene que
+leer su propia escritura: ``PrimaryPinMiddleware`` fija la petición a la
+base principal si el método no es seguro (POST, PUT, DELETE...) o si
+escribe algo, y en ese caso deja una cookie por ``DATABASE_PIN_SECONDS``
+para que las siguientes (la redirección a la lista, por ejemplo) también
+lean de la principal.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+PIN_COOKIE = 'pin_primary'
+
+
+class PinState:
+    # mutable: los hilos de sync_to_async copian el contexto, pero con la
+    # misma instancia, así que una escritura ahí también fija la petición
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+
+
+_state = ContextVar('core_routers_pin', default=None)
+
+
+def replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def reads_from_replica():
+    """Si en este momento las lecturas van a una réplica."""
+    state = _state.get()
+    return bool(replicas()) and not (state is not None and state.pinned)
+
+
+@contextmanager
+def pin(pinned=False):
+    """Abre el estado de una petición; ``pinned`` la fija desde el inicio."""
+    state = PinState(pinned)
+    token = _state.set(state)
+    try:
+        yield state
+    finally:
+        _state.reset(token)
+
+
+class PrimaryReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if not reads_from_replica():
+            return None
+        return random.choice(replicas())
+
+    def db_for_write(self, model, **hints):
+        if not replicas():
+            return None
+        state = _state.get()
+        if state is not None:
+            state.pinned = state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
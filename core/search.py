@@ -0,0 +1,189 @@
+"""
+Búsqueda por texto y por prefijo sobre nombres de autores y títulos de
+libros, con resultados ordenados por relevancia.
+
+Cada término de la consulta se busca como prefijo (``fund`` encuentra
+"Fundación"); todos deben aparecer en el nombre del autor o en un mismo
+título. Primero van los autores cuyo nombre coincide y, dentro de cada
+grupo, el puntaje suma el del nombre y el de sus libros (los puntajes de
+tablas distintas no son comparables entre sí, por eso no se mezclan). El backend depende del motor de la base:
+
+* SQLite: tablas virtuales FTS5 con contenido externo (``core_author_fts``
+  y ``core_book_fts``) que triggers mantienen al día. Los triggers cubren
+  también ``bulk_create``, ``QuerySet.update`` y ``fast_delete``, que no
+  emiten señales.
+* PostgreSQL: ``to_tsvector('simple', ...)`` con índices GIN sobre esa
+  misma expresión, así que la búsqueda no recorre la tabla.
+* Otros motores: ``icontains``, sin índice ni ranking.
+
+Los índices se crean en ``post_migrate`` (ver ``core.apps``), así que
+también existen en la base de tests creada sin migraciones y se recrean
+los triggers que SQLite pierde al reconstruir una tabla en un
+``ALTER TABLE``.
+"""
+import re
+
+from django.db import connections, router
+from django.db.models import Max, Q
+
+from core.models import Author, Book
+
+# máximo de autores que devuelve una búsqueda
+DEFAULT_LIMIT = 200
+
+
+def terms(query):
+    """Palabras de la consulta, en minúsculas; ignora operadores y signos."""
+    return re.findall(r'\w+', query.lower())
+
+
+class SQLiteBackend:
+    tables = (
+        # (tabla FTS, tabla de contenido, columna)
+        ('core_author_fts', 'core_author', 'name'),
+        ('core_book_fts', 'core_book', 'title'),
+    )
+    options = "tokenize='unicode61 remove_diacritics 2', prefix='2 3'"
+
+    def install(self, connection):
+        existing = connection.introspection.table_names()
+        with connection.cursor() as cursor:
+            for fts, content, column in self.tables:
+                if fts not in existing:
+                    cursor.execute(
+                        f"CREATE VIRTUAL TABLE {fts} USING fts5({column}, "
+                        f"content='{content}', content_rowid='id', "
+                        f"{self.options})")
+                    # indexar las filas que ya existen
+                    cursor.execute(
+                        f"INSERT INTO {fts}({fts}) VALUES('rebuild')")
+                insert = (f"INSERT INTO {fts}(rowid, {column}) "
+                          f"VALUES (new.id, new.{column});")
+                delete = (f"INSERT INTO {fts}({fts}, rowid, {column}) "
+                          f"VALUES ('delete', old.id, old.{column});")
+                for name, event, body in (
+                    ('ai', 'AFTER INSERT', insert),
+                    ('ad', 'AFTER DELETE', delete),
+                    # solo si cambia el texto, no en cada cambio de versión
+                    ('au', f'AFTER UPDATE OF {column}', delete + insert),
+                ):
+                    cursor.execute(
+                        f"CREATE TRIGGER IF NOT EXISTS {fts}_{name} {event} "
+                        f"ON {content} BEGIN {body} END")
+
+    def match(self, words):
+        # cada término entre comillas (sin sintaxis FTS5) y como prefijo
+        return ' '.join(f'"{word}"*' for word in words)
+
+    def search(self, connection, words, limit):
+        # bm25() es negativo: más bajo es más relevante
+        sql = """
+            SELECT author_id, -SUM(score) AS score FROM (
+                SELECT rowid AS author_id, 1 AS by_name,
+                       bm25(core_author_fts) AS score
+                FROM core_author_fts WHERE core_author_fts MATCH %s
+                UNION ALL
+                SELECT b.author_id, 0, bm25(core_book_fts)
+                FROM core_book_fts
+                JOIN core_book b ON b.id = core_book_fts.rowid
+                WHERE core_book_fts MATCH %s
+            )
+            GROUP BY author_id
+            ORDER BY MAX(by_name) DESC, score DESC, author_id LIMIT %s
+        """
+        match = self.match(words)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [match, match, limit])
+            return cursor.fetchall()
+
+
+class PostgresBackend:
+    config = 'simple'
+
+    def vectors(self):
+        from django.contrib.postgres.search import SearchVector
+
+        return ((Author, 'core_author_name_search_idx',
+                 SearchVector('name', config=self.config)),
+                (Book, 'core_book_title_search_idx',
+                 SearchVector('title', config=self.config)))
+
+    def install(self, connection):
+        from django.contrib.postgres.indexes import GinIndex
+
+        with connection.schema_editor() as schema_editor:
+            for model, name, vector in self.vectors():
+                constraints = connection.introspection.get_constraints(
+                    connection.cursor(), model._meta.db_table)
+                if name not in constraints:
+                    schema_editor.add_index(model, GinIndex(vector, name=name))
+
+    def search(self, connection, words, limit):
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        # mismo SearchVector que el índice, para que el planner lo use
+        query = SearchQuery(' & '.join(f"'{word}':*" for word in words),
+                            config=self.config, search_type='raw')
+        (_, _, author_vector), (_, _, book_vector) = self.vectors()
+        scores, by_name = {}, set()
+        authors = (Author.objects.using(connection.alias)
+                   .alias(document=author_vector)
+                   .filter(document=query)
+                   .annotate(score=SearchRank(author_vector, query))
+                   .values_list('pk', 'score'))
+        for pk, score in authors:
+            scores[pk] = score
+            by_name.add(pk)
+        books = (Book.objects.using(connection.alias)
+                 .alias(document=book_vector)
+                 .filter(document=query)
+                 .values('author_id')
+                 .annotate(score=Max(SearchRank(book_vector, query)))
+                 .values_list('author_id', 'score'))
+        for pk, score in books:
+            scores[pk] = scores.get(pk, 0) + score
+        ranked = sorted(scores.items(), key=lambda item: (
+            item[0] not in by_name, -item[1], item[0]))
+        return ranked[:limit]
+
+
+class ContainsBackend:
+    def install(self, connection):
+        pass
+
+    def search(self, connection, words, limit):
+        condition = Q()
+        for word in words:
+            condition &= Q(name__icontains=word) | Q(books__title__icontains=word)
+        pks = (Author.objects.using(connection.alias).filter(condition)
+               .values_list('pk', flat=True).distinct().order_by('pk'))
+        return [(pk, 0) for pk in pks[:limit]]
+
+
+BACKENDS = {
+    'sqlite': SQLiteBackend,
+    'postgresql': PostgresBackend,
+}
+
+
+def get_backend(connection):
+    return BACKENDS.get(connection.vendor, ContainsBackend)()
+
+
+def install(using='default'):
+    """Crea índices y triggers de búsqueda si faltan; es idempotente."""
+    connection = connections[using]
+    get_backend(connection).install(connection)
+
+
+def search(query, limit=DEFAULT_LIMIT, using=None):
+    """
+    Autores que coinciden con ``query``, el más relevante primero, como
+    lista de ``(pk, puntaje)``.
+    """
+    words = terms(query)
+    if not words:
+        return []
+    connection = connections[using or router.db_for_read(Author)]
+    return get_backend(connection).search(connection, words, limit)
+
@@ -0,0 +1,48 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.models import Author, Book
+from core.table_cache import schedule_bump
+
+
+@receiver(post_save, sender=Author)
+@receiver(post_delete, sender=Author)
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+def invalidate_author_table(sender, instance, using, **kwargs):
+    schedule_bump(using)
+
+
+@receiver(post_save, sender=Book)
+def book_saved(sender, instance, using, created, raw=False, **kwargs):
+    if raw:
+        return
+    authors = Author.objects.using(using)
+    stored = None if created else getattr(instance, '_stored', None)
+    current = (instance.author_id, instance.published_year)
+    if created:
+        authors.filter(pk=instance.author_id).books_changed(
+            added=[instance.published_year])
+    elif stored is None:
+        # no se sabe qué había: el libro cuenta como quitado y agregado
+        authors.filter(pk=instance.author_id).books_changed(
+            added=[instance.published_year], unknown_removed=1)
+    elif stored[0] != current[0]:
+        authors.filter(pk=stored[0]).books_changed(removed=[stored[1]])
+        authors.filter(pk=current[0]).books_changed(added=[current[1]])
+    elif stored[1] != current[1]:
+        authors.filter(pk=current[0]).books_changed(added=[current[1]],
+                                                    removed=[stored[1]])
+    else:
+        authors.filter(pk=current[0]).touch()
+    instance._stored = current
+
+
+@receiver(post_delete, sender=Book)
+def book_deleted(sender, instance, using, origin=None, **kwargs):
+    # al borrar el autor sus libros se van con él
+    if isinstance(origin, Author):
+        return
+    stored = getattr(instance, '_stored', None) or instance.stored_values()
+    Author.objects.using(using).filter(pk=stored[0]).books_changed(
+        removed=[stored[1]])
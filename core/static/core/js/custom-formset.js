@@ -1,5 +1,102 @@
-$('.formset_row').formset({
-    addText: 'Añadir libro',
-    deleteText: '<button class="btn btn-sm btn-danger"><i class="fas fa-minus-square"></i></button>',
-    prefix: 'authorbook_set'
-});
\ No newline at end of file
+function initBookFormset() {
+    $('.formset_row').formset({
+        addText: 'Añadir libro',
+        deleteText: '<button class="btn btn-sm btn-danger"><i class="fas fa-minus-square"></i></button>',
+        prefix: 'authorbook_set'
+    });
+}
+
+// Carga por tramos los libros existentes que no vinieron con la página y
+// recién entonces inicializa el formset, para que todas las filas tengan
+// su botón de borrar. Guardar queda deshabilitado mientras tanto.
+//
+// Cada tramo se pide con If-Match y la versión del autor de la página: si
+// otra persona lo cambió entre tanto el servidor responde 412 y no se
+// mezclan filas de dos versiones. Si un tramo falla, Guardar sigue
+// deshabilitado (faltarían filas) y se pide recargar la página.
+function loadBookRows(done) {
+    var table = $('#book-rows'),
+        anchor = $('#book-rows-anchor'),
+        submit = table.closest('form').find('button[type=submit]'),
+        next = parseInt(table.data('next'), 10),
+        total = parseInt(table.data('total'), 10),
+        chunk = parseInt(table.data('chunk'), 10),
+        // attr y no data: jQuery interpretaría la ETag entre comillas como JSON
+        etag = table.attr('data-etag');
+
+    submit.prop('disabled', true);
+
+    function fail(xhr) {
+        var message = xhr.status === 412
+            ? 'Otra persona modificó este autor mientras se cargaba la página.'
+            : 'No se pudieron cargar todos los libros.';
+        $('<div class="alert alert-warning" role="alert"></div>')
+            .text(message + ' ')
+            .append($('<a href="">Recarga la página</a>'))
+            .append(' para editarlo.')
+            .insertBefore(table.closest('form'));
+    }
+
+    function fetchChunk() {
+        if (next >= total) {
+            submit.prop('disabled', false);
+            done();
+            return;
+        }
+        $.ajax({
+            url: table.data('url'),
+            data: {start: next, stop: next + chunk},
+            headers: {'If-Match': etag}
+        }).done(function (html) {
+            anchor.before(html);
+            next += chunk;
+            fetchChunk();
+        }).fail(fail);
+    }
+    fetchChunk();
+}
+
+// Envío incremental: al guardar se deshabilitan (y así no se envían) las
+// filas de libros existentes que no cambiaron, y se marca el envío con
+// authorbook_set-DELTA para que el servidor aplique solo las enviadas.
+function rowChanged(row) {
+    var changed = false;
+    row.find(':input').each(function () {
+        if (/-DELETE$/.test(this.name)) {
+            // jquery.formset reemplaza el checkbox por un hidden con "on"
+            changed = changed || this.checked || (this.type === 'hidden' && this.value === 'on');
+        } else if (this.type === 'checkbox') {
+            changed = changed || this.checked !== this.defaultChecked;
+        } else {
+            changed = changed || this.value !== this.defaultValue;
+        }
+    });
+    return changed;
+}
+
+function submitChangedRows(event) {
+    var form = $(event.target),
+        prefix = 'authorbook_set',
+        initial = parseInt($('#id_' + prefix + '-INITIAL_FORMS').val(), 10);
+
+    form.find('.formset_row').each(function () {
+        var row = $(this),
+            name = row.find(':input[name^="' + prefix + '-"]').attr('name') || '',
+            index = parseInt(name.split('-')[1], 10);
+        // las filas nuevas se envían siempre; la plantilla de jquery.formset
+        // (__prefix__) nunca
+        if (index >= initial || (!isNaN(index) && rowChanged(row))) {
+            return;
+        }
+        row.find(':input').prop('disabled', true);
+    });
+    form.append($('<input type="hidden">').attr('name', prefix + '-DELTA').val('1'));
+}
+
+$('table[data-delta]').closest('form').on('submit', submitChangedRows);
+
+if ($('#book-rows-anchor').length) {
+    loadBookRows(initBookFormset);
+} else {
+    initBookFormset();
+}
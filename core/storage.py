@@ -0,0 +1,69 @@
+"""
+Almacenamiento de archivos estáticos para producción.
+
+``CompressedManifestStaticFilesStorage`` es ``ManifestStaticFilesStorage``
+(nombres con el hash del contenido, p. ej. ``core/js/app.3f2a1c.js``) que
+además, al terminar ``collectstatic``, escribe junto a cada archivo de
+texto una variante ``.gz`` y, si está instalado el paquete ``brotli``,
+una ``.br``. ``StaticFilesMiddleware`` (ver ``core.middleware``) sirve la
+variante que acepte el navegador sin comprimir nada por petición.
+"""
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:  # opcional: sin él solo se generan las variantes gzip
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.json', '.map', '.svg', '.txt',
+                           '.html', '.xml', '.ico')
+# no vale la pena comprimir archivos más chicos que esto
+MIN_SIZE = 256
+
+
+def gzip_compress(data):
+    # mtime fijo: el mismo archivo da siempre el mismo .gz
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def brotli_compress(data):
+    return brotli.compress(data, quality=11)
+
+
+ENCODINGS = [('gzip', '.gz', gzip_compress)]
+if brotli is not None:
+    ENCODINGS.insert(0, ('br', '.br', brotli_compress))
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+
+    def post_process(self, paths, dry_run=False, **options):
+        # un archivo puede aparecer en varias pasadas; vale el último nombre
+        hashed = {}
+        for name, hashed_name, processed in super().post_process(
+                paths, dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                hashed[name] = hashed_name
+            yield name, hashed_name, processed
+        if not dry_run:
+            for hashed_name in hashed.values():
+                self.compress(hashed_name)
+
+    def compress(self, name):
+        """Escribe las variantes comprimidas de ``name`` que ahorren bytes."""
+        if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+            return
+        with self.open(name) as original:
+            data = original.read()
+        if len(data) < MIN_SIZE:
+            return
+        for _encoding, suffix, compress in ENCODINGS:
+            compressed = compress(data)
+            if len(compressed) >= len(data):
+                continue
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            self._save(name + suffix, ContentFile(compressed))
@@ -0,0 +1,146 @@
+"""
+Caché de fragmentos HTML de ``AuthorTable``.
+
+Cada página renderizada se guarda con una clave que incluye los parámetros
+de orden y paginación y un contador de versión de la biblioteca. Los
+enlaces del fragmento se construyen desde la query string, así que se
+renderiza con una petición que solo trae esos parámetros (``page_request``):
+cualquier otro (``utm_source``, ...) quedaría guardado en la caché. Cualquier
+escritura sobre ``Author`` o ``Book`` incrementa la versión (ver
+``core.signals``), con lo que todas las páginas guardadas dejan de usarse
+sin tener que borrarlas una por una.
+
+El backend es un alias de ``CACHES`` (``AUTHOR_TABLE_CACHE_ALIAS``); con
+``None`` la caché queda desactivada. Con varios procesos el alias debe
+apuntar a un backend compartido (Redis, Memcached, base de datos) para que
+la invalidación llegue a todos.
+"""
+import copy
+import hashlib
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import QueryDict
+from django.utils.safestring import mark_safe
+
+VERSION_KEY = 'core:library-version'
+# parámetros de la petición que cambian el contenido de la tabla
+PAGE_PARAMS = ('q', 'sort', 'page', 'per_page', 'after', 'before')
+
+stats = Counter()
+
+
+def get_cache():
+    alias = getattr(settings, 'AUTHOR_TABLE_CACHE_ALIAS', 'default')
+    return caches[alias] if alias else None
+
+
+def get_timeout():
+    return getattr(settings, 'AUTHOR_TABLE_CACHE_TIMEOUT', 300)
+
+
+def library_version(cache=None):
+    cache = cache or get_cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # si el contador se perdió, partir de un valor que no reutilice
+        # versiones anteriores
+        version = time.time_ns()
+        cache.add(VERSION_KEY, version, None)
+        version = cache.get(VERSION_KEY, version)
+    return version
+
+
+async def alibrary_version(cache=None):
+    cache = cache or get_cache()
+    version = await cache.aget(VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        await cache.aadd(VERSION_KEY, version, None)
+        version = await cache.aget(VERSION_KEY, version)
+    return version
+
+
+def bump_library_version():
+    cache = get_cache()
+    if cache is None:
+        return
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, time.time_ns(), None)
+
+
+def schedule_bump(using=None):
+    """Incrementa la versión cuando se confirme la transacción en curso."""
+    transaction.on_commit(bump_library_version, using=using)
+
+
+def page_params(request):
+    """``request.GET`` con solo los ``PAGE_PARAMS``, siempre en ese orden."""
+    params = QueryDict(mutable=True)
+    for name in PAGE_PARAMS:
+        if name in request.GET:
+            params.setlist(name, request.GET.getlist(name))
+    params._mutable = False
+    return params
+
+
+def page_request(request):
+    """Copia de ``request`` para renderizar el fragmento que se guarda."""
+    page = copy.copy(request)
+    page.GET = page_params(request)
+    return page
+
+
+def page_key(request, prefix='authors', version=None, state=''):
+    """
+    ``state`` identifica los datos leídos cuando vienen de una réplica: la
+    versión cambia al confirmar en la principal y una réplica atrasada
+    guardaría datos viejos con la versión nueva.
+    """
+    if version is None:
+        version = library_version()
+    mode = getattr(settings, 'AUTHOR_LIST_PAGINATION', 'offset')
+    params = page_params(request).urlencode()
+    digest = hashlib.md5(f'{mode}?{params}#{state}'.encode()).hexdigest()
+    return f'core:{prefix}:{version}:{digest}'
+
+
+def get_or_render(request, render, state=''):
+    """
+    Devuelve ``(html, hit)``: el fragmento guardado para esta petición o el
+    resultado de ``render()``, que se guarda para las siguientes.
+    """
+    cache = get_cache()
+    if cache is None:
+        return render(), False
+    key = page_key(request, state=state)
+    html = cache.get(key)
+    if html is not None:
+        stats['hits'] += 1
+        return mark_safe(html), True
+    stats['misses'] += 1
+    html = render()
+    cache.set(key, html, get_timeout())
+    return html, False
+
+
+async def aget_or_render(request, render, state=''):
+    """Como ``get_or_render``, para vistas async; ``render`` es una corrutina."""
+    cache = get_cache()
+    if cache is None:
+        return await render(), False
+    key = page_key(request, version=await alibrary_version(cache),
+                   state=state)
+    html = await cache.aget(key)
+    if html is not None:
+        stats['hits'] += 1
+        return mark_safe(html), True
+    stats['misses'] += 1
+    html = await render()
+    await cache.aset(key, html, get_timeout())
+    return html, False
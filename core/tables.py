@@ -4,6 +4,11 @@ from django_tables2 import A, LinkColumn
 from core.models import Author
 
 class AuthorTable(tables.Table):
+    # columnas de Author mantenidas al escribir libros; se ordenan por índice
+    book_count = tables.Column(verbose_name=_("Libros"))
+    first_year = tables.Column(verbose_name=_("Primer año"))
+    last_year = tables.Column(verbose_name=_("Último año"))
+
     edit = LinkColumn(
         'edit_authors',
         args=[A('pk')],
@@ -32,5 +37,6 @@ class AuthorTable(tables.Table):
     
     class Meta:
         model = Author
-        fields = ['name', 'edit', 'delete']
+        fields = ['name', 'book_count', 'first_year', 'last_year',
+                  'edit', 'delete']
         empty_text = "Sin registros"
\ No newline at end of file
@@ -0,0 +1,28 @@
+import pytest
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """La caché local persiste entre tests; cada test parte de cero."""
+    for cache in caches.all():
+        cache.clear()
+    yield
+
+
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings(django_db_modify_db_settings):
+    """
+    La base "replica" solo existe con DJANGO_USE_REPLICA; los tests del
+    router (tests_routers) usan una en memoria, aparte de default, como
+    una réplica que nadie sincroniza.
+    """
+    if 'replica' not in settings.DATABASES:
+        settings.DATABASES['replica'] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': ':memory:',
+        }
+        # ConnectionHandler ya pudo leer DATABASES sin el alias
+        connections.__dict__.pop('settings', None)
@@ -0,0 +1,101 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.models import Author, Book
+
+"""
+Regresión de consultas del admin: el changelist de libros no debe hacer
+una consulta por fila para leer el autor.
+"""
+
+N_BOOKS = 100_000
+
+
+def seed_books(n_books, n_authors=1000):
+    authors = Author.objects.bulk_create(
+        Author(name=f'Autor {i:04d}') for i in range(n_authors)
+    )
+    Book.objects.bulk_create(
+        (Book(author=authors[i % n_authors], title=f'Libro {i:06d}',
+              published_year=1900 + i % 120) for i in range(n_books)),
+        batch_size=5000,
+    )
+
+
+def changelist_queries(client, model, params=None):
+    url = reverse(f'admin:core_{model}_changelist')
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url, params or {})
+    assert response.status_code == 200
+    return [q['sql'] for q in ctx.captured_queries]
+
+
+@pytest.mark.django_db
+def test_book_changelist_query_count(admin_client):
+    seed_books(1, n_authors=1)
+    baseline = changelist_queries(admin_client, 'book')
+
+    Book.objects.all().delete()
+    Author.objects.all().delete()
+    seed_books(N_BOOKS)
+    queries = changelist_queries(admin_client, 'book')
+
+    # 100 filas por página con el autor en el mismo JOIN
+    assert len(queries) == len(baseline)
+    assert not any('FROM "core_author" WHERE' in sql for sql in queries)
+
+
+@pytest.mark.django_db
+def test_book_changelist_search(admin_client):
+    seed_books(50, n_authors=5)
+
+    queries = changelist_queries(admin_client, 'book', {'q': 'Libro 00001'})
+
+    assert any('LIKE' in sql for sql in queries)
+
+
+@pytest.mark.django_db
+def test_book_change_form_does_not_load_authors(admin_client):
+    seed_books(10, n_authors=500)
+    book = Book.objects.first()
+    url = reverse('admin:core_book_change', args=[book.pk])
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = admin_client.get(url)
+
+    assert response.status_code == 200
+    # autocomplete: solo el autor seleccionado, no los 500
+    assert response.content.count(b'<option value=') <= 2
+    assert len(ctx.captured_queries) < 10
+
+
+@pytest.mark.django_db
+def test_author_autocomplete(admin_client):
+    seed_books(0, n_authors=20)
+    url = reverse('admin:autocomplete')
+
+    response = admin_client.get(url, {
+        'term': 'Autor',
+        'app_label': 'core',
+        'model_name': 'book',
+        'field_name': 'author',
+    })
+
+    assert response.status_code == 200
+    assert len(response.json()['results']) == 20
+
+
+@pytest.mark.django_db
+def test_book_str_does_not_query_author():
+    author = Author.objects.create(name="Ursula K. Le Guin")
+    Book.objects.create(author=author, title="Terramar", published_year=1968)
+
+    book = Book.objects.get()
+    with CaptureQueriesContext(connection) as queries:
+        assert str(book) == f"Terramar by author #{author.pk}"
+    assert not queries.captured_queries
+
+    book = Book.objects.select_related('author').get()
+    assert str(book) == "Terramar by Ursula K. Le Guin"
@@ -0,0 +1,110 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.models import Author, Book
+from core.pagination import KeysetPaginator
+from core.test.tests_views import edit_post_data, seed_author
+from core.views import AsyncAuthorEdit, AsyncAuthorList
+
+
+def request(method, url, data=None):
+    client = AsyncClient()
+    call = getattr(client, method)
+    with CaptureQueriesContext(connection) as ctx:
+        response = async_to_sync(call)(url, data or {})
+    return response, len(ctx.captured_queries)
+
+
+def test_views_are_async():
+    assert AsyncAuthorList.view_is_async
+    assert AsyncAuthorEdit.view_is_async
+
+
+@pytest.mark.django_db
+def test_keyset_apage_matches_page():
+    Author.objects.bulk_create(Author(name=f'Autor {i:03d}') for i in range(30))
+    paginator = KeysetPaginator(Author.objects.all(), 10, ('name', 'pk'))
+
+    first = paginator.page()
+    second = async_to_sync(paginator.apage)(after=first.next_cursor)
+
+    assert [a.pk for a in second] == \
+        [a.pk for a in paginator.page(after=first.next_cursor)]
+    assert second.has_previous() and second.has_next()
+
+
+@pytest.mark.django_db
+def test_async_list(settings):
+    settings.AUTHOR_LIST_PAGINATION = 'keyset'
+    Author.objects.bulk_create(Author(name=f'Autor {i:03d}') for i in range(30))
+    url = reverse('async_list_authors')
+
+    response, queries = request('get', url)
+
+    assert response.status_code == 200
+    assert response['X-Table-Cache'] == 'miss'
+    assert 'Autor 000' in response.content.decode()
+    assert 'after=' in response.content.decode()
+    # estado de la biblioteca (ETag) + página
+    assert queries == 2
+
+    response, queries = request('get', url)
+    assert response['X-Table-Cache'] == 'hit'
+    assert queries == 1
+
+
+@pytest.mark.django_db
+def test_async_list_offset_fallback(settings):
+    settings.AUTHOR_LIST_PAGINATION = 'offset'
+    Author.objects.create(name="Asimov")
+
+    response, _queries = request('get', reverse('async_list_authors'))
+
+    assert response.status_code == 200
+    assert 'Asimov' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_async_edit_get_lazy_rows():
+    author = seed_author(120)
+
+    response, queries = request('get', reverse('async_edit_authors',
+                                               args=[author.pk]))
+
+    content = response.content.decode()
+    assert response.status_code == 200
+    # autor + COUNT de libros + primer tramo de libros
+    assert queries == 3
+    assert 'name="authorbook_set-INITIAL_FORMS" value="120"' in content
+    assert 'name="authorbook_set-49-title"' in content
+    assert 'name="authorbook_set-50-title"' not in content
+
+
+@pytest.mark.django_db
+def test_async_edit_get_missing_author():
+    response, _queries = request('get', reverse('async_edit_authors',
+                                                args=[999]))
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_async_edit_post():
+    author = seed_author(20)
+    url = reverse('async_edit_authors', args=[author.pk])
+    data = edit_post_data(author, name="Asimov")
+    data['authorbook_set-0-title'] = "Fundación"
+
+    response, _queries = request('post', url, data)
+
+    assert response.status_code == 302
+    author.refresh_from_db()
+    assert author.name == "Asimov"
+    assert Book.objects.filter(author=author, title="Fundación").exists()
+
+    response, _queries = request('post', url, edit_post_data(author, name=""))
+    assert response.status_code == 200
+    assert 'is-invalid' in response.content.decode()
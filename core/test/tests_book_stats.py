@@ -0,0 +1,184 @@
+import random
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.importer import LibraryImporter
+from core.models import Author, Book
+from core.test.tests_concurrency import PREFIX, versioned_post_data
+from core.test.tests_views import seed_author
+
+STATS = ('book_count', 'first_year', 'last_year')
+
+
+@pytest.fixture
+def author(db):
+    # años 1900, 1901, 1902
+    return seed_author(3)
+
+
+def stats(author):
+    return Author.objects.values_list(*STATS).get(pk=author.pk)
+
+
+def assert_consistent():
+    rows = Author.objects.with_book_stats().values_list(
+        'pk', *STATS, 'actual_count', 'actual_first', 'actual_last')
+    for row in rows:
+        assert row[1:4] == row[4:], row[0]
+
+
+def add_rows(data, *years):
+    total = int(data[f'{PREFIX}-TOTAL_FORMS'])
+    for i, year in enumerate(years, start=total):
+        data[f'{PREFIX}-{i}-title'] = f'Nuevo {year}'
+        data[f'{PREFIX}-{i}-published_year'] = str(year)
+    data[f'{PREFIX}-TOTAL_FORMS'] = str(total + len(years))
+    return data
+
+
+def save(client, author, data):
+    response = client.post(reverse('edit_authors', args=[author.pk]), data)
+    assert response.status_code == 302
+    return stats(author)
+
+
+def test_create_with_books(client, db):
+    data = add_rows({
+        'name': "Ursula K. Le Guin",
+        f'{PREFIX}-TOTAL_FORMS': '0', f'{PREFIX}-INITIAL_FORMS': '0',
+        f'{PREFIX}-MIN_NUM_FORMS': '0', f'{PREFIX}-MAX_NUM_FORMS': '1000',
+    }, 1969, 1974)
+
+    client.post(reverse('create_authors'), data)
+
+    assert stats(Author.objects.get()) == (2, 1969, 1974)
+
+
+def test_added_rows_widen_the_range(client, author):
+    data = add_rows(versioned_post_data(author), 1850, 2000)
+
+    assert save(client, author, data) == (5, 1850, 2000)
+
+
+@pytest.mark.parametrize('row, expected', [
+    (0, (2, 1901, 1902)),   # el primero: se recalcula el mínimo
+    (1, (2, 1900, 1902)),   # uno del medio: los extremos no cambian
+    (2, (2, 1900, 1901)),
+])
+def test_deleted_rows(client, author, row, expected):
+    data = versioned_post_data(author, **{f'{row}-DELETE': 'on'})
+
+    assert save(client, author, data) == expected
+
+
+def test_deleted_row_uses_stored_year(client, author):
+    # el año editado en una fila que se borra no cuenta
+    data = versioned_post_data(author, **{'0-DELETE': 'on',
+                                          '0-published_year': '1500'})
+
+    assert save(client, author, data) == (2, 1901, 1902)
+
+
+def test_changed_year(client, author):
+    data = versioned_post_data(author, **{'2-published_year': '1890'})
+
+    assert save(client, author, data) == (3, 1890, 1901)
+
+
+def test_delete_all_books(client, author):
+    data = versioned_post_data(author, **{f'{i}-DELETE': 'on' for i in range(3)})
+
+    assert save(client, author, data) == (0, None, None)
+
+
+def test_random_formset_edits_stay_consistent(client, author):
+    rng = random.Random(0)
+    for _ in range(20):
+        author.refresh_from_db()
+        books = list(author.books.order_by('pk'))
+        changes = {}
+        for i, _book in enumerate(books):
+            action = rng.choice(['keep', 'keep', 'year', 'delete'])
+            if action == 'year':
+                changes[f'{i}-published_year'] = str(rng.randint(1800, 2020))
+            elif action == 'delete':
+                changes[f'{i}-DELETE'] = 'on'
+        data = add_rows(versioned_post_data(author, **changes),
+                        *(rng.randint(1800, 2020) for _ in range(rng.randint(0, 3))))
+        save(client, author, data)
+        assert_consistent()
+
+
+def test_single_book_saves(author):
+    other = seed_author(1)
+
+    book = Book.objects.create(author=author, title="Nuevo", published_year=2020)
+    assert stats(author) == (4, 1900, 2020)
+
+    book = Book.objects.get(pk=book.pk)
+    book.published_year = 1800
+    book.save()
+    assert stats(author) == (4, 1800, 1902)
+
+    book.author = other
+    book.save()
+    assert stats(author) == (3, 1900, 1902)
+    assert stats(other) == (2, 1800, 1900)
+
+    book.delete()
+    assert stats(other) == (1, 1900, 1900)
+    assert_consistent()
+
+
+def test_importer_sets_stats(db):
+    records = [{'name': "Borges", 'books': [
+        {'title': "Ficciones", 'published_year': 1944},
+        {'title': "El Aleph", 'published_year': 1949},
+    ]}, {'name': "Sin libros", 'books': []}]
+
+    LibraryImporter().run(records)
+
+    assert stats(Author.objects.get(name="Borges")) == (2, 1944, 1949)
+    assert stats(Author.objects.get(name="Sin libros")) == (0, None, None)
+
+
+def test_list_reads_columns_without_group_by(client, author):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse('list_authors'), {'sort': '-last_year'})
+
+    assert not any('GROUP BY' in query['sql'] for query in queries.captured_queries)
+    record = list(response.context['table'].paginated_rows)[0].record
+    assert (record.book_count, record.first_year, record.last_year) == (3, 1900, 1902)
+
+
+def test_rebuild_command(author, capsys):
+    Author.objects.filter(pk=author.pk).update(book_count=7, last_year=None)
+
+    with pytest.raises(CommandError):
+        call_command('rebuild_book_stats', '--check')
+    assert stats(author) == (7, 1900, None)
+
+    call_command('rebuild_book_stats', '--batch-size', '1')
+    assert stats(author) == (3, 1900, 1902)
+    assert "1 desfasados" in capsys.readouterr().out
+    call_command('rebuild_book_stats', '--check')
+
+
+def test_rebuild_command_refreshes_author_list(client, author,
+                                               django_capture_on_commit_callbacks):
+    Author.objects.filter(pk=author.pk).update(book_count=7)
+    url = reverse('list_authors')
+    first = client.get(url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        call_command('rebuild_book_stats', verbosity=0)
+
+    response = client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+    assert response.status_code == 200
+    assert response['X-Table-Cache'] == 'miss'
+    record = list(response.context['table'].paginated_rows)[0].record
+    assert record.book_count == 3
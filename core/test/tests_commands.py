@@ -0,0 +1,32 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from core.forms import BookFormSet
+from core.models import Author, Book
+
+
+@pytest.mark.django_db
+def test_explain_queries_uses_indexes():
+    author = Author.objects.create(name="Asimov")
+    Book.objects.create(author=author, title="Fundación", published_year=1951)
+    out = StringIO()
+
+    call_command('explain_queries', stdout=out)
+
+    output = out.getvalue()
+    assert 'core_author_name_idx' in output
+    assert 'core_book_author_year_idx' in output
+
+
+@pytest.mark.django_db
+def test_formset_queryset_ordered_by_year():
+    author = Author.objects.create(name="Asimov")
+    Book.objects.create(author=author, title="Fundación", published_year=1951)
+    Book.objects.create(author=author, title="Yo, Robot", published_year=1950)
+
+    formset = BookFormSet(instance=author, prefix='authorbook_set')
+
+    years = [form.instance.published_year for form in formset.initial_forms]
+    assert years == [1950, 1951]
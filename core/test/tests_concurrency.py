@@ -0,0 +1,154 @@
+import pytest
+from django.urls import reverse
+
+from core.models import Author, Book
+from core.test.tests_views import delta_post_data, edit_post_data, seed_author
+
+PREFIX = 'authorbook_set'
+
+
+def versioned_post_data(author, **changes):
+    """
+    Datos del formulario tal como se mostró ahora: con la versión de cada
+    fila. ``changes`` son ``{campo: valor}`` o ``{'i-campo': valor}``.
+    """
+    data = edit_post_data(author, name=author.name)
+    data['version'] = str(author.version)
+    for i, book in enumerate(author.books.order_by('pk')):
+        data[f'{PREFIX}-{i}-version'] = str(book.version)
+    for key, value in changes.items():
+        data[key if key == 'name' else f'{PREFIX}-{key}'] = value
+    return data
+
+
+@pytest.fixture
+def author(db):
+    return seed_author(3)
+
+
+def test_save_increments_versions(client, author):
+    url = reverse('edit_authors', args=[author.pk])
+
+    response = client.post(url, versioned_post_data(
+        author, name="Asimov", **{'0-title': "Fundación"}))
+
+    assert response.status_code == 302
+    author.refresh_from_db()
+    books = list(author.books.order_by('pk'))
+    assert author.version == 1
+    assert [b.version for b in books] == [1, 0, 0]
+
+
+def test_concurrent_edit_of_same_row_conflicts(client, author):
+    url = reverse('edit_authors', args=[author.pk])
+    # los dos editores abren el formulario con las mismas versiones
+    first = versioned_post_data(author, **{'0-title': "Fundación"})
+    second = versioned_post_data(author, **{'0-title': "Yo, Robot"})
+
+    assert client.post(url, first).status_code == 302
+    response = client.post(url, second)
+
+    assert response.status_code == 409
+    content = response.content.decode()
+    assert 'Fila 1' in content
+    assert '«Yo, Robot (1900)» →' in content
+    assert '«Fundación (1900)»' in content
+    # lo enviado sigue en el formulario
+    assert 'value="Yo, Robot"' in content
+    assert author.books.filter(title="Fundación").exists()
+    assert not author.books.filter(title="Yo, Robot").exists()
+
+
+def test_conflict_saves_nothing(client, author):
+    url = reverse('edit_authors', args=[author.pk])
+    stale = versioned_post_data(author, name="Isaac", **{
+        '0-title': "Otro", '2-title': "Nuevo título",
+    })
+    client.post(url, versioned_post_data(author, **{'0-title': "Fundación"}))
+
+    response = client.post(url, stale)
+
+    assert response.status_code == 409
+    author.refresh_from_db()
+    assert author.name == "Isaac Asimov"
+    assert not author.books.filter(title="Nuevo título").exists()
+
+
+def test_stale_untouched_row_is_reported(client, author):
+    url = reverse('edit_authors', args=[author.pk])
+    first = versioned_post_data(author, **{'0-title': "Fundación"})
+    second = versioned_post_data(author, **{'1-title': "Yo, Robot"})
+
+    assert client.post(url, first).status_code == 302
+    # ``second`` reenvía el título viejo de la fila 0 con su versión vieja:
+    # guardarlo desharía el cambio del primer editor
+    response = client.post(url, second)
+
+    assert response.status_code == 409
+    content = response.content.decode()
+    assert 'Fila 1' in content
+    assert 'Fila 2' not in content
+    assert author.books.filter(title="Fundación").exists()
+
+
+def test_delete_of_edited_row_conflicts(client, author):
+    url = reverse('edit_authors', args=[author.pk])
+    edit = versioned_post_data(author, **{'0-title': "Fundación"})
+    delete = versioned_post_data(author, **{'0-DELETE': 'on'})
+
+    client.post(url, edit)
+    response = client.post(url, delete)
+
+    assert response.status_code == 409
+    assert author.books.filter(title="Fundación").exists()
+
+
+def test_edit_of_deleted_row_is_rejected(client, author):
+    url = reverse('edit_authors', args=[author.pk])
+    book = author.books.order_by('pk').first()
+    stale = versioned_post_data(author, **{'0-title': "Fundación"})
+    Book.objects.filter(pk=book.pk).delete()
+
+    response = client.post(url, stale)
+
+    assert response.status_code == 409
+    assert 'eliminado' in response.content.decode()
+    assert not Book.objects.filter(title="Fundación").exists()
+
+
+def test_delta_edit_of_deleted_row_is_rejected(client, author):
+    url = reverse('edit_authors', args=[author.pk])
+    stale = delta_post_data(author, changed={1: "Yo, Robot"})
+    book = author.books.order_by('published_year', 'id')[1]
+    Book.objects.filter(pk=book.pk).delete()
+
+    response = client.post(url, stale)
+
+    assert response.status_code == 409
+    assert [row['index'] for row in response.context['conflict']] == [1]
+    assert not Book.objects.filter(title="Yo, Robot").exists()
+
+
+def test_concurrent_author_rename_conflicts(client, author):
+    url = reverse('edit_authors', args=[author.pk])
+    first = versioned_post_data(author, name="Isaac")
+    second = versioned_post_data(author, name="I. Asimov")
+
+    client.post(url, first)
+    response = client.post(url, second)
+
+    assert response.status_code == 409
+    assert 'Autor:' in response.content.decode()
+    assert Author.objects.get(pk=author.pk).name == "Isaac"
+
+
+def test_unchanged_stale_rows_are_ignored(client, author):
+    url = reverse('edit_authors', args=[author.pk])
+    stale = versioned_post_data(author, **{'1-title': "Yo, Robot"})
+    client.post(url, versioned_post_data(author, **{'0-title': "Fundación"}))
+
+    # la fila 0 quedó vieja en ``stale`` pero este editor no la tocó
+    stale[f'{PREFIX}-0-title'] = "Fundación"
+    response = client.post(url, stale)
+
+    assert response.status_code == 302
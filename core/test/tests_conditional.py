@@ -0,0 +1,150 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import reverse
+
+from core.models import Author, Book
+from core.test.tests_concurrency import versioned_post_data
+from core.test.tests_views import seed_author
+
+
+@pytest.fixture
+def author(db):
+    return seed_author(3)
+
+
+def revalidate(client, url, response, django_assert_num_queries, queries=1):
+    """Repite el GET con la ETag de ``response``."""
+    with django_assert_num_queries(queries):
+        return client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+
+def test_list_not_modified(client, author, django_assert_num_queries):
+    url = reverse('list_authors')
+    first = client.get(url)
+
+    assert first.status_code == 200
+    assert first['ETag'] and first['Last-Modified']
+    assert 'no-cache' in first['Cache-Control']
+    second = revalidate(client, url, first, django_assert_num_queries)
+    assert second.status_code == 304
+    assert second.content == b''
+
+
+def test_list_if_modified_since(client, author):
+    url = reverse('list_authors')
+    first = client.get(url)
+
+    second = client.get(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+
+    assert second.status_code == 304
+
+
+@pytest.mark.parametrize('change', ['create', 'rename', 'book', 'delete'])
+def test_list_etag_follows_writes(client, author, change):
+    url = reverse('list_authors')
+    etag = client.get(url)['ETag']
+
+    if change == 'create':
+        Author.objects.create(name="Ursula K. Le Guin")
+    elif change == 'rename':
+        client.post(reverse('edit_authors', args=[author.pk]),
+                    versioned_post_data(author, name="Asimov"))
+    elif change == 'book':
+        client.post(reverse('edit_authors', args=[author.pk]),
+                    versioned_post_data(author, **{'0-title': "Fundación"}))
+    else:
+        Author.objects.create(name="Ursula K. Le Guin")
+        etag = client.get(url)['ETag']
+        # la baja no cambia el máximo de updated_at, pero sí el número
+        author.delete()
+
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+def test_edit_page_not_modified(client, author, django_assert_num_queries):
+    url = reverse('edit_authors', args=[author.pk])
+    first = client.get(url)
+
+    assert first.status_code == 200
+    second = revalidate(client, url, first, django_assert_num_queries)
+    assert second.status_code == 304
+
+
+@pytest.mark.parametrize('url_name', ['async_list_authors',
+                                      'async_edit_authors'])
+def test_async_views_not_modified(author, django_assert_num_queries, url_name):
+    url = reverse(url_name,
+                  args=[author.pk] if url_name == 'async_edit_authors' else [])
+    get = async_to_sync(AsyncClient().get)
+    first = get(url)
+
+    assert first.status_code == 200
+    assert 'no-cache' in first['Cache-Control']
+    with django_assert_num_queries(1):
+        second = get(url, headers={'If-None-Match': first['ETag']})
+    assert second.status_code == 304
+
+
+def test_edit_page_revalidates_after_csrf_rotation(client, author):
+    url = reverse('edit_authors', args=[author.pk])
+    first = client.get(url)
+    old_token = client.cookies['csrftoken'].value
+
+    # p. ej. un login rota el secreto; o el navegador borró la cookie
+    client.cookies['csrftoken'] = 'x' * 32
+    rotated = client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+    del client.cookies['csrftoken']
+    cleared = client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+
+    assert rotated.status_code == 200
+    assert cleared.status_code == 200
+    assert client.cookies['csrftoken'].value not in ('', old_token)
+    assert 'Last-Modified' not in first
+
+
+@pytest.mark.parametrize('change', ['formset', 'delete_row', 'book_save'])
+def test_edit_page_changes_with_books(client, author, change):
+    url = reverse('edit_authors', args=[author.pk])
+    etag = client.get(url)['ETag']
+
+    if change == 'formset':
+        client.post(url, versioned_post_data(author, **{'1-title': "Yo, Robot"}))
+    elif change == 'delete_row':
+        client.post(url, versioned_post_data(author, **{'2-DELETE': 'on'}))
+    else:
+        book = author.books.first()
+        book.title = "Fundación"
+        book.save()
+
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+def test_book_changes_touch_author(author):
+    before = Author.objects.get(pk=author.pk).updated_at
+
+    Book.objects.create(author=author, title="Nuevo", published_year=2000)
+
+    assert Author.objects.get(pk=author.pk).updated_at > before
+
+
+def test_deleting_author_does_not_touch_per_book(author,
+                                                 django_assert_max_num_queries):
+    # el collector borra los libros con el autor; no un UPDATE por libro
+    with django_assert_max_num_queries(6):
+        author.delete()
+
+
+def test_edit_page_missing_author(client, db):
+    assert client.get(reverse('edit_authors', args=[999])).status_code == 404
+
+
+def test_book_rows_not_modified(client, author, django_assert_num_queries):
+    url = reverse('author_book_rows', args=[author.pk])
+    first = client.get(url, {'start': 0, 'stop': 2})
+
+    with django_assert_num_queries(1):
+        second = client.get(url, {'start': 0, 'stop': 2},
+                            HTTP_IF_NONE_MATCH=first['ETag'])
+
+    assert second.status_code == 304
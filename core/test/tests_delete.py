@@ -0,0 +1,80 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core import deletion
+from core.models import Author, Book
+
+
+def seed_author(n_books, name="Isaac Asimov"):
+    author = Author.objects.create(name=name)
+    Book.objects.bulk_create(
+        Book(author=author, title=f'Libro {i}', published_year=1950)
+        for i in range(n_books)
+    )
+    return author
+
+
+def delete_queries(client, author):
+    url = reverse('delete_authors', args=[author.pk])
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.post(url)
+    assert response.status_code == 302
+    return len(ctx.captured_queries)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('chunk_size', [None, 100])
+def test_delete_view_query_count_is_constant(client, settings, chunk_size):
+    settings.AUTHOR_DELETE_CHUNK_SIZE = chunk_size
+    other = seed_author(3, name="Otro")
+
+    small = delete_queries(client, seed_author(10))
+    large = delete_queries(client, seed_author(80))
+
+    assert small == large
+    assert not Author.objects.exclude(pk=other.pk).exists()
+    assert Book.objects.count() == 3
+
+
+@pytest.mark.django_db
+def test_delete_author_in_chunks():
+    author = seed_author(25)
+    Book.objects.create(author=Author.objects.create(name="Otro"),
+                        title='x', published_year=1)
+
+    deleted = deletion.delete_author(author, chunk_size=10)
+
+    assert deleted == 25
+    assert not Author.objects.filter(pk=author.pk).exists()
+    assert Book.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_delete_view_background_mode(client, settings, monkeypatch,
+                                     django_capture_on_commit_callbacks):
+    settings.AUTHOR_DELETE_BACKGROUND_THRESHOLD = 5
+    calls = []
+    monkeypatch.setattr(deletion, 'delete_author_in_background',
+                        lambda pk, chunk_size: calls.append(pk))
+    large = seed_author(6)
+    small = seed_author(5, name="Pocos libros")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        client.post(reverse('delete_authors', args=[large.pk]))
+        client.post(reverse('delete_authors', args=[small.pk]))
+
+    assert calls == [large.pk]
+    assert Author.objects.filter(pk=large.pk).exists()
+    assert not Author.objects.filter(pk=small.pk).exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_delete_author_in_background_thread():
+    author = seed_author(20)
+
+    deletion.delete_author_in_background(author.pk, chunk_size=7).result()
+
+    assert not Author.objects.exists()
+    assert not Book.objects.exists()
@@ -0,0 +1,65 @@
+import csv
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from core.export import export_lines
+from core.models import Author, Book
+
+
+@pytest.fixture
+def library(db):
+    asimov = Author.objects.create(name="Isaac Asimov")
+    Book.objects.create(author=asimov, title="Yo, Robot", published_year=1950)
+    Book.objects.create(author=asimov, title="Fundación", published_year=1951)
+    Author.objects.create(name="Sin libros")
+    clarke = Author.objects.create(name="Arthur C. Clarke")
+    Book.objects.create(author=clarke, title="2001", published_year=1968)
+    return [asimov, clarke]
+
+
+def test_export_csv_view(client, library):
+    response = client.get(reverse('export_library', args=['csv']))
+
+    assert response.streaming
+    assert response['Content-Type'].startswith('text/csv')
+    rows = list(csv.reader(io.StringIO(
+        b''.join(response.streaming_content).decode())))
+    assert rows[0] == ['author_id', 'author_name', 'book_id', 'title',
+                       'published_year']
+    assert [r[3] for r in rows[1:]] == ['Yo, Robot', 'Fundación', '', '2001']
+
+
+def test_export_jsonl_view(client, library):
+    response = client.get(reverse('export_library', args=['jsonl']))
+
+    lines = b''.join(response.streaming_content).decode().splitlines()
+    authors = [json.loads(line) for line in lines]
+    assert [a['name'] for a in authors] == \
+        ["Isaac Asimov", "Sin libros", "Arthur C. Clarke"]
+    assert [b['title'] for b in authors[0]['books']] == ['Yo, Robot', 'Fundación']
+
+
+def test_export_unknown_format(client, library):
+    response = client.get(reverse('export_library', args=['xml']))
+    assert response.status_code == 404
+
+
+def test_export_queries_per_chunk(library, django_assert_num_queries):
+    # 3 autores en tramos de 2: un cursor de autores + libros por tramo
+    with django_assert_num_queries(3):
+        lines = list(export_lines('jsonl', chunk_size=2))
+    assert len(lines) == 3
+
+
+def test_export_library_command(library, tmp_path):
+    out = io.StringIO()
+    call_command('export_library', '--format', 'csv', stdout=out)
+    assert out.getvalue().count('\n') == 5
+
+    path = tmp_path / 'library.jsonl'
+    call_command('export_library', '--output', str(path))
+    assert len(path.read_text(encoding='utf-8').splitlines()) == 3
@@ -205,4 +205,90 @@ def test_formset_save_commit_false(formset_base, book_formset_class):
     assert formset.is_valid()
     unsaved_books = formset.save(commit=False)
     assert len(unsaved_books) == 1
-    assert Book.objects.filter(author=author).count() == 0  # aún no guardados
\ No newline at end of file
+    assert Book.objects.filter(author=author).count() == 0  # aún no guardados
+
+# --- Guardado por lotes (BookFormSet.bulk_save) ---
+
+def bulk_formset_data(books, new_rows, changed=(), deleted=()):
+    """
+    Construye el POST de ``core.forms.BookFormSet`` con las filas existentes
+    de ``books`` y ``new_rows`` filas nuevas.
+    """
+    prefix = 'authorbook_set'
+    data = {
+        f'{prefix}-TOTAL_FORMS': str(len(books) + new_rows),
+        f'{prefix}-INITIAL_FORMS': str(len(books)),
+        f'{prefix}-MIN_NUM_FORMS': '0',
+        f'{prefix}-MAX_NUM_FORMS': '1000',
+    }
+    for i, book in enumerate(books):
+        data[f'{prefix}-{i}-id'] = str(book.id)
+        data[f'{prefix}-{i}-title'] = (
+            f'{book.title} (rev)' if i in changed else book.title
+        )
+        data[f'{prefix}-{i}-published_year'] = str(book.published_year)
+        if i in deleted:
+            data[f'{prefix}-{i}-DELETE'] = 'on'
+    for j in range(new_rows):
+        i = len(books) + j
+        data[f'{prefix}-{i}-title'] = f'Nuevo {j}'
+        data[f'{prefix}-{i}-published_year'] = str(2000 + j)
+    return data
+
+
+@pytest.mark.django_db
+def test_bulk_save_creates_updates_and_deletes():
+    from core.forms import BookFormSet
+
+    author = Author.objects.create(name="Isaac Asimov")
+    books = [Book.objects.create(author=author, title=f'Libro {i}',
+                                 published_year=1950 + i) for i in range(3)]
+
+    data = bulk_formset_data(books, new_rows=2, changed={0}, deleted={1})
+    formset = BookFormSet(data, instance=author, prefix='authorbook_set')
+    assert formset.is_valid(), formset.errors
+
+    saved = formset.bulk_save()
+
+    assert len(saved) == 3
+    assert all(book.pk for book in saved)
+    titles = set(author.books.values_list('title', flat=True))
+    assert titles == {'Libro 0 (rev)', 'Libro 2', 'Nuevo 0', 'Nuevo 1'}
+
+
+@pytest.mark.django_db
+def test_bulk_save_rejects_book_of_other_author():
+    from core.forms import BookFormSet
+
+    author = Author.objects.create(name="Asimov")
+    other = Author.objects.create(name="Clarke")
+    foreign = Book.objects.create(author=other, title="2001",
+                                  published_year=1968)
+
+    data = bulk_formset_data([foreign], new_rows=0)
+    formset = BookFormSet(data, instance=author, prefix='authorbook_set')
+    assert not formset.is_valid()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('rows', [3, 30])
+def test_bulk_save_query_count_is_constant(rows, django_assert_num_queries):
+    from core.forms import BookFormSet
+
+    author = Author.objects.create(name="Asimov")
+    books = [Book.objects.create(author=author, title=f'Libro {i}',
+                                 published_year=1950 + i)
+             for i in range(rows * 2)]
+
+    data = bulk_formset_data(books, new_rows=rows,
+                             changed=set(range(rows)),
+                             deleted={rows})
+    # 1 SELECT de libros existentes + SAVEPOINT/RELEASE + DELETE + UPDATE
+    # + INSERT + UPDATE de updated_at del autor, independiente del número
+    # de filas.
+    with django_assert_num_queries(7):
+        formset = BookFormSet(data, instance=author, prefix='authorbook_set')
+        assert formset.is_valid(), formset.errors
+        formset.bulk_save()
+
+    assert author.books.count() == rows * 2 - 1 + rows
@@ -0,0 +1,141 @@
+import io
+import json
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+
+from core.export import export_lines
+from core.importer import ImportFormatError, LibraryImporter, read_records
+from core.models import Author, Book
+
+
+def jsonl(*records):
+    return ''.join(json.dumps(r) + '\n' for r in records)
+
+
+@pytest.mark.django_db
+def test_import_jsonl_in_batches():
+    records = [
+        {'name': f'Autor {i}',
+         'books': [{'title': f'Libro {i}-{j}', 'published_year': 1950 + j}
+                   for j in range(3)]}
+        for i in range(10)
+    ]
+    importer = LibraryImporter(batch_size=6)
+
+    state = importer.run(read_records(io.StringIO(jsonl(*records)), 'jsonl'))
+
+    assert (state.authors, state.books, state.skipped) == (10, 30, 0)
+    assert Book.objects.filter(author__name='Autor 7').count() == 3
+
+
+@pytest.mark.django_db
+def test_import_skips_invalid_records():
+    data = jsonl(
+        {'name': '', 'books': []},
+        {'name': 'Asimov', 'books': [{'title': 'Fundación',
+                                      'published_year': 'mil'}]},
+        {'name': 'x' * 101, 'books': []},
+        {'name': 'Clarke', 'books': [{'title': '2001',
+                                      'published_year': '1968'}]},
+    )
+    importer = LibraryImporter()
+
+    state = importer.run(read_records(io.StringIO(data), 'jsonl'))
+
+    assert state.skipped == 3
+    assert [n for n, _errors in importer.errors] == [1, 2, 3]
+    assert 'published_year' in importer.errors[1][1]['books.0']
+    assert list(Author.objects.values_list('name', flat=True)) == ['Clarke']
+
+
+@pytest.mark.django_db
+def test_import_skips_unreadable_records():
+    data = (jsonl({'name': 'Asimov'})
+            + '{"name": "Clarke", \n'
+            + '["Le Guin"]\n'
+            + jsonl({'name': 'Bradbury', 'books': 'ninguno'},
+                    {'name': 'Lem', 'books': ['Solaris']},
+                    {'name': 'Herbert'}))
+    importer = LibraryImporter(batch_size=1)
+
+    state = importer.run(read_records(io.StringIO(data), 'jsonl'))
+
+    assert (state.records, state.skipped) == (6, 4)
+    assert [n for n, _errors in importer.errors] == [2, 3, 4, 5]
+    assert importer.errors[0][1]['line'][0].startswith('2: JSON inválido')
+    assert importer.errors[1][1]['line'] == ['3: el registro no es un objeto JSON']
+    assert set(Author.objects.values_list('name', flat=True)) == \
+        {'Asimov', 'Herbert'}
+
+
+def test_import_csv_requires_header():
+    with pytest.raises(ImportFormatError, match='author_id, author_name'):
+        next(read_records(io.StringIO('title,published_year\nX,1990\n'), 'csv'))
+
+
+@pytest.mark.django_db
+def test_import_roundtrip_csv():
+    author = Author.objects.create(name="Isaac Asimov")
+    Book.objects.create(author=author, title="Yo, Robot", published_year=1950)
+    Author.objects.create(name="Sin libros")
+    exported = ''.join(export_lines('csv'))
+    Book.objects.all().delete()
+    Author.objects.all().delete()
+
+    LibraryImporter().run(read_records(io.StringIO(exported), 'csv'))
+
+    assert Author.objects.count() == 2
+    assert Book.objects.get().author.name == "Isaac Asimov"
+
+
+@pytest.mark.django_db
+def test_import_command_resumes_from_checkpoint(tmp_path):
+    path = tmp_path / 'library.jsonl'
+    path.write_text(jsonl(*({'name': f'Autor {i}', 'books': []}
+                            for i in range(5))))
+    checkpoint = tmp_path / 'library.checkpoint'
+    # como si una carga anterior hubiera confirmado los 3 primeros
+    checkpoint.write_text(json.dumps({'records': 3, 'authors': 3,
+                                      'books': 0, 'skipped': 0}))
+
+    out = io.StringIO()
+    call_command('import_library', str(path), '--checkpoint', str(checkpoint),
+                 '--resume', stdout=out)
+
+    assert list(Author.objects.values_list('name', flat=True)) == \
+        ['Autor 3', 'Autor 4']
+    assert json.loads(checkpoint.read_text())['records'] == 5
+    assert 'libros/s' in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_import_upload_view(client):
+    upload = SimpleUploadedFile('library.jsonl', jsonl(
+        {'name': 'Asimov', 'books': [{'title': 'Fundación',
+                                      'published_year': 1951}]},
+    ).encode())
+
+    response = client.post(reverse('import_library'), {'file': upload})
+
+    assert response.status_code == 302
+    assert Book.objects.get().title == 'Fundación'
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('name, content, error', [
+    ('library.csv', b'title,published_year\nX,1990\n', 'Faltan columnas'),
+    ('library.jsonl', '{"name": "Asimov"}\n'.encode() + b'{"name": "L\xe9m"}\n',
+     'UTF-8'),
+])
+def test_import_upload_view_rejects_unreadable_file(client, name, content,
+                                                    error):
+    upload = SimpleUploadedFile(name, content)
+
+    response = client.post(reverse('import_library'), {'file': upload})
+
+    assert response.status_code == 200
+    assert error in response.content.decode()
+    assert not Author.objects.exists()
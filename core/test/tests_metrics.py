@@ -0,0 +1,174 @@
+import json
+import logging
+import threading
+import time
+from io import StringIO
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import AsyncClient, RequestFactory
+from django.urls import ResolverMatch, reverse
+
+from core.metrics import registry
+from core.middleware import RequestMetricsMiddleware
+from core.models import Author, Book
+from core.tables import AuthorTable
+from core.test.tests_views import seed_author
+
+
+@pytest.fixture(autouse=True)
+def metrics(settings, tmp_path):
+    settings.REQUEST_METRICS_DIR = tmp_path
+    settings.REQUEST_METRICS_FLUSH_INTERVAL = None
+    registry.reset()
+    yield registry
+    registry.reset()
+
+
+@pytest.mark.django_db
+def test_server_timing_header(client):
+    Author.objects.create(name="Asimov")
+
+    response = client.get(reverse('list_authors'))
+
+    timing = response['Server-Timing']
+    assert 'sql;dur=' in timing
+    assert 'tpl;dur=' in timing
+    assert 'total;dur=' in timing
+
+
+@pytest.mark.django_db
+def test_records_per_view(client, metrics):
+    author = Author.objects.create(name="Asimov")
+    Book.objects.create(author=author, title="Fundación", published_year=1951)
+
+    client.get(reverse('list_authors'))
+    client.get(reverse('list_authors'))
+    client.get(reverse('edit_authors', args=[author.pk]))
+
+    views = metrics.snapshot()
+    stats = views['core.views.AuthorList']
+    assert stats['requests'] == 2
+    assert stats['queries'] > 0
+    assert sum(stats['histogram']) == 2
+    assert views['core.views.AuthorEdit']['render_ms'] > 0
+    assert views['core.views.AuthorEdit']['duplicates'] == 0
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url_name', ['edit_authors', 'async_edit_authors'])
+def test_counts_queries_under_asgi(metrics, url_name):
+    author = seed_author(3)
+
+    # las consultas corren en el hilo de sync_to_async, no en el del
+    # event loop donde corre el middleware
+    response = async_to_sync(AsyncClient().get)(
+        reverse(url_name, args=[author.pk]))
+
+    assert response.status_code == 200
+    # autor + COUNT de libros + primer tramo de libros
+    assert '"3 queries"' in response['Server-Timing']
+    [stats] = metrics.snapshot().values()
+    assert stats['queries'] == 3 and stats['sql_ms'] > 0
+
+
+@pytest.mark.django_db
+def test_flags_duplicate_queries(client, settings, caplog, metrics):
+    settings.REQUEST_METRICS_DUPLICATE_THRESHOLD = 2
+    for i in range(3):
+        Author.objects.create(name=f"Autor {i}")
+
+    def n_plus_one(request):
+        names = [Author.objects.get(pk=pk).name
+                 for pk in Author.objects.values_list('pk', flat=True)]
+        return HttpResponse(', '.join(names))
+
+    request = RequestFactory().get('/')
+    request.resolver_match = ResolverMatch(n_plus_one, (), {})
+    middleware = RequestMetricsMiddleware(n_plus_one)
+
+    with caplog.at_level(logging.WARNING, logger='core.metrics'):
+        response = middleware(request)
+
+    assert 'dup;desc="2 duplicated"' in response['Server-Timing']
+    assert 'consultas duplicadas' in caplog.text
+
+
+@pytest.mark.django_db
+def test_server_timing_can_be_disabled(client, settings):
+    settings.REQUEST_METRICS_SERVER_TIMING = False
+
+    response = client.get(reverse('list_authors'))
+
+    assert 'Server-Timing' not in response
+
+
+@pytest.mark.django_db
+def test_render_time_includes_render_to_string(client, metrics, monkeypatch):
+    author = seed_author(3)
+    # el fragmento de la tabla se renderiza en la vista, no en la respuesta
+    monkeypatch.setattr(AuthorTable, 'before_render',
+                        lambda self, request: time.sleep(0.05), raising=False)
+
+    response = client.get(reverse('list_authors'))
+    client.get(reverse('author_book_rows', args=[author.pk]),
+               {'start': 0, 'stop': 3})
+
+    render = float(response['Server-Timing'].split('tpl;dur=')[1].split(',')[0])
+    assert render >= 50
+    assert metrics.snapshot()['core.views.AuthorBookRows']['render_ms'] > 0
+
+
+def test_concurrent_flushes(metrics, settings):
+    settings.REQUEST_METRICS_FLUSH_INTERVAL = 0
+    errors = []
+
+    def record():
+        try:
+            for _ in range(20):
+                metrics.record('vista', queries=1, duplicates=0, sql_ms=1.0,
+                               render_ms=1.0, total_ms=2.0)
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=record) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert metrics.snapshot()['vista']['requests'] == 160
+
+
+def test_flush_error_does_not_fail_request(metrics, settings, tmp_path, caplog):
+    # un archivo donde debería estar el directorio
+    settings.REQUEST_METRICS_DIR = tmp_path / 'archivo'
+    settings.REQUEST_METRICS_DIR.write_text('')
+    settings.REQUEST_METRICS_FLUSH_INTERVAL = 0
+
+    with caplog.at_level(logging.ERROR, logger='core.metrics'):
+        metrics.record('vista', queries=1, duplicates=0, sql_ms=1.0,
+                       render_ms=1.0, total_ms=2.0)
+
+    assert 'No se pudieron volcar' in caplog.text
+
+
+@pytest.mark.django_db
+def test_dump_metrics_merges_processes(client, metrics, tmp_path):
+    client.get(reverse('list_authors'))
+    path = metrics.flush()
+    # otro proceso con el mismo registro
+    (tmp_path / 'metrics-0.json').write_text(path.read_text())
+
+    out = StringIO()
+    call_command('dump_metrics', '--json', stdout=out)
+    views = json.loads(out.getvalue())
+    assert views['core.views.AuthorList']['requests'] == 2
+
+    out = StringIO()
+    call_command('dump_metrics', '--reset', stdout=out)
+    assert 'core.views.AuthorList' in out.getvalue()
+    assert not tmp_path.exists()
@@ -0,0 +1,131 @@
+import pytest
+from django.urls import reverse
+
+from core.models import Author
+from core.pagination import KeysetPaginator, encode_cursor
+
+
+@pytest.fixture
+def authors(db):
+    # nombres repetidos para ejercitar el desempate por id
+    return Author.objects.bulk_create(
+        Author(name=f'Autor {i // 2:03d}') for i in range(60)
+    )
+
+
+def walk(paginator):
+    seen, page = [], paginator.page()
+    while True:
+        seen.extend(obj.pk for obj in page)
+        if not page.has_next():
+            return seen
+        page = paginator.page(after=page.next_cursor)
+
+
+@pytest.mark.parametrize('ordering', [('name', 'pk'), ('-name', '-pk')])
+def test_keyset_walk_matches_offset_order(authors, ordering):
+    queryset = Author.objects.all()
+    paginator = KeysetPaginator(queryset, 7, ordering)
+
+    expected = list(queryset.order_by(*ordering).values_list('pk', flat=True))
+    assert walk(paginator) == expected
+
+
+def test_keyset_previous_page(authors):
+    paginator = KeysetPaginator(Author.objects.all(), 10, ('name', 'pk'))
+    first = paginator.page()
+    second = paginator.page(after=first.next_cursor)
+
+    back = paginator.page(before=second.previous_cursor)
+
+    assert [a.pk for a in back] == [a.pk for a in first]
+    assert not back.has_previous()
+    assert back.has_next()
+
+
+def test_keyset_ignores_foreign_cursor(authors):
+    paginator = KeysetPaginator(Author.objects.all(), 10, ('name', 'pk'))
+    other = encode_cursor(('-name', '-pk'), ['Autor 010', 1])
+
+    assert [a.pk for a in paginator.page(after=other)] == \
+        [a.pk for a in paginator.page()]
+    assert [a.pk for a in paginator.page(after='no-es-un-cursor')] == \
+        [a.pk for a in paginator.page()]
+
+
+def test_author_list_keyset_mode(client, authors, settings,
+                                 django_assert_num_queries):
+    settings.AUTHOR_LIST_PAGINATION = 'keyset'
+
+    # la página en una sola consulta, sin COUNT(*), más el estado de la
+    # biblioteca para ETag/Last-Modified
+    with django_assert_num_queries(2):
+        response = client.get(reverse('list_authors'))
+
+    page = response.context['keyset_page']
+    assert len(page) == 25
+    assert page.has_next()
+    assert f'after={page.next_cursor}' in response.content.decode()
+
+    response = client.get(reverse('list_authors'),
+                          {'after': page.next_cursor})
+    assert response.context['keyset_page'].has_previous()
+
+
+def test_author_list_offset_mode(client, authors, settings):
+    settings.AUTHOR_LIST_PAGINATION = 'offset'
+
+    response = client.get(reverse('list_authors'), {'page': 2})
+
+    assert response.status_code == 200
+    assert response.context['keyset_page'] is None
+    assert response.context['table'].page.number == 2
+
+
+@pytest.mark.parametrize('books_per_author', [0, 1, 20])
+# más la consulta del estado para ETag/Last-Modified
+@pytest.mark.parametrize('mode, queries', [('keyset', 2), ('offset', 3)])
+def test_author_list_aggregates_fixed_queries(client, db, settings,
+                                              django_assert_num_queries,
+                                              books_per_author, mode, queries):
+    from core.models import Book
+
+    settings.AUTHOR_LIST_PAGINATION = mode
+    authors = Author.objects.bulk_create(
+        Author(name=f'Autor {i:03d}') for i in range(30)
+    )
+    Book.objects.bulk_create(
+        Book(author=author, title=f'Libro {j}', published_year=1950 + j)
+        for author in authors for j in range(books_per_author)
+    )
+    # bulk_create no mantiene las estadísticas de Author
+    Author.objects.rebuild_book_stats()
+
+    with django_assert_num_queries(queries):
+        response = client.get(reverse('list_authors'), {'sort': 'name'})
+
+    rows = list(response.context['table'].paginated_rows)
+    assert len(rows) == 25
+    first = rows[0].record
+    assert first.book_count == books_per_author
+    if books_per_author:
+        assert first.first_year == 1950
+        assert first.last_year == 1950 + books_per_author - 1
+
+
+def test_author_list_sorts_by_book_count(client, db, settings):
+    from core.models import Book
+
+    settings.AUTHOR_LIST_PAGINATION = 'keyset'
+    few = Author.objects.create(name='A')
+    many = Author.objects.create(name='B')
+    Book.objects.create(author=few, title='x', published_year=2000)
+    Book.objects.bulk_create(
+        Book(author=many, title=f'y{i}', published_year=2000) for i in range(3)
+    )
+    Author.objects.rebuild_book_stats()
+
+    response = client.get(reverse('list_authors'), {'sort': '-book_count'})
+
+    records = [row.record for row in response.context['table'].paginated_rows]
+    assert [a.pk for a in records] == [many.pk, few.pk]
@@ -0,0 +1,121 @@
+import json
+import pstats
+
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+
+from core import profiling
+from core.test.tests_views import seed_author
+
+
+@pytest.fixture
+def profile_dir(tmp_path):
+    with override_settings(PROFILING_DIR=tmp_path, PROFILING_SAMPLE_RATE=0):
+        yield tmp_path
+
+
+@pytest.mark.django_db
+def test_sampled_request_writes_profile(client, profile_dir):
+    author = seed_author(20)
+
+    with override_settings(PROFILING_SAMPLE_RATE=1):
+        response = client.get(reverse('edit_authors', args=[author.pk]))
+
+    assert response.status_code == 200
+    # la ruta del perfil solo se devuelve a quien lo pidió con la cabecera
+    assert profiling.HEADER not in response
+    [prof] = profile_dir.glob('*.prof')
+    stats = pstats.Stats(str(prof))
+    assert any(filename.endswith('core/views.py')
+               for filename, _line, _name in stats.stats)
+    summary = json.loads(prof.with_suffix('.json').read_text())
+    assert summary['view'] == 'core.views.AuthorEdit'
+    assert summary['self_ms']['templates'] > 0
+    assert summary['self_ms']['core.forms'] > 0
+    assert sum(summary['self_ms'].values()) <= summary['total_ms'] * 1.5
+
+
+@pytest.mark.django_db
+def test_signed_header_profiles_request(client, profile_dir):
+    response = client.get(reverse('list_authors'),
+                          headers={profiling.HEADER: profiling.make_token()})
+
+    assert (profile_dir / response[profiling.HEADER]).exists()
+
+
+@pytest.mark.django_db
+def test_unsigned_or_expired_header_is_ignored(client, profile_dir):
+    url = reverse('list_authors')
+    token = profiling.make_token()
+
+    client.get(url, headers={profiling.HEADER: 'profile'})
+    client.get(url, headers={profiling.HEADER: token + 'x'})
+    with override_settings(PROFILING_TOKEN_MAX_AGE=-1):
+        response = client.get(url, headers={profiling.HEADER: token})
+
+    assert profiling.HEADER not in response
+    assert not list(profile_dir.iterdir())
+
+
+@pytest.mark.django_db
+def test_unsampled_request_does_not_start_profiler(client, profile_dir,
+                                                   monkeypatch):
+    def fail():
+        raise AssertionError("no debería perfilar")
+
+    monkeypatch.setattr('core.middleware.cProfile.Profile', fail)
+
+    assert client.get(reverse('list_authors')).status_code == 200
+    assert not profile_dir.exists() or not list(profile_dir.iterdir())
+
+
+@pytest.mark.django_db
+def test_overlapping_sampled_request_runs_unprofiled(client, profile_dir):
+    # otra petición del proceso se está perfilando
+    with profiling.lock, override_settings(PROFILING_SAMPLE_RATE=1):
+        response = client.get(reverse('list_authors'))
+
+    assert response.status_code == 200
+    assert not list(profile_dir.iterdir())
+
+
+@pytest.mark.django_db
+def test_busy_profiler_runs_request_unprofiled(client, profile_dir,
+                                               monkeypatch):
+    class Busy:
+        def enable(self):
+            raise ValueError("Another profiling tool is already active")
+
+    monkeypatch.setattr('core.middleware.cProfile.Profile', Busy)
+
+    with override_settings(PROFILING_SAMPLE_RATE=1):
+        response = client.get(reverse('list_authors'))
+
+    assert response.status_code == 200
+    assert not profiling.lock.locked()
+    assert not list(profile_dir.iterdir())
+
+
+def test_builtins_count_for_their_caller():
+    stats = pstats.Stats.__new__(pstats.Stats)
+    caller = ('/site-packages/django/db/backends/utils.py', 10, 'execute')
+    stats.stats = {
+        caller: (1, 1, 0.001, 0.004, {}),
+        ('~', 0, "<method 'execute' of 'sqlite3.Cursor' objects>"):
+            (1, 1, 0.003, 0.003, {caller: (1, 1, 0.003, 0.003)}),
+        ('/app/core/views.py', 5, 'get'): (1, 1, 0.002, 0.006, {}),
+    }
+
+    totals = profiling.summarize(stats)
+
+    assert totals['orm'] == pytest.approx(0.004)
+    assert totals['core.views'] == pytest.approx(0.002)
+    assert totals['templates'] == 0
+
+
+def test_profiling_token_command(capsys):
+    call_command('profiling_token')
+
+    assert profiling.valid_token(capsys.readouterr().out.strip())
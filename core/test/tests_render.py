@@ -0,0 +1,69 @@
+import re
+
+import pytest
+from django.template.loader import render_to_string
+
+from core.forms import AuthorForm, BookFormSet
+from core.models import Author, Book
+
+
+def normalize(html):
+    return re.sub(r'>\s+<', '><', html.strip())
+
+
+def assert_same_rows(forms):
+    assert normalize(render_to_string('core/book_rows.html', {'forms': forms})) \
+        == normalize(render_to_string('core/book_rows_widgets.html',
+                                      {'forms': forms}))
+
+
+@pytest.fixture
+def author(db):
+    author = Author.objects.create(name="Asimov")
+    Book.objects.create(author=author, title='Yo, <Robot> "&"',
+                        published_year=1950)
+    Book.objects.create(author=author, title="Fundación", published_year=0)
+    return author
+
+
+def test_unbound_rows_match_widgets(author):
+    formset = BookFormSet(instance=author, prefix='authorbook_set')
+
+    assert_same_rows(formset.forms)
+
+
+def test_bound_rows_match_widgets(author):
+    books = list(author.books.order_by('published_year', 'id'))
+    prefix = 'authorbook_set'
+    data = {
+        f'{prefix}-TOTAL_FORMS': '3',
+        f'{prefix}-INITIAL_FORMS': '2',
+        f'{prefix}-0-id': str(books[0].pk),
+        f'{prefix}-0-author': str(author.pk),
+        f'{prefix}-0-title': '',
+        f'{prefix}-0-published_year': 'abc',
+        f'{prefix}-1-id': str(books[1].pk),
+        f'{prefix}-1-author': str(author.pk),
+        f'{prefix}-1-title': books[1].title,
+        f'{prefix}-1-published_year': '1951',
+        f'{prefix}-1-DELETE': 'on',
+        f'{prefix}-2-title': 'Nuevo',
+        f'{prefix}-2-published_year': '',
+    }
+    formset = BookFormSet(data, instance=author, prefix=prefix)
+    formset.is_valid()
+
+    assert_same_rows(formset.forms)
+
+
+def test_author_form_helper():
+    helper = AuthorForm.helper
+
+    assert not helper.form_tag
+    assert AuthorForm().helper is helper
+    html = render_to_string('core/edit_author.html', {
+        'form': AuthorForm(),
+        'formset': BookFormSet(instance=Author(), prefix='authorbook_set'),
+    })
+    assert 'name="name"' in html
+    assert html.count('<form') == 1
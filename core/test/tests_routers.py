@@ -0,0 +1,106 @@
+import pytest
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import router
+from django.test import override_settings
+from django.urls import reverse
+
+from core.middleware import PrimaryPinMiddleware
+from core.models import Author, Book
+from core.routers import PIN_COOKIE, pin
+from core.test.tests_concurrency import versioned_post_data
+from core.test.tests_views import seed_author
+
+# "default" y "replica" son dos bases SQLite distintas que nadie sincroniza:
+# lo que no se copia a mano es una réplica atrasada
+pytestmark = [
+    pytest.mark.django_db(databases=['default', 'replica']),
+    pytest.mark.usefixtures('use_replica'),
+]
+
+
+@pytest.fixture
+def use_replica():
+    with override_settings(DATABASE_REPLICAS=['replica']):
+        yield
+
+
+def replicate():
+    """Deja la réplica al día con default."""
+    for model in (Author, Book):
+        model.objects.using('replica').all().delete()
+        model.objects.using('replica').bulk_create(
+            model.objects.using('default').order_by('pk'))
+
+
+def test_list_reads_from_replica(client):
+    Author.objects.using('default').create(pk=1, name="Solo en default")
+    Author.objects.using('replica').create(pk=2, name="Solo en la réplica")
+
+    response = client.get(reverse('list_authors'))
+
+    html = response.content.decode()
+    assert "Solo en la réplica" in html and "Solo en default" not in html
+    assert PIN_COOKIE not in response.cookies
+
+
+def test_edit_page_reads_from_replica(client):
+    author = Author.objects.using('replica').create(name="Asimov")
+
+    assert client.get(reverse('edit_authors', args=[author.pk])).status_code == 200
+    Author.objects.using('replica').filter(pk=author.pk).delete()
+    assert client.get(reverse('edit_authors', args=[author.pk])).status_code == 404
+
+
+def test_save_pins_following_reads_to_primary(client):
+    author = seed_author(2)
+    replicate()
+    url = reverse('list_authors')
+
+    response = client.post(reverse('edit_authors', args=[author.pk]),
+                           versioned_post_data(author, name="Asimov, Isaac"))
+
+    assert response.status_code == 302
+    assert int(client.cookies[PIN_COOKIE]['max-age']) == 5
+    # otro navegador, sin la cookie, lee la réplica, que sigue atrasada
+    pinned = client.cookies.pop(PIN_COOKIE)
+    assert "Asimov, Isaac" not in client.get(url).content.decode()
+    # la redirección lee de default y no reutiliza el fragmento que se
+    # guardó en la caché leyendo la réplica
+    client.cookies[PIN_COOKIE] = pinned
+    assert "Asimov, Isaac" in client.get(response.url).content.decode()
+
+
+def test_post_reads_from_primary(client):
+    # el autor todavía no llegó a la réplica
+    author = seed_author(1)
+
+    response = client.post(reverse('edit_authors', args=[author.pk]),
+                           versioned_post_data(author, name="Asimov, Isaac"))
+
+    assert response.status_code == 302
+    assert Author.objects.using('default').get(pk=author.pk).name == "Asimov, Isaac"
+
+
+def test_write_during_request_pins_reads():
+    with pin() as state:
+        assert router.db_for_read(Author) == 'replica'
+        assert router.db_for_write(Author) == 'default'
+        assert router.db_for_read(Author) == 'default'
+    assert state.wrote
+
+
+def test_without_replicas_router_stays_out():
+    with override_settings(DATABASE_REPLICAS=[]):
+        assert router.db_for_read(Author) == 'default'
+        with pytest.raises(MiddlewareNotUsed):
+            PrimaryPinMiddleware(lambda request: None)
+
+
+def test_fast_delete_writes_to_primary():
+    author = seed_author(2)
+    replicate()
+
+    assert Book.objects.filter(author=author).fast_delete() == 2
+
+    assert not Book.objects.using('default').exists()
+    assert Book.objects.using('replica').count() == 2
@@ -0,0 +1,139 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import AsyncClient, override_settings
+from django.urls import reverse
+
+from core import search
+from core.models import Author, Book
+
+
+@pytest.fixture
+def library(db):
+    asimov = Author.objects.create(name="Isaac Asimov")
+    clarke = Author.objects.create(name="Arthur C. Clarke")
+    herbert = Author.objects.create(name="Frank Herbert")
+    Book.objects.bulk_create([
+        Book(author=asimov, title="Fundación", published_year=1951),
+        Book(author=asimov, title="Yo, Robot", published_year=1950),
+        Book(author=clarke, title="Cita con Rama", published_year=1973),
+        Book(author=herbert, title="Dune", published_year=1965),
+        Book(author=herbert, title="Hijos de Dune", published_year=1976),
+    ])
+    return {'asimov': asimov, 'clarke': clarke, 'herbert': herbert}
+
+
+def found(query):
+    return [pk for pk, _score in search.search(query)]
+
+
+def test_matches_names_and_titles(library):
+    assert found("asimov") == [library['asimov'].pk]
+    assert found("rama") == [library['clarke'].pk]
+    assert found("dune") == [library['herbert'].pk]
+
+
+def test_prefix_and_accents(library):
+    assert found("fund") == [library['asimov'].pk]
+    assert found("FUNDACION") == [library['asimov'].pk]
+    assert found("arth cla") == [library['clarke'].pk]
+
+
+def test_every_term_must_match(library):
+    assert found("hijos dune") == [library['herbert'].pk]
+    assert found("dune rama") == []
+
+
+def test_ranking(library):
+    # primero los que coinciden por nombre
+    Book.objects.create(author=library['clarke'], title="Herbert y yo",
+                        published_year=2000)
+
+    assert found("herbert") == [library['herbert'].pk, library['clarke'].pk]
+
+
+def test_query_syntax_is_not_interpreted(library):
+    assert found('"dune" * (') == [library['herbert'].pk]
+    assert found('  -- ') == []
+
+
+def test_index_follows_writes_without_signals(library):
+    asimov = library['asimov']
+    Book.objects.filter(author=asimov).update(title="Los propios dioses")
+    Author.objects.filter(pk=library['clarke'].pk).update(name="A. C. Clarke")
+    Book.objects.filter(title="Dune").fast_delete()
+
+    assert found("dioses") == [asimov.pk]
+    assert found("fundacion") == []
+    assert found("arthur") == []
+    assert found("dune") == [library['herbert'].pk]  # queda "Hijos de Dune"
+
+
+def test_install_is_idempotent(library):
+    search.install(connection.alias)
+
+    assert found("asimov") == [library['asimov'].pk]
+
+
+@override_settings(AUTHOR_LIST_PAGINATION='offset')
+def test_list_filters_by_query(client, library):
+    response = client.get(reverse('list_authors'), {'q': 'dune'})
+
+    content = response.content.decode()
+    assert "Frank Herbert" in content
+    assert "Isaac Asimov" not in content
+    assert 'value="dune"' in content
+
+
+@override_settings(AUTHOR_LIST_PAGINATION='keyset')
+def test_keyset_list_uses_relevance_until_sorted(client, library):
+    Book.objects.create(author=library['clarke'], title="Herbert y yo",
+                        published_year=2000)
+    url = reverse('list_authors')
+
+    ranked = client.get(url, {'q': 'herbert'}).content.decode()
+    by_name = client.get(url, {'q': 'herbert', 'sort': 'name'}).content.decode()
+
+    assert ranked.index("Frank Herbert") < ranked.index("Arthur C. Clarke")
+    assert by_name.index("Arthur C. Clarke") < by_name.index("Frank Herbert")
+
+
+def test_cache_key_depends_on_query(client, library):
+    url = reverse('list_authors')
+    client.get(url, {'q': 'dune'})
+
+    assert client.get(url, {'q': 'rama'})['X-Table-Cache'] == 'miss'
+    assert client.get(url, {'q': 'dune'})['X-Table-Cache'] == 'hit'
+
+
+@pytest.mark.parametrize('url_name', ['list_authors', 'async_list_authors'])
+@pytest.mark.parametrize('mode', ['offset', 'keyset'])
+def test_cache_hit_skips_search(library, settings, monkeypatch, url_name,
+                                mode):
+    settings.AUTHOR_LIST_PAGINATION = mode
+    real_search, calls = search.search, []
+
+    def counting(query, *args, **kwargs):
+        calls.append(query)
+        return real_search(query, *args, **kwargs)
+
+    monkeypatch.setattr(search, 'search', counting)
+    get = async_to_sync(AsyncClient().get)
+    url = reverse(url_name)
+
+    for params in ({'q': 'dune'}, {'q': 'dune', 'sort': 'name'}) * 2:
+        assert "Frank Herbert" in get(url, params).content.decode()
+
+    # una búsqueda por cada página distinta; las repetidas salen de la caché
+    assert calls == ['dune', 'dune']
+
+
+@pytest.mark.parametrize('mode', ['offset', 'keyset'])
+def test_async_list_searches(library, settings, mode):
+    settings.AUTHOR_LIST_PAGINATION = mode
+    response = async_to_sync(AsyncClient().get)(
+        reverse('async_list_authors'), {'q': 'dune', 'sort': 'name'})
+
+    content = response.content.decode()
+    assert "Frank Herbert" in content
+    assert "Isaac Asimov" not in content
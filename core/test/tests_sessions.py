@@ -0,0 +1,116 @@
+import pytest
+from django.contrib import messages
+from django.contrib.messages import get_messages
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.test.tests_concurrency import versioned_post_data
+from core.test.tests_settings import load_production
+from core.test.tests_views import seed_author
+from core.views import unless_messages
+
+
+@pytest.fixture
+def author(db):
+    return seed_author(3)
+
+
+@pytest.fixture
+def session_client(client, db):
+    """Cliente con una sesión ya guardada en la base (backend por defecto)."""
+    session = client.session
+    session['visto'] = True
+    session.save()
+    return client
+
+
+def session_queries(queries):
+    return [query['sql'] for query in queries.captured_queries
+            if 'django_session' in query['sql']]
+
+
+@pytest.mark.parametrize('page', ['list', 'edit'])
+def test_get_does_no_session_queries(session_client, author, page):
+    url = (reverse('list_authors') if page == 'list'
+           else reverse('edit_authors', args=[author.pk]))
+
+    with CaptureQueriesContext(connection) as queries:
+        response = session_client.get(url)
+
+    assert response.status_code == 200
+    assert session_queries(queries) == []
+
+
+def test_edit_save_keeps_messages_out_of_the_session(session_client, author):
+    url = reverse('edit_authors', args=[author.pk])
+
+    with CaptureQueriesContext(connection) as queries:
+        response = session_client.post(url, versioned_post_data(author),
+                                       follow=True)
+
+    assert response.status_code == 200
+    assert session_queries(queries) == []
+
+
+def test_edit_queues_one_success_message(client, author):
+    response = client.post(reverse('edit_authors', args=[author.pk]),
+                           versioned_post_data(author))
+
+    assert [str(m) for m in get_messages(response.wsgi_request)] == [
+        "Author and books updated successfully"]
+
+
+def test_message_shown_after_redirect_then_not_modified(client, author):
+    response = client.post(reverse('edit_authors', args=[author.pk]),
+                           versioned_post_data(author), follow=True)
+
+    assert "Author and books updated successfully" in response.content.decode()
+    assert not response.has_header('ETag')
+    # el mensaje ya se mostró: la página vuelve a tener ETag y a dar 304
+    url = reverse('list_authors')
+    etag = client.get(url)['ETag']
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+
+def test_pending_messages_disable_validators(rf):
+    request = rf.get('/')
+    request._messages = CookieStorage(request)
+    validator = unless_messages(lambda request: 'etag')
+
+    assert validator(request) == 'etag'
+    messages.success(request, "Guardado")
+    assert validator(request) is None
+
+
+@override_settings(
+    SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies')
+def test_signed_cookie_sessions(client, author):
+    session = client.session
+    session['visto'] = True
+    session.save()
+
+    with CaptureQueriesContext(connection) as queries:
+        client.post(reverse('edit_authors', args=[author.pk]),
+                    versioned_post_data(author), follow=True)
+
+    assert session_queries(queries) == []
+
+
+def test_production_session_backends(monkeypatch):
+    assert load_production(monkeypatch).SESSION_ENGINE.endswith('signed_cookies')
+    production = load_production(monkeypatch, SESSION_BACKEND='cache',
+                                 REDIS_URL='redis://localhost:6379/0')
+    assert production.SESSION_ENGINE.endswith('.cache')
+    assert production.CACHES['default']['LOCATION'] == 'redis://localhost:6379/0'
+
+
+@pytest.mark.parametrize('env', [{'SESSION_BACKEND': 'cache'},
+                                 {'SESSION_BACKEND': 'file'}])
+def test_production_session_backend_errors(monkeypatch, env):
+    monkeypatch.delenv('REDIS_URL', raising=False)
+    with pytest.raises(ImproperlyConfigured):
+        load_production(monkeypatch, **env)
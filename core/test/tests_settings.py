@@ -0,0 +1,85 @@
+import importlib
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.db.utils import ConnectionHandler
+
+
+def load_production(monkeypatch, **env):
+    monkeypatch.setenv('DJANGO_SECRET_KEY', 'secreto')
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    import formsetexample.production as production
+    return importlib.reload(production)
+
+
+def test_production_requires_secret_key(monkeypatch):
+    load_production(monkeypatch)
+    monkeypatch.delenv('DJANGO_SECRET_KEY')
+    import formsetexample.production as production
+
+    with pytest.raises(ImproperlyConfigured):
+        importlib.reload(production)
+
+
+def test_production_sqlite_pragmas(monkeypatch, tmp_path, django_db_blocker):
+    production = load_production(monkeypatch,
+                                 SQLITE_PATH=str(tmp_path / 'prod.sqlite3'),
+                                 DJANGO_ALLOWED_HOSTS='a.example, b.example')
+    database = production.DATABASES['default']
+
+    assert production.DEBUG is False
+    assert production.REQUEST_METRICS_SERVER_TIMING is False
+    assert production.ALLOWED_HOSTS == ['a.example', 'b.example']
+    assert database['CONN_MAX_AGE'] == 600
+    assert database['CONN_HEALTH_CHECKS']
+    assert database['OPTIONS']['transaction_mode'] == 'IMMEDIATE'
+
+    connection = ConnectionHandler({'default': database})['default']
+    try:
+        with django_db_blocker.unblock(), connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            assert cursor.fetchone()[0] == 'wal'
+            cursor.execute('PRAGMA synchronous')
+            assert cursor.fetchone()[0] == 1  # NORMAL
+            cursor.execute('PRAGMA busy_timeout')
+            assert cursor.fetchone()[0] == 5000
+    finally:
+        connection.close()
+
+
+def test_production_postgres_pool(monkeypatch):
+    production = load_production(monkeypatch, DATABASE_ENGINE='postgresql',
+                                 DATABASE_POOL_MAX_SIZE='20')
+    database = production.DATABASES['default']
+
+    assert database['ENGINE'] == 'django.db.backends.postgresql'
+    # Django no admite el pool junto con conexiones persistentes
+    assert database['CONN_MAX_AGE'] == 0
+    assert database['OPTIONS']['pool']['max_size'] == 20
+
+
+def test_production_unknown_engine(monkeypatch):
+    with pytest.raises(ImproperlyConfigured):
+        load_production(monkeypatch, DATABASE_ENGINE='oracle')
+
+
+def test_production_read_replica(monkeypatch):
+    production = load_production(monkeypatch, DATABASE_ENGINE='postgresql',
+                                 POSTGRES_HOST='primary.internal',
+                                 POSTGRES_REPLICA_HOST='replica.internal')
+
+    assert production.DATABASES['default']['HOST'] == 'primary.internal'
+    assert production.DATABASES['replica']['HOST'] == 'replica.internal'
+    assert production.DATABASE_REPLICAS == ['replica']
+    assert load_production(monkeypatch, DATABASE_ENGINE='sqlite',
+                           POSTGRES_REPLICA_HOST='').DATABASE_REPLICAS == []
+
+
+def test_production_table_cache_requires_redis(monkeypatch):
+    monkeypatch.delenv('REDIS_URL', raising=False)
+    assert load_production(monkeypatch).AUTHOR_TABLE_CACHE_ALIAS is None
+
+    production = load_production(monkeypatch,
+                                 REDIS_URL='redis://localhost:6379/0')
+    assert production.AUTHOR_TABLE_CACHE_ALIAS == 'default'
@@ -0,0 +1,130 @@
+import gzip
+import json
+
+import pytest
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+
+from core.middleware import StaticFilesMiddleware, accepted_encodings
+from core.storage import COMPRESSIBLE_EXTENSIONS, MIN_SIZE
+
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {
+        'BACKEND': 'core.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'core.middleware.StaticFilesMiddleware',
+    'django.middleware.common.CommonMiddleware',
+]
+JQUERY = 'core/vendor/jquery/jquery.min.js'
+
+
+@pytest.fixture(scope='module')
+def static_root(tmp_path_factory):
+    root = tmp_path_factory.mktemp('staticfiles')
+    with override_settings(STATIC_ROOT=root, STORAGES=STORAGES):
+        call_command('collectstatic', interactive=False, verbosity=0)
+    return root
+
+
+@pytest.fixture
+def manifest(static_root):
+    return json.loads((static_root / 'staticfiles.json').read_text())['paths']
+
+
+@pytest.fixture
+def static_client(client, static_root):
+    with override_settings(STATIC_ROOT=static_root, STORAGES=STORAGES,
+                           MIDDLEWARE=MIDDLEWARE):
+        yield client
+
+
+def test_collectstatic_writes_hashed_and_gzip_files(static_root, manifest):
+    hashed = manifest[JQUERY]
+
+    assert hashed != JQUERY
+    original = (static_root / hashed).read_bytes()
+    compressed = (static_root / (hashed + '.gz')).read_bytes()
+    assert gzip.decompress(compressed) == original
+    assert len(compressed) < len(original) / 2
+
+
+def test_compressed_variants_only_when_they_save_bytes(static_root):
+    variants = list(static_root.rglob('*.gz'))
+
+    assert variants
+    for variant in variants:
+        original = variant.with_suffix('')
+        assert original.suffix in COMPRESSIBLE_EXTENSIONS
+        assert variant.stat().st_size < original.stat().st_size >= MIN_SIZE
+
+
+def test_hashed_file_is_immutable_and_compressed(static_client, manifest):
+    response = static_client.get('/static/' + manifest[JQUERY],
+                                 HTTP_ACCEPT_ENCODING='gzip, deflate')
+
+    assert response.status_code == 200
+    assert response['Content-Encoding'] == 'gzip'
+    assert response['Cache-Control'] == 'public, max-age=31536000, immutable'
+    assert 'Accept-Encoding' in response['Vary']
+    assert response['Content-Type'].startswith('text/javascript')
+    assert b'jQuery v3' in gzip.decompress(response.content)
+    assert int(response['Content-Length']) == len(response.content)
+
+
+def test_identity_when_client_does_not_accept_gzip(static_client, manifest):
+    response = static_client.get('/static/' + manifest[JQUERY],
+                                 HTTP_ACCEPT_ENCODING='gzip;q=0')
+
+    assert not response.has_header('Content-Encoding')
+    assert response.content.startswith(b'/*! jQuery v3')
+
+
+def test_unhashed_name_gets_short_cache(static_client):
+    response = static_client.get('/static/' + JQUERY)
+
+    assert response.status_code == 200
+    assert 'immutable' not in response['Cache-Control']
+
+
+def test_head_has_no_body(static_client, manifest):
+    response = static_client.head('/static/' + manifest[JQUERY])
+
+    assert response.status_code == 200
+    assert response.content == b''
+    assert int(response['Content-Length']) > 0
+
+
+def test_unknown_static_path_falls_through(static_client, db):
+    assert static_client.get('/static/core/nope.js').status_code == 404
+
+
+def test_middleware_not_used_without_static_root(tmp_path):
+    with override_settings(STATIC_ROOT=tmp_path / 'missing'):
+        with pytest.raises(MiddlewareNotUsed):
+            StaticFilesMiddleware(lambda request: None)
+
+
+@pytest.mark.parametrize('header, expected', [
+    ('gzip, deflate, br', {'gzip', 'deflate', 'br'}),
+    ('br;q=0, gzip;q=0.8', {'gzip'}),
+    ('', set()),
+])
+def test_accepted_encodings(header, expected):
+    assert accepted_encodings(header) == expected
+
+
+def test_pages_do_not_load_external_jquery(client, db):
+    from core.test.tests_views import seed_author
+
+    author = seed_author(1)
+    html = client.get(reverse('edit_authors', args=[author.pk])).content.decode()
+
+    assert 'googleapis' not in html and 'code.jquery.com' not in html
+    assert html.count('jquery.min.js') == 1
+    assert html.index('jquery.min.js') < html.index('custom-formset.js')
@@ -0,0 +1,103 @@
+import pytest
+from django.urls import reverse
+
+from core import table_cache
+from core.forms import BookFormSet
+from core.models import Author, Book
+
+
+@pytest.fixture
+def authors(db):
+    return Author.objects.bulk_create(
+        Author(name=f'Autor {i:02d}') for i in range(30)
+    )
+
+
+def get_list(client, **params):
+    return client.get(reverse('list_authors'), params)
+
+
+def test_second_request_is_served_from_cache(client, authors,
+                                             django_assert_num_queries):
+    first = get_list(client)
+    assert first['X-Table-Cache'] == 'miss'
+
+    hits = table_cache.stats['hits']
+    # solo el estado para ETag/Last-Modified
+    with django_assert_num_queries(1):
+        second = get_list(client)
+
+    assert second['X-Table-Cache'] == 'hit'
+    assert table_cache.stats['hits'] == hits + 1
+    assert second.content == first.content
+
+
+def test_cache_key_depends_on_sort_and_page(client, authors):
+    get_list(client)
+
+    assert get_list(client, sort='-name')['X-Table-Cache'] == 'miss'
+    assert get_list(client, page=2)['X-Table-Cache'] == 'miss'
+    assert get_list(client, sort='-name')['X-Table-Cache'] == 'hit'
+
+
+def test_other_params_do_not_leak_into_cached_links(client, authors):
+    first = get_list(client, utm_source='evil')
+    assert first['X-Table-Cache'] == 'miss'
+
+    response = get_list(client)
+
+    assert response['X-Table-Cache'] == 'hit'
+    assert 'sort=name' in response.content.decode()
+    assert 'utm_source' not in first.content.decode()
+    assert 'utm_source' not in response.content.decode()
+
+
+def test_author_save_invalidates(client, authors,
+                                 django_capture_on_commit_callbacks):
+    get_list(client)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Author.objects.create(name='Autor 00a')
+
+    response = get_list(client)
+    assert response['X-Table-Cache'] == 'miss'
+    assert 'Autor 00a' in response.content.decode()
+
+
+def test_book_delete_invalidates(client, authors,
+                                 django_capture_on_commit_callbacks):
+    book = Book.objects.create(author=authors[0], title='x', published_year=1)
+    get_list(client)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        book.delete()
+
+    assert get_list(client)['X-Table-Cache'] == 'miss'
+
+
+def test_bulk_save_invalidates(client, authors,
+                               django_capture_on_commit_callbacks):
+    get_list(client)
+    author = authors[0]
+    prefix = 'authorbook_set'
+    data = {
+        f'{prefix}-TOTAL_FORMS': '1',
+        f'{prefix}-INITIAL_FORMS': '0',
+        f'{prefix}-0-title': 'Nuevo',
+        f'{prefix}-0-published_year': '2000',
+    }
+    formset = BookFormSet(data, instance=author, prefix=prefix)
+    assert formset.is_valid()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        formset.bulk_save()
+
+    assert get_list(client)['X-Table-Cache'] == 'miss'
+
+
+def test_cache_can_be_disabled(client, authors, settings):
+    settings.AUTHOR_TABLE_CACHE_ALIAS = None
+
+    get_list(client)
+
+    assert get_list(client)['X-Table-Cache'] == 'miss'
@@ -0,0 +1,359 @@
+import time
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.html import escape
+
+from core.models import Author, Book
+
+"""
+Presupuesto de consultas y tiempo por petición para las vistas de
+creación/edición. El número de consultas no debe depender del número de
+libros del autor.
+"""
+
+# segundos máximos por petición, holgado para no fallar en CI lentos
+TIME_BUDGET = 5.0
+
+
+def seed_author(n_books):
+    author = Author.objects.create(name="Isaac Asimov")
+    Book.objects.bulk_create(
+        Book(author=author, title=f'Libro {i}', published_year=1900 + i % 100)
+        for i in range(n_books)
+    )
+    # bulk_create no mantiene las estadísticas de Author
+    Author.objects.filter(pk=author.pk).rebuild_book_stats()
+    return author
+
+
+def edit_post_data(author, name="Isaac Asimov"):
+    prefix = 'authorbook_set'
+    books = list(author.books.order_by('pk'))
+    data = {
+        'name': name,
+        f'{prefix}-TOTAL_FORMS': str(len(books)),
+        f'{prefix}-INITIAL_FORMS': str(len(books)),
+        f'{prefix}-MIN_NUM_FORMS': '0',
+        f'{prefix}-MAX_NUM_FORMS': '1000',
+    }
+    for i, book in enumerate(books):
+        data[f'{prefix}-{i}-id'] = str(book.pk)
+        data[f'{prefix}-{i}-author'] = str(author.pk)
+        data[f'{prefix}-{i}-title'] = book.title
+        data[f'{prefix}-{i}-published_year'] = str(book.published_year)
+    return data
+
+
+def measure(func):
+    start = time.perf_counter()
+    with CaptureQueriesContext(connection) as ctx:
+        response = func()
+    return response, len(ctx.captured_queries), time.perf_counter() - start
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('n_books', [1, 100, 1000])
+def test_edit_get_budget(client, n_books):
+    author = seed_author(n_books)
+    url = reverse('edit_authors', args=[author.pk])
+
+    response, queries, elapsed = measure(lambda: client.get(url))
+
+    assert response.status_code == 200
+    # autor + COUNT de libros + primer tramo de libros
+    assert queries == 3
+    assert len(response.context['formset'].initial_forms) == min(n_books, 50)
+    assert elapsed < TIME_BUDGET
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('n_books', [1, 100, 1000])
+def test_edit_post_invalid_budget(client, n_books):
+    author = seed_author(n_books)
+    url = reverse('edit_authors', args=[author.pk])
+    data = edit_post_data(author, name="")
+
+    response, queries, elapsed = measure(lambda: client.post(url, data))
+
+    assert response.status_code == 200
+    assert response.context['formset'] is response.context['view'].get_formset()
+    # autor + libros, sin reconstruir el formset al re-renderizar
+    assert queries == 2
+    assert elapsed < TIME_BUDGET
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('n_books', [1, 100, 1000])
+def test_edit_post_valid_budget(client, n_books):
+    author = seed_author(n_books)
+    url = reverse('edit_authors', args=[author.pk])
+    data = edit_post_data(author, name="Asimov")
+
+    response, queries, elapsed = measure(lambda: client.post(url, data))
+
+    assert response.status_code == 302
+    assert Author.objects.get(pk=author.pk).name == "Asimov"
+    assert author.books.count() == n_books
+    assert queries <= 8
+    assert elapsed < TIME_BUDGET
+
+
+@pytest.mark.django_db
+def test_create_with_books(client):
+    prefix = 'authorbook_set'
+    data = {
+        'name': "Ursula K. Le Guin",
+        f'{prefix}-TOTAL_FORMS': '2',
+        f'{prefix}-INITIAL_FORMS': '0',
+        f'{prefix}-MIN_NUM_FORMS': '0',
+        f'{prefix}-MAX_NUM_FORMS': '1000',
+        f'{prefix}-0-title': 'Terramar',
+        f'{prefix}-0-published_year': '1968',
+        f'{prefix}-1-title': 'Los desposeídos',
+        f'{prefix}-1-published_year': '1974',
+    }
+
+    response = client.post(reverse('create_authors'), data)
+
+    assert response.status_code == 302
+    author = Author.objects.get(name="Ursula K. Le Guin")
+    assert author.books.count() == 2
+
+
+# --- Filas por tramos y validación parcial (AuthorBookRows) ---
+
+@pytest.mark.django_db
+def test_edit_page_lazy_rows(client):
+    author = seed_author(120)
+
+    response = client.get(reverse('edit_authors', args=[author.pk]))
+
+    content = response.content.decode()
+    assert response.context['lazy_rows']
+    assert 'id="book-rows-anchor"' in content
+    # management form con todos los libros, fila extra al final
+    assert 'name="authorbook_set-INITIAL_FORMS" value="120"' in content
+    assert 'name="authorbook_set-120-title"' in content
+    assert 'name="authorbook_set-50-title"' not in content
+
+
+@pytest.mark.django_db
+def test_book_rows_chunk(client, django_assert_num_queries):
+    author = seed_author(120)
+    books = list(author.books.order_by('published_year', 'id'))
+    url = reverse('author_book_rows', args=[author.pk])
+
+    # autor + COUNT + tramo
+    with django_assert_num_queries(3):
+        response = client.get(url, {'start': 50, 'stop': 100})
+
+    content = response.content.decode()
+    assert content.count('class="formset_row"') == 50
+    assert f'name="authorbook_set-50-id" value="{books[50].pk}"' in content
+    assert 'name="authorbook_set-100-title"' not in content
+    assert 'name="authorbook_set-120-title"' not in content
+
+
+@pytest.mark.django_db
+def test_book_rows_are_pinned_to_the_page(client):
+    author = seed_author(120)
+    page = client.get(reverse('edit_authors', args=[author.pk]))
+    etag = page.context['rows_etag']
+    assert f'data-etag="{escape(etag)}"' in page.content.decode()
+    url = reverse('author_book_rows', args=[author.pk])
+
+    assert client.get(url, {'start': 50, 'stop': 100},
+                      HTTP_IF_MATCH=etag).status_code == 200
+
+    # otra persona borra un libro: los índices de los tramos se corren
+    author.books.order_by('published_year', 'id').first().delete()
+    response = client.get(url, {'start': 100, 'stop': 150}, HTTP_IF_MATCH=etag)
+    assert response.status_code == 412
+
+
+@pytest.mark.django_db
+def test_book_rows_validate_json(client):
+    author = seed_author(300)
+    book = author.books.order_by('published_year', 'id')[200]
+    prefix = 'authorbook_set'
+    data = {
+        f'{prefix}-TOTAL_FORMS': '301',
+        f'{prefix}-INITIAL_FORMS': '300',
+        f'{prefix}-200-id': str(book.pk),
+        f'{prefix}-200-title': '',
+        f'{prefix}-200-published_year': '1999',
+        f'{prefix}-300-title': 'Nuevo',
+        f'{prefix}-300-published_year': '2001',
+    }
+    url = reverse('author_book_rows', args=[author.pk]) + '?format=json'
+
+    response, queries, _ = measure(lambda: client.post(url, data))
+
+    body = response.json()
+    assert not body['valid']
+    assert list(body['errors']) == ['200']
+    assert 'title' in body['errors']['200']
+    # autor + el único libro referenciado
+    assert queries == 2
+
+
+@pytest.mark.django_db
+def test_book_rows_validate_fragment(client):
+    author = seed_author(3)
+    prefix = 'authorbook_set'
+    data = {
+        f'{prefix}-TOTAL_FORMS': '4',
+        f'{prefix}-INITIAL_FORMS': '3',
+        f'{prefix}-3-title': '',
+        f'{prefix}-3-published_year': 'abc',
+    }
+    url = reverse('author_book_rows', args=[author.pk])
+
+    response = client.post(url, data)
+
+    content = response.content.decode()
+    assert content.count('class="formset_row"') == 1
+    assert 'errorlist' in content
+
+
+# --- Envío incremental (solo las filas que cambiaron) ---
+
+def delta_post_data(author, changed=(), deleted=(), new=(), name=None):
+    """
+    Management form más solo las filas ``changed`` (índice -> título),
+    ``deleted`` (índices) y ``new`` (títulos), como las envía el cliente.
+    """
+    prefix = 'authorbook_set'
+    books = list(author.books.order_by('published_year', 'id'))
+    data = {
+        'name': name or author.name,
+        f'{prefix}-TOTAL_FORMS': str(len(books) + len(new)),
+        f'{prefix}-INITIAL_FORMS': str(len(books)),
+        f'{prefix}-MIN_NUM_FORMS': '0',
+        f'{prefix}-MAX_NUM_FORMS': '1000',
+        f'{prefix}-DELTA': '1',
+    }
+    rows = {i: books[i].title for i in deleted}
+    rows.update(changed)
+    for i, title in rows.items():
+        book = books[i]
+        data.update({
+            f'{prefix}-{i}-id': str(book.pk),
+            f'{prefix}-{i}-author': str(author.pk),
+            f'{prefix}-{i}-version': str(book.version),
+            f'{prefix}-{i}-title': title,
+            f'{prefix}-{i}-published_year': str(book.published_year),
+        })
+        if i in deleted:
+            data[f'{prefix}-{i}-DELETE'] = 'on'
+    for j, title in enumerate(new, start=len(books)):
+        data[f'{prefix}-{j}-title'] = title
+        data[f'{prefix}-{j}-published_year'] = '2000'
+    return data
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('n_books', [10, 1000])
+def test_edit_delta_post_budget(client, n_books):
+    author = seed_author(n_books)
+    books = list(author.books.order_by('published_year', 'id'))
+    url = reverse('edit_authors', args=[author.pk])
+    data = delta_post_data(author, changed={5: "Fundación"}, deleted=[7],
+                           new=["Nuevo"])
+
+    response, queries, _ = measure(lambda: client.post(url, data))
+
+    assert response.status_code == 302
+    # autor + los dos libros enviados + DELETE + UPDATE + INSERT + updated_at
+    # del autor, más dos savepoints; no depende de cuántos libros tenga
+    assert queries == 10
+    titles = dict(author.books.values_list('pk', 'title'))
+    assert len(titles) == n_books
+    assert titles[books[5].pk] == "Fundación"
+    assert books[7].pk not in titles
+    assert titles[books[8].pk] == books[8].title
+    assert "Nuevo" in titles.values()
+
+
+@pytest.mark.django_db
+def test_edit_author_with_thousands_of_books(client):
+    # por encima de los topes por defecto de Django (1000/2000 formularios)
+    author = seed_author(2500)
+    url = reverse('edit_authors', args=[author.pk])
+
+    content = client.get(url).content.decode()
+    assert 'name="authorbook_set-MAX_NUM_FORMS" value="10000"' in content
+    assert 'name="authorbook_set-2500-title"' in content
+
+    response = client.post(url, delta_post_data(
+        author, changed={2400: "Fundación"}, new=["Nuevo"]))
+
+    assert response.status_code == 302
+    assert author.books.count() == 2501
+    assert author.books.filter(title__in=["Fundación", "Nuevo"]).count() == 2
+
+
+@pytest.mark.django_db
+def test_edit_delta_post_only_author(client):
+    author = seed_author(20)
+    url = reverse('edit_authors', args=[author.pk])
+
+    response = client.post(url, delta_post_data(author, name="Asimov"))
+
+    assert response.status_code == 302
+    assert Author.objects.get(pk=author.pk).name == "Asimov"
+    assert author.books.count() == 20
+
+
+@pytest.mark.django_db
+def test_edit_delta_post_invalid_shows_every_row(client):
+    author = seed_author(60)
+    books = list(author.books.order_by('published_year', 'id'))
+    url = reverse('edit_authors', args=[author.pk])
+    data = delta_post_data(author, changed={30: ""}, deleted=[2])
+
+    response = client.post(url, data)
+
+    assert response.status_code == 200
+    formset = response.context['formset']
+    assert formset.rows is None and formset.is_bound
+    content = response.content.decode()
+    # todas las filas en su índice, la enviada con su error
+    assert content.count('class="formset_row"') == 60
+    assert f'name="authorbook_set-0-id" value="{books[0].pk}"' in content
+    assert f'name="authorbook_set-59-id" value="{books[59].pk}"' in content
+    assert 'errorlist' in content
+    assert 'name="authorbook_set-2-DELETE" id="id_authorbook_set-2-DELETE" checked' \
+        in content
+    # y el siguiente envío es completo
+    assert 'data-delta' not in content
+    assert 'name="authorbook_set-DELTA"' not in content
+    assert author.books.count() == 60
+
+
+@pytest.mark.django_db
+def test_edit_delta_skips_stale_rows_not_sent(client):
+    author = seed_author(3)
+    url = reverse('edit_authors', args=[author.pk])
+    data = delta_post_data(author, changed={1: "Yo, Robot"})
+    # otra persona edita la fila 0, que este envío no incluye
+    book = author.books.order_by('published_year', 'id').first()
+    client.post(url, delta_post_data(author, changed={0: "Fundación"}))
+
+    response = client.post(url, data)
+
+    assert response.status_code == 302
+    book.refresh_from_db()
+    assert book.title == "Fundación"
+
+
+@pytest.mark.django_db
+def test_edit_page_enables_delta_submit(client):
+    author = seed_author(3)
+
+    response = client.get(reverse('edit_authors', args=[author.pk]))
+
+    assert '<table class="table" data-delta' in response.content.decode()
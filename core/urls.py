@@ -1,5 +1,7 @@
 from django.urls import path
-from core.views import AuthorCreate, AuthorList, AuthorView, AuthorEdit, AuthorDelete
+from core.views import (AsyncAuthorEdit, AsyncAuthorList, AuthorBookRows,
+                        AuthorCreate, AuthorDelete, AuthorEdit, AuthorList,
+                        AuthorView, ExportLibrary, ImportLibrary)
 
 urlpatterns = [
     # url / vista /alias
@@ -7,6 +9,13 @@ urlpatterns = [
     path('authors', AuthorList.as_view(), name="list_authors"),
     path('create', AuthorCreate.as_view(), name="create_authors"),
     path('edit/<int:pk>/', AuthorEdit.as_view(), name="edit_authors"),
+    path('edit/<int:pk>/books/', AuthorBookRows.as_view(), name="author_book_rows"),
     path('delete/<int:pk>/', AuthorDelete.as_view(), name="delete_authors"),
+    path('export/<str:format>', ExportLibrary.as_view(), name="export_library"),
+    path('import', ImportLibrary.as_view(), name="import_library"),
+    # variantes async de la lista y la edición, para ASGI
+    path('async/authors', AsyncAuthorList.as_view(), name="async_list_authors"),
+    path('async/edit/<int:pk>/', AsyncAuthorEdit.as_view(),
+         name="async_edit_authors"),
     
 ]
\ No newline at end of file
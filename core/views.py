@@ -1,109 +1,609 @@
+import io
+from functools import partial, wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.messages.views import SuccessMessageMixin
 from django.shortcuts import render
 from django.urls import reverse_lazy
 from django.views.generic import DeleteView
 from django.utils.decorators import method_decorator
 from django.contrib import messages
-from django.http import Http404
+from django.db import router, transaction
+from django.db.models import Func, IntegerField, Subquery
+from django.http import (Http404, HttpResponse, HttpResponseRedirect,
+                         JsonResponse, StreamingHttpResponse)
 from django.shortcuts import get_object_or_404, redirect, render
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+from django.utils.crypto import salted_hmac
+from django.utils.http import quote_etag
 from django.views import View
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 from django.views.generic.list import ListView
 from django.views.generic.edit import CreateView, FormView, UpdateView
 
 
-from core.forms import AuthorForm, BookFormSet, ConfirmDeleteForm
+from core.concurrency import EditConflict
+from core.forms import (AuthorForm, BookFormSet, ConfirmDeleteForm,
+                        LibraryImportForm, posted_rows, submitted_rows)
+from core.importer import ImportFormatError, LibraryImporter, read_records
+from . import deletion, export, routers, search, table_cache
 from .models import Author
-from django_tables2 import SingleTableView
+from django_tables2 import SingleTableMixin, SingleTableView
+from .pagination import KeysetPaginator
 from .tables import AuthorTable
 
 # Create your views here.
+
+# Peticiones condicionales: la lista y la página de edición responden 304 si
+# no cambió nada desde la ETag/Last-Modified que trae el navegador, con una
+# sola consulta y sin construir la tabla ni el formset. ``no-cache`` obliga
+# a revalidar siempre en vez de reutilizar la página por heurística.
+
+def library_state(request):
+    """
+    Número de autores y el ``updated_at`` más reciente, en una consulta y
+    una sola vez por petición. Altas y ediciones (también de libros, ver
+    ``AuthorQuerySet.touch``) cambian el máximo; las bajas, el número.
+    """
+    if not hasattr(request, '_library_state'):
+        set_library_state(request, list(library_state_query()))
+    return request._library_state
+
+
+async def alibrary_state(request):
+    """``library_state`` con la API async del ORM."""
+    if not hasattr(request, '_library_state'):
+        set_library_state(request,
+                          [row async for row in library_state_query()])
+    return request._library_state
+
+
+def library_state_query():
+    # el último updated_at por su índice y COUNT(*) en una subconsulta: un
+    # aggregate() con COUNT y MAX juntos recorre toda la tabla
+    count = Author.objects.order_by().annotate(
+        n=Func(template='COUNT(*)', output_field=IntegerField()),
+    ).values('n')
+    return (Author.objects.order_by('-updated_at')
+            .values_list('updated_at', Subquery(count))[:1])
+
+
+def set_library_state(request, rows):
+    last_modified, total = next(iter(rows), (None, 0))
+    request._library_state = {'count': total, 'last_modified': last_modified}
+
+
+def author_list_etag(request, *args, **kwargs):
+    state = library_state(request)
+    last_modified = state['last_modified']
+    return '{}-{}-{}'.format(
+        getattr(settings, 'AUTHOR_LIST_PAGINATION', 'offset'), state['count'],
+        last_modified.timestamp() if last_modified else 0)
+
+
+def author_list_last_modified(request, *args, **kwargs):
+    return library_state(request)['last_modified']
+
+
+def requested_author(request, pk):
+    """
+    El autor de la página, leído una vez por petición: lo usan la ETag y
+    Last-Modified y, si la página se renderiza, la vista. ``None`` si no
+    existe.
+    """
+    if not hasattr(request, '_author'):
+        request._author = Author.objects.filter(pk=pk).first()
+    return request._author
+
+
+async def arequested_author(request, pk):
+    """``requested_author`` con la API async del ORM."""
+    if not hasattr(request, '_author'):
+        request._author = await Author.objects.filter(pk=pk).afirst()
+    return request._author
+
+
+def author_updated_at(request, pk, **kwargs):
+    author = requested_author(request, pk)
+    return author.updated_at if author else None
+
+
+def author_version(author):
+    return f'author-{author.pk}-{author.updated_at.timestamp()}'
+
+
+def author_etag(request, pk, **kwargs):
+    # sin autor no hay ETag y la vista responde 404
+    author = requested_author(request, pk)
+    return author_version(author) if author else None
+
+
+def author_page_etag(request, pk, **kwargs):
+    """
+    La página de edición lleva el token CSRF: la ETag incluye un hash del
+    secreto de la cookie para que, si se rotó o se borró, la página se
+    renderice de nuevo con la cookie actual en vez de responder 304 con un
+    formulario cuyo token ya no vale.
+    """
+    etag = author_etag(request, pk)
+    if etag is None:
+        return None
+    get_token(request)
+    secret = salted_hmac('core.views.author_page_etag',
+                         request.META['CSRF_COOKIE']).hexdigest()[:16]
+    return f'{etag}-{secret}'
+
+
+def unless_messages(func):
+    """
+    Sin ETag ni Last-Modified si hay mensajes pendientes: un 304 dejaría
+    sin mostrar, p. ej., el "guardado" que sigue a la redirección.
+    """
+    @wraps(func)
+    def validator(request, *args, **kwargs):
+        if len(messages.get_messages(request)):
+            return None
+        return func(request, *args, **kwargs)
+    return validator
+
+
+conditional_author_list = [
+    cache_control(private=True, no_cache=True),
+    condition(etag_func=unless_messages(author_list_etag),
+              last_modified_func=unless_messages(author_list_last_modified)),
+]
+# sin Last-Modified: un If-Modified-Since solo no detecta el cambio de token
+conditional_author_page = [
+    cache_control(private=True, no_cache=True),
+    condition(etag_func=unless_messages(author_page_etag)),
+]
+conditional_author_rows = [
+    cache_control(private=True, no_cache=True),
+    condition(etag_func=unless_messages(author_etag),
+              last_modified_func=unless_messages(author_updated_at)),
+]
+
+
+def async_conditional(decorators, preload):
+    """
+    Aplica ``decorators`` (``conditional_author_*``) al ``get`` async de una
+    vista. ``condition`` llama a los validadores sin ``await`` y en el event
+    loop el ORM no se puede usar: antes se espera ``preload``, que deja en la
+    petición lo que leen (``alibrary_state``, ``arequested_author``), y los
+    validadores responden sin consultar.
+    """
+    def decorator(method):
+        @wraps(method)
+        async def get(self, request, *args, **kwargs):
+            await preload(request, **kwargs)
+            view = partial(method, self)
+            for decorate in reversed(decorators):
+                view = decorate(view)
+            return await view(request, *args, **kwargs)
+        return get
+    return decorator
+
+
 class AuthorView(SingleTableView):
     model = Author
     template_name = "core/index.html"
     
+@method_decorator(conditional_author_list, name='get')
 class AuthorList(SingleTableView):
+    """
+    Lista de autores. Con ``AUTHOR_LIST_PAGINATION = 'keyset'`` pagina por
+    cursor sobre ``(name, id)`` en vez de ``OFFSET`` + ``COUNT(*)``; los
+    órdenes que no tienen cursor definido usan la paginación por número de
+    página de django-tables2.
+
+    Con ``?q=`` muestra solo los autores que coinciden (ver
+    ``core.search``), ordenados por relevancia salvo que se pida otro orden.
+    """
     model = Author
     table_class = AuthorTable
     template_name = "core/list_authors.html"
+    table_template_name = "core/author_table.html"
+    keyset_per_page = 25
+    keyset_orderings = {
+        'name': ('name', 'pk'),
+        '-name': ('-name', '-pk'),
+        'book_count': ('book_count', 'pk'),
+        '-book_count': ('-book_count', '-pk'),
+    }
+    keyset_page = None
+    # pks de la búsqueda, el más relevante primero
+    search_ranking = None
+
+    def get_queryset(self):
+        # book_count, first_year y last_year son columnas de Author: la
+        # página no agrega sobre Book
+        return Author.objects.all()
+
+    def filter_search(self, queryset):
+        # consulta el índice: se llama al renderizar la tabla, así que un
+        # acierto de la caché no lo toca
+        query = self.get_search_query()
+        if not query:
+            return queryset
+        self.search_ranking = [pk for pk, _score in search.search(query)]
+        return queryset.filter(pk__in=self.search_ranking)
+
+    def get_search_query(self):
+        return self.request.GET.get('q', '').strip()
+
+    def get_pagination_mode(self):
+        return getattr(settings, 'AUTHOR_LIST_PAGINATION', 'offset')
+
+    def get_keyset_ordering(self):
+        if self.get_pagination_mode() != 'keyset':
+            return None
+        order_by_field = self.table_class._meta.order_by_field
+        if self.get_search_query() and order_by_field not in self.request.GET:
+            # el orden por relevancia no tiene cursor
+            return None
+        sort = self.request.GET.get(order_by_field, 'name')
+        return self.keyset_orderings.get(sort)
+
+    def get_table_data(self):
+        queryset = self.filter_search(super().get_table_data())
+        if self.search_ranking is not None and \
+                self.table_class._meta.order_by_field not in self.request.GET:
+            # como mucho search.DEFAULT_LIMIT filas; ordenarlas aquí evita
+            # un CASE por fila en la consulta agregada
+            position = {pk: i for i, pk in enumerate(self.search_ranking)}
+            return sorted(queryset, key=lambda author: position[author.pk])
+        ordering = self.get_keyset_ordering()
+        if ordering is None:
+            return queryset
+        paginator = KeysetPaginator(queryset, self.keyset_per_page, ordering)
+        self.keyset_page = paginator.page(
+            after=self.request.GET.get('after'),
+            before=self.request.GET.get('before'),
+        )
+        return list(self.keyset_page)
+
+    def get_table_pagination(self, table):
+        if self.keyset_page is not None:
+            return False
+        return super().get_table_pagination(table)
+
+    def get_context_data(self, **kwargs):
+        # el fragmento de la tabla sale de la caché si la biblioteca no
+        # cambió; solo en un fallo se consulta la BD y se renderiza
+        context = super(SingleTableMixin, self).get_context_data(**kwargs)
+        context['search_query'] = self.get_search_query()
+        context['table_html'], self.table_cache_hit = \
+            table_cache.get_or_render(self.request, self.render_table,
+                                      state=self.get_cache_state())
+        return context
+
+    def get_cache_state(self):
+        # leyendo de una réplica, la clave de la caché lleva su estado
+        if not routers.reads_from_replica():
+            return ''
+        return author_list_etag(self.request)
+
+    def render_table(self):
+        table = self.get_table(**self.get_table_kwargs())
+        return render_to_string(self.table_template_name, {
+            'table': table,
+            'keyset_page': self.keyset_page,
+        }, request=table_cache.page_request(self.request))
+
+    def get(self, request, *args, **kwargs):
+        response = super().get(request, *args, **kwargs)
+        response['X-Table-Cache'] = 'hit' if self.table_cache_hit else 'miss'
+        return response
+
+
+class AsyncAuthorList(AuthorList):
+    """
+    Variante ASGI de ``AuthorList``. La página por cursor se lee con
+    ``async for`` y la caché con su API async, y la respuesta se renderiza
+    en la vista, sin pasar por un hilo. Los órdenes sin cursor usan la
+    paginación por número de página de django-tables2, que es sync. ETag,
+    Last-Modified y 304 como en ``AuthorList`` (ver ``async_conditional``).
+    """
+
+    @async_conditional(conditional_author_list, alibrary_state)
+    async def get(self, request, *args, **kwargs):
+        self.object_list = self.get_queryset()
+        # library_state ya se leyó para la ETag
+        state = self.get_cache_state()
+        if self.get_keyset_ordering() is None:
+            html, hit = await sync_to_async(table_cache.get_or_render)(
+                request, self.render_table, state=state)
+        else:
+            html, hit = await table_cache.aget_or_render(
+                request, self.arender_table, state=state)
+        context = super(SingleTableMixin, self).get_context_data(
+            table_html=html, search_query=self.get_search_query())
+        response = HttpResponse(render_to_string(
+            self.get_template_names(), context, request=request))
+        response['X-Table-Cache'] = 'hit' if hit else 'miss'
+        return response
+
+    async def arender_table(self):
+        queryset = self.object_list
+        if self.get_search_query():
+            queryset = await sync_to_async(self.filter_search)(queryset)
+        paginator = KeysetPaginator(queryset, self.keyset_per_page,
+                                    self.get_keyset_ordering())
+        self.keyset_page = await paginator.apage(
+            after=self.request.GET.get('after'),
+            before=self.request.GET.get('before'),
+        )
+        return self.render_table()
+
+    def get_table_data(self):
+        if self.keyset_page is not None:
+            return list(self.keyset_page)
+        return super().get_table_data()
+
     
-    
-class AuthorCreate(SuccessMessageMixin, CreateView):
-    model = Author
-    form_class = AuthorForm
-    template_name = 'core/edit_author.html'
-    success_url = reverse_lazy('list_authors')
-    success_message = "Author and books created successfully"
+class BookFormSetMixin:
+    """
+    Construye el ``BookFormSet`` una sola vez por petición y lo reutiliza
+    para validar, guardar y volver a renderizar la página.
+
+    Acepta envíos incrementales (ver ``core.forms.submitted_rows``): solo se
+    construyen, validan y guardan las filas enviadas.
+    """
+    formset_class = BookFormSet
+    formset_prefix = 'authorbook_set'
+
+    def get_formset_kwargs(self):
+        kwargs = {'instance': self.object, 'prefix': self.formset_prefix}
+        if self.request.method in ('POST', 'PUT'):
+            kwargs.update(data=self.request.POST, files=self.request.FILES,
+                          rows=submitted_rows(self.request.POST,
+                                              self.formset_prefix))
+        return kwargs
+
+    def get_formset(self):
+        if getattr(self, '_formset', None) is None:
+            self._formset = self.formset_class(**self.get_formset_kwargs())
+        return self._formset
+
+    conflict = None
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        if self.request.POST:
-            context['formset'] = BookFormSet(self.request.POST, 
-                                             prefix='authorbook_set')
-        else:
-            context['formset'] = BookFormSet(prefix='authorbook_set')
+        formset = self.get_formset()
+        if formset.is_bound and formset.rows is not None:
+            # un envío incremental con errores se muestra con todas las filas
+            formset = self._formset = formset.expanded()
+        context['formset'] = formset
+        context['lazy_rows'] = (
+            formset.rows is not None and not formset.is_bound
+            and len(formset.initial_forms) < formset.initial_form_count()
+        )
+        # tras un error se vuelve a enviar todo: las filas ya no tienen
+        # como valor inicial el de la base
+        context['delta_submit'] = not formset.is_bound
+        context['rows_chunk'] = getattr(self, 'rows_chunk', None)
+        if context['lazy_rows']:
+            # los tramos se piden con If-Match: si el autor cambió desde
+            # que se armó la página, AuthorBookRows responde 412
+            context['rows_etag'] = quote_etag(author_version(self.object))
+        context['conflict'] = self.conflict
         return context
 
     def form_valid(self, form):
-        context = self.get_context_data()
-        formset = context['formset']
-
-        if formset.is_valid():
-            self.object = form.save()
-            formset.instance = self.object
-            formset.save()
-            return super().form_valid(form)
-        else:
+        formset = self.get_formset()
+        if not formset.is_valid():
+            try:
+                formset.raise_for_deleted_rows()
+            except EditConflict as conflict:
+                return self.form_conflict(form, conflict)
             return self.form_invalid(form)
 
+        try:
+            with transaction.atomic(using=router.db_for_write(self.model)):
+                self.object = form.versioned_save()
+                formset.instance = self.object
+                formset.bulk_save()
+        except EditConflict as conflict:
+            return self.form_conflict(form, conflict)
+
+        success_message = self.get_success_message(form.cleaned_data)
+        if success_message:
+            messages.success(self.request, success_message)
+        return HttpResponseRedirect(self.get_success_url())
+
     def form_invalid(self, form):
-        context = self.get_context_data(form=form)
-        return render(self.request, self.template_name, context)
+        return self.render_to_response(self.get_context_data(form=form))
+
+    def form_conflict(self, form, conflict):
+        """
+        Otra persona guardó el autor o alguno de sus libros desde que se
+        abrió el formulario: no se guardó nada y se muestran las filas que
+        cambiaron, con lo enviado por el usuario todavía en el formulario.
+        """
+        self.conflict = conflict.load()
+        response = self.form_invalid(form)
+        response.status_code = 409
+        return response
+
+
+class AuthorCreate(BookFormSetMixin, SuccessMessageMixin, CreateView):
+    model = Author
+    form_class = AuthorForm
+    template_name = 'core/edit_author.html'
+    success_url = reverse_lazy('list_authors')
+    success_message = "Author and books created successfully"
+
     
-class AuthorEdit(SuccessMessageMixin, UpdateView):
+@method_decorator(conditional_author_page, name='get')
+class AuthorEdit(BookFormSetMixin, SuccessMessageMixin, UpdateView):
     model = Author
     form_class = AuthorForm
     template_name = 'core/edit_author.html'
     success_url = reverse_lazy('list_authors')
     success_message = "Author and books updated successfully"
+    # libros que se renderizan con la página; el resto se pide por tramos
+    rows_chunk = 50
 
     def get_object(self, queryset=None):
+        # en un GET ya lo leyó la comprobación de ETag/Last-Modified
+        author = requested_author(self.request, self.kwargs['pk'])
+        if author is None:
+            raise Http404("Author not found")
+        return author
+
+    def get_formset_kwargs(self):
+        kwargs = super().get_formset_kwargs()
+        if 'data' not in kwargs:
+            kwargs['rows'] = range(self.rows_chunk)
+        return kwargs
+
+
+class AsyncAuthorEdit(AuthorEdit):
+    """
+    Variante ASGI de ``AuthorEdit``. El autor, el conteo y el primer tramo
+    de libros se leen con la API async del ORM; solo la validación y el
+    guardado del formulario y el formset corren en un bloque sync. El GET
+    responde 304 como ``AuthorEdit``, con el autor que leyó la ETag.
+    """
+
+    async def aget_object(self):
+        author = await arequested_author(self.request, self.kwargs['pk'])
+        if author is None:
+            raise Http404("Author not found")
+        return author
+
+    @async_conditional(conditional_author_page, arequested_author)
+    async def get(self, request, *args, **kwargs):
+        self.object = await self.aget_object()
+        await self.get_formset().aload()
+        return self.render_page(self.get_context_data())
+
+    async def post(self, request, *args, **kwargs):
+        self.object = await self.aget_object()
+        return await sync_to_async(self.process_form)()
+
+    async def put(self, *args, **kwargs):
+        return await self.post(*args, **kwargs)
+
+    def process_form(self):
+        form = self.get_form()
+        if form.is_valid():
+            return self.form_valid(form)
+        return self.form_invalid(form)
+
+    def form_invalid(self, form):
+        return self.render_page(self.get_context_data(form=form))
+
+    def render_page(self, context):
+        return HttpResponse(render_to_string(
+            self.get_template_names(), context, request=self.request))
+
+
+@method_decorator(conditional_author_rows, name='get')
+class AuthorBookRows(View):
+    """
+    Filas del ``BookFormSet`` de un autor como fragmento HTML.
+
+    GET ``?start=&stop=`` devuelve ese tramo de libros existentes, para que
+    la página de edición los cargue por partes; con ``If-Match`` y la
+    versión del autor de la página responde 412 si cambió, en vez de mezclar
+    filas de dos versiones (los índices se corren al agregar o borrar).
+
+    POST valida solo las filas enviadas (más el management form) y devuelve
+    esas filas con sus errores, o un JSON con los errores por índice de fila
+    si se pide ``?format=json``.
+    """
+    formset_class = BookFormSet
+    formset_prefix = 'authorbook_set'
+    template_name = 'core/book_rows.html'
+    max_chunk = 500
+
+    def get_author(self):
+        author = requested_author(self.request, self.kwargs['pk'])
+        if author is None:
+            raise Http404("Author not found")
+        return author
+
+    def get(self, request, *args, **kwargs):
         try:
-            return Author.objects.get(pk=self.kwargs['pk'])
-        except Author.DoesNotExist as exc:
-            raise Http404("Author not found") from exc
+            start = max(int(request.GET.get('start', 0)), 0)
+            stop = int(request.GET.get('stop', start + AuthorEdit.rows_chunk))
+        except ValueError as exc:
+            raise Http404("Invalid range") from exc
+        stop = min(stop, start + self.max_chunk)
+        formset = self.formset_class(
+            instance=self.get_author(),
+            prefix=self.formset_prefix,
+            rows=range(start, stop),
+        )
+        return render(request, self.template_name,
+                      {'forms': formset.initial_forms})
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        if self.request.POST:
-            context['formset'] = BookFormSet(
-                self.request.POST,
-                instance=self.object,
-                prefix='authorbook_set'
-            )
-        else:
-            context['formset'] = BookFormSet(
-                instance=self.object,
-                prefix='authorbook_set'
-            )
-        return context
+    def post(self, request, *args, **kwargs):
+        formset = self.formset_class(
+            request.POST,
+            instance=self.get_author(),
+            prefix=self.formset_prefix,
+            rows=posted_rows(request.POST, self.formset_prefix),
+        )
+        valid = formset.is_valid()
+        if request.GET.get('format') == 'json':
+            errors = {
+                i: form.errors.get_json_data()
+                for i, form in zip(formset.form_rows, formset.forms)
+                if form.errors
+            }
+            return JsonResponse({
+                'valid': valid,
+                'errors': errors,
+                'non_form_errors': formset.non_form_errors().get_json_data(),
+            })
+        return render(request, self.template_name, {'forms': formset.forms})
+
+
+class ExportLibrary(View):
+    """Descarga en streaming de todos los autores con sus libros."""
+    chunk_size = 2000
+
+    def get(self, request, *args, **kwargs):
+        fmt = kwargs['format']
+        if fmt not in export.FORMATS:
+            raise Http404("Unknown export format")
+        response = StreamingHttpResponse(
+            export.export_lines(fmt, chunk_size=self.chunk_size),
+            content_type=export.CONTENT_TYPES[fmt],
+        )
+        response['Content-Disposition'] = f'attachment; filename="library.{fmt}"'
+        return response
+
+
+class ImportLibrary(FormView):
+    """Carga de un archivo CSV/JSONL con autores y libros."""
+    form_class = LibraryImportForm
+    template_name = 'core/import_library.html'
+    success_url = reverse_lazy('list_authors')
 
     def form_valid(self, form):
-        context = self.get_context_data()
-        formset = context['formset']
-
-        if formset.is_valid():
-            self.object = form.save()
-            formset.instance = self.object
-            formset.save()
-            messages.success(self.request, self.success_message)
-            return super().form_valid(form)
-        else:
+        importer = LibraryImporter()
+        lines = io.TextIOWrapper(form.cleaned_data['file'], encoding='utf-8',
+                                 newline='')
+        try:
+            state = importer.run(read_records(lines,
+                                              form.cleaned_data['format']))
+        except ImportFormatError as exc:
+            # se levanta antes del primer registro: no se importó nada
+            form.add_error('file', str(exc))
             return self.form_invalid(form)
+        messages.success(
+            self.request,
+            f"Importados {state.authors} autores y {state.books} libros "
+            f"({state.skipped} registros omitidos)",
+        )
+        return super().form_valid(form)
 
-    def form_invalid(self, form):
-        context = self.get_context_data(form=form)
-        return render(self.request, self.template_name, context)
-    
 
 class AuthorDelete(DeleteView):
     model = Author
@@ -131,8 +631,27 @@ class AuthorDelete(DeleteView):
         self.object = self.get_object()
         form = ConfirmDeleteForm(request.POST, instance=self.object)
         if form.is_valid():
-            return self.delete(request, *args, **kwargs)
+            return self.delete_object()
         else:
             return self.render_to_response(
                 self.get_context_data(form=form),
-            )
\ No newline at end of file
+            )
+
+    def delete_object(self):
+        """
+        Borra el autor sin cargar sus libros (ver ``core.deletion``). Si
+        tiene más libros que ``AUTHOR_DELETE_BACKGROUND_THRESHOLD`` el
+        borrado se hace en segundo plano y se responde de inmediato.
+        """
+        chunk_size = getattr(settings, 'AUTHOR_DELETE_CHUNK_SIZE', None)
+        threshold = getattr(settings, 'AUTHOR_DELETE_BACKGROUND_THRESHOLD', None)
+        if threshold is not None and self.object.books.count() > threshold:
+            pk = self.object.pk
+            transaction.on_commit(
+                lambda: deletion.delete_author_in_background(pk, chunk_size)
+            )
+            messages.info(self.request,
+                          "El autor se está eliminando en segundo plano")
+        else:
+            deletion.delete_author(self.object, chunk_size)
+        return HttpResponseRedirect(self.get_success_url())
@@ -0,0 +1,183 @@
+"""
+Perfil de producción. ``settings.py`` lo aplica sobre sus valores cuando
+``DJANGO_PROFILE=production``; todo se configura con variables de entorno:
+
+* ``DJANGO_SECRET_KEY`` (obligatoria) y ``DJANGO_ALLOWED_HOSTS`` (lista
+  separada por comas).
+* ``DATABASE_ENGINE``: ``sqlite`` (por defecto) o ``postgresql``.
+* SQLite: ``SQLITE_PATH``. Cada conexión nueva aplica ``SQLITE_PRAGMAS``
+  y las transacciones empiezan con ``BEGIN IMMEDIATE``, para que una
+  escritura espere a la otra (``busy_timeout``) en vez de fallar con
+  "database is locked" al pasar de lectura a escritura.
+* PostgreSQL: ``POSTGRES_DB``, ``POSTGRES_USER``, ``POSTGRES_PASSWORD``,
+  ``POSTGRES_HOST``, ``POSTGRES_PORT``. Con ``DATABASE_POOL_MAX_SIZE`` se
+  usa el pool de conexiones de Django (requiere ``psycopg[pool]``).
+* Réplica de lectura (ver ``core.routers``): ``SQLITE_REPLICA_PATH`` o
+  ``POSTGRES_REPLICA_HOST``; el resto de la configuración es la de la
+  base principal. ``DATABASE_PIN_SECONDS`` (5 por defecto) es cuánto lee
+  de la principal un navegador después de escribir.
+* ``CONN_MAX_AGE``: segundos que se reutiliza una conexión (600 por
+  defecto); no aplica con el pool.
+* ``SESSION_BACKEND``: ``signed_cookies`` (por defecto: la sesión viaja
+  firmada en la cookie, sin lecturas ni escrituras en el servidor),
+  ``cache`` (requiere ``REDIS_URL``) o ``db``.
+* ``REDIS_URL``: caché compartida por todos los procesos (sesiones con
+  ``SESSION_BACKEND=cache`` y fragmentos de la tabla de autores). Sin ella
+  la caché de la tabla se desactiva: en la caché en memoria de cada
+  proceso la invalidación no llegaría a los demás.
+* Estáticos: ``collectstatic`` escribe en ``STATIC_ROOT`` los archivos con
+  hash y sus variantes ``.gz``/``.br``; ``StaticFilesMiddleware`` los
+  sirve con caché inmutable. ``STATIC_MAX_AGE`` (segundos, 60 por
+  defecto) aplica a los nombres sin hash.
+* ``REQUEST_METRICS_SERVER_TIMING=1`` envía la cabecera ``Server-Timing``
+  (consultas y tiempos por petición) a los clientes; por defecto no.
+"""
+import os
+from pathlib import Path
+
+from django.core.exceptions import ImproperlyConfigured
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+DEBUG = False
+
+try:
+    SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
+except KeyError as exc:
+    raise ImproperlyConfigured(
+        "DJANGO_PROFILE=production requiere DJANGO_SECRET_KEY") from exc
+
+ALLOWED_HOSTS = [host.strip() for host in
+                 os.environ.get('DJANGO_ALLOWED_HOSTS', '').split(',')
+                 if host.strip()]
+
+# plantillas compiladas una vez por proceso, sin revisar cambios en disco;
+# settings.py las asigna a TEMPLATES
+TEMPLATE_LOADERS = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'core.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
+STATIC_MAX_AGE = int(os.environ.get('STATIC_MAX_AGE', 60))
+
+REQUEST_METRICS_SERVER_TIMING = \
+    os.environ.get('REQUEST_METRICS_SERVER_TIMING') == '1'
+
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        },
+    }
+    AUTHOR_TABLE_CACHE_ALIAS = 'default'
+else:
+    # ver core.table_cache: cada proceso serviría sus páginas viejas
+    AUTHOR_TABLE_CACHE_ALIAS = None
+
+SESSION_ENGINES = {
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'db': 'django.contrib.sessions.backends.db',
+}
+
+SESSION_BACKEND = os.environ.get('SESSION_BACKEND', 'signed_cookies')
+try:
+    SESSION_ENGINE = SESSION_ENGINES[SESSION_BACKEND]
+except KeyError as exc:
+    raise ImproperlyConfigured(
+        f"SESSION_BACKEND debe ser uno de {', '.join(SESSION_ENGINES)}"
+    ) from exc
+if SESSION_BACKEND == 'cache' and not REDIS_URL:
+    # con la caché en memoria cada proceso tendría sus propias sesiones
+    raise ImproperlyConfigured("SESSION_BACKEND=cache requiere REDIS_URL")
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,        # ms
+    'cache_size': -64000,        # KiB (negativo) por conexión
+    'mmap_size': 268435456,      # bytes
+    'temp_store': 'MEMORY',
+}
+
+
+def sqlite_database():
+    return {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+        'CONN_MAX_AGE': int(os.environ.get('CONN_MAX_AGE', 600)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': ';'.join(f'PRAGMA {name}={value}'
+                                     for name, value in SQLITE_PRAGMAS.items()),
+            'transaction_mode': 'IMMEDIATE',
+        },
+    }
+
+
+def postgres_database():
+    database = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ.get('POSTGRES_DB', 'formsetexample'),
+        'USER': os.environ.get('POSTGRES_USER', ''),
+        'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+        'HOST': os.environ.get('POSTGRES_HOST', ''),
+        'PORT': os.environ.get('POSTGRES_PORT', ''),
+        'CONN_MAX_AGE': int(os.environ.get('CONN_MAX_AGE', 600)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {},
+    }
+    max_size = os.environ.get('DATABASE_POOL_MAX_SIZE')
+    if max_size:
+        # el pool reemplaza a las conexiones persistentes
+        database['CONN_MAX_AGE'] = 0
+        database['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DATABASE_POOL_MIN_SIZE', 2)),
+            'max_size': int(max_size),
+            'timeout': int(os.environ.get('DATABASE_POOL_TIMEOUT', 10)),
+        }
+    return database
+
+
+DATABASE_ENGINES = {
+    'sqlite': sqlite_database,
+    'postgresql': postgres_database,
+}
+
+# variable de entorno con el destino de la réplica y la clave que cambia
+REPLICA_TARGETS = {
+    'sqlite': ('SQLITE_REPLICA_PATH', 'NAME'),
+    'postgresql': ('POSTGRES_REPLICA_HOST', 'HOST'),
+}
+
+DATABASE_ENGINE = os.environ.get('DATABASE_ENGINE', 'sqlite')
+try:
+    DATABASES = {'default': DATABASE_ENGINES[DATABASE_ENGINE]()}
+except KeyError as exc:
+    raise ImproperlyConfigured(
+        f"DATABASE_ENGINE debe ser uno de {', '.join(DATABASE_ENGINES)}"
+    ) from exc
+
+DATABASE_REPLICAS = []
+_variable, _key = REPLICA_TARGETS[DATABASE_ENGINE]
+if os.environ.get(_variable):
+    DATABASES['replica'] = {
+        **DATABASE_ENGINES[DATABASE_ENGINE](),
+        _key: os.environ[_variable],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS = ['replica']
+DATABASE_PIN_SECONDS = int(os.environ.get('DATABASE_PIN_SECONDS', 5))
@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from django.contrib.messages import constants as message_constants
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -44,6 +47,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',
+    'core.middleware.PrimaryPinMiddleware',
+    'core.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -74,6 +80,19 @@ TEMPLATES = [
 WSGI_APPLICATION = 'formsetexample.wsgi.application'
 CRISPY_TEMPLATE_PACK = 'bootstrap4'
 
+# Libros por autor que admite un envío completo del formset (max_num y
+# absolute_max de BookFormSet); el envío incremental solo cuenta las filas
+# que cambiaron.
+AUTHOR_MAX_BOOKS = 10000
+# Cada libro del formset envía 6 campos (id, author, version, title,
+# published_year y DELETE), más el autor y el management form.
+DATA_UPLOAD_MAX_NUMBER_FIELDS = 6 * AUTHOR_MAX_BOOKS + 100
+DATA_UPLOAD_MAX_MEMORY_SIZE = 50 * DATA_UPLOAD_MAX_NUMBER_FIELDS
+
+# 'keyset' pagina la lista de autores por cursor sobre (name, id);
+# 'offset' usa la paginación por número de página de django-tables2.
+AUTHOR_LIST_PAGINATION = 'keyset'
+
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
@@ -81,9 +100,67 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+    },
+}
+
+# Lecturas en las réplicas y escrituras en default (ver core.routers);
+# con la lista vacía todo va a default.
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+DATABASE_REPLICAS = []
+if os.environ.get('DJANGO_USE_REPLICA'):
+    # otro archivo SQLite hace de réplica de lectura para probar el router
+    # en local; nadie lo replica: hay que copiarlo
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.replica.sqlite3',
+        'TEST': {'NAME': ':memory:'},
+    }
+    DATABASE_REPLICAS = ['replica']
+# segundos que un navegador lee de default después de escribir
+DATABASE_PIN_SECONDS = 5
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
+# Mensajes flash en una cookie firmada: ni leerlos ni guardarlos toca la
+# sesión (y con ella la base de datos).
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+MESSAGE_TAGS = {message_constants.ERROR: 'danger'}
+
+# Alias de CACHES para los fragmentos de AuthorTable (None la desactiva).
+# Con varios procesos usar un backend compartido para que la invalidación
+# llegue a todos.
+AUTHOR_TABLE_CACHE_ALIAS = 'default'
+AUTHOR_TABLE_CACHE_TIMEOUT = 300
+
+# Borrado de autores: libros por tramo (None = un solo DELETE) y, si se
+# define, cantidad de libros a partir de la cual se borra en segundo plano.
+AUTHOR_DELETE_CHUNK_SIZE = 50000
+AUTHOR_DELETE_BACKGROUND_THRESHOLD = None
+
+# Métricas por vista de core.middleware.RequestMetricsMiddleware: cada
+# proceso vuelca su histograma en este directorio cada FLUSH_INTERVAL
+# segundos (None = solo en memoria); `manage.py dump_metrics` los combina.
+REQUEST_METRICS_DIR = BASE_DIR / 'metrics'
+REQUEST_METRICS_FLUSH_INTERVAL = 30
+REQUEST_METRICS_DUPLICATE_THRESHOLD = 5
+# expone los tiempos y el número de consultas a cualquier cliente
+REQUEST_METRICS_SERVER_TIMING = True
+
+# Perfiles cProfile de core.middleware.ProfilingMiddleware: la fracción de
+# peticiones que se perfila (0 = solo las que traen la cabecera firmada de
+# `manage.py profiling_token`, válida PROFILING_TOKEN_MAX_AGE segundos).
+PROFILING_SAMPLE_RATE = float(os.environ.get('DJANGO_PROFILING_SAMPLE_RATE', 0))
+PROFILING_DIR = BASE_DIR / 'profiles'
+PROFILING_TOKEN_MAX_AGE = 3600
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -121,7 +198,27 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# destino de collectstatic; en producción lo sirve StaticFilesMiddleware
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Perfil de despliegue: con DJANGO_PROFILE=production se aplican los
+# valores de formsetexample/production.py (BD, conexiones persistentes,
+# pragmas de SQLite, cargador de plantillas en caché, estáticos con hash y
+# precomprimidos, sesiones sin base de datos) sobre los de desarrollo.
+SETTINGS_PROFILE = os.environ.get('DJANGO_PROFILE', 'development')
+
+if SETTINGS_PROFILE == 'production':
+    from formsetexample.production import *  # noqa: E402,F401,F403
+
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = TEMPLATE_LOADERS  # noqa: F405
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index('django.middleware.security.SecurityMiddleware') + 1,
+        'core.middleware.StaticFilesMiddleware',
+    )